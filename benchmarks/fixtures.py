@@ -0,0 +1,202 @@
+import html
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+PAGE_SIZE = 25
+FIRST_JOB_ID = 4_000_000_000
+
+_TITLES = [
+    "Machine Learning Engineer",
+    "Senior Data Scientist",
+    "AI Research Engineer",
+    "MLOps Engineer",
+    "Applied Scientist, NLP",
+    "Computer Vision Engineer",
+    "Data Engineer",
+    "LLM Platform Engineer",
+]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne"]
+_LOCATIONS = ["Riyadh, Saudi Arabia", "Jeddah, Saudi Arabia", "Dubai, UAE", "Remote"]
+_SENTENCES = [
+    "You will design, train and deploy machine learning models to production.",
+    "Build retrieval-augmented generation pipelines on top of large language models.",
+    "Own our MLOps stack: Kubernetes, Docker, Airflow and MLflow.",
+    "Work with product and engineering stakeholders to define success metrics.",
+    "Strong Python and SQL; experience with PyTorch or TensorFlow.",
+    "Experience with AWS or GCP and infrastructure as code is a plus.",
+    "Mentor junior engineers and review code across the team.",
+    "Evaluate models offline and online, and monitor them in production.",
+    "Fine-tune and serve transformer models with low latency.",
+    "Bachelor's or Master's degree in Computer Science or a related field.",
+    "Arabic and English communication skills are preferred.",
+    "Experience with Spark, Kafka or other distributed data systems.",
+]
+
+
+def job(index: int) -> dict:
+    """
+    Deterministic posting number `index`. Every tenth posting reposts the
+    one before it under a new ID, so deduplication has something to find.
+    """
+    source = index - 1 if index % 10 == 9 else index
+    rng = random.Random(source)
+    paragraphs = [" ".join(rng.sample(_SENTENCES, 4)) for _ in range(rng.randint(3, 6))]
+    return {
+        "job_id": str(FIRST_JOB_ID + index),
+        "title": _TITLES[source % len(_TITLES)],
+        "company": _COMPANIES[source % len(_COMPANIES)],
+        "location": _LOCATIONS[source % len(_LOCATIONS)],
+        "paragraphs": paragraphs,
+        "bullets": rng.sample(_SENTENCES, 5),
+    }
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def job_path(index: int) -> str:
+    posting = job(index)
+    return f"/jobs/view/{_slug(posting['title'])}-{posting['job_id']}/"
+
+
+def search_page(base_url: str, start: int, total: int) -> str:
+    """A guest search API page: up to 25 job cards starting at `start`."""
+    cards = []
+    for index in range(start, min(start + PAGE_SIZE, total)):
+        posting = job(index)
+        cards.append(
+            '<li><div class="base-card relative job-search-card">'
+            f'<a class="base-card__full-link" href="{base_url}{job_path(index)}'
+            f'?refId=bench&amp;trk=public_jobs_jserp-result_search-card">'
+            f'<span class="sr-only">{html.escape(posting["title"])}</span></a>'
+            '<div class="base-search-card__info">'
+            f'<h3 class="base-search-card__title">{html.escape(posting["title"])}</h3>'
+            f'<h4 class="base-search-card__subtitle">'
+            f'<a href="#">{html.escape(posting["company"])}</a></h4>'
+            '<div class="base-search-card__metadata">'
+            f'<span class="job-search-card__location">'
+            f'{html.escape(posting["location"])}</span>'
+            '<time class="job-search-card__listdate">1 day ago</time>'
+            "</div></div></div></li>"
+        )
+    return "".join(cards)
+
+
+def job_page(index: int, padding: int = 60_000) -> str:
+    """
+    A public job page with the markup `parse_job_page` reads, plus `padding`
+    bytes of script and recommendations like a real page carries.
+    """
+    posting = job(index)
+    description = "".join(f"<p>{html.escape(p)}</p>" for p in posting["paragraphs"])
+    description += (
+        "<strong>Requirements</strong><ul>"
+        + "".join(f"<li>{html.escape(b)}</li>" for b in posting["bullets"])
+        + "</ul>"
+    )
+    script = "window.__bench = '" + "x" * max(padding - 200, 0) + "';"
+    return (
+        "<!DOCTYPE html><html><head><title>"
+        f"{html.escape(posting['title'])} - {html.escape(posting['company'])}"
+        f"</title><script>{script}</script></head><body>"
+        '<section class="top-card-layout">'
+        f'<h1 class="top-card-layout__title topcard__title">'
+        f"{html.escape(posting['title'])}</h1>"
+        f'<h4><a class="topcard__org-name-link topcard__flavor--black-link" href="#">'
+        f"{html.escape(posting['company'])}</a>"
+        f'<span class="topcard__flavor topcard__flavor--bullet">'
+        f"{html.escape(posting['location'])}</span></h4></section>"
+        '<div class="description__text description__text--rich">'
+        '<section class="show-more-less-html">'
+        '<div class="show-more-less-html__markup show-more-less-html__markup--clamp-after-5">'
+        f"{description}</div>"
+        '<button class="show-more-less-html__button">Show more</button>'
+        "</section></div>"
+        '<footer class="li-footer">'
+        + "".join(f'<a href="/jobs/{i}">Related job {i}</a>' for i in range(50))
+        + "</footer></body></html>"
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "LinkedInFixtures/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        fixtures = self.server.fixtures
+        url = urlparse(self.path)
+        if fixtures.delay:
+            time.sleep(fixtures.delay)
+        faults = fixtures.faults.get(url.path)
+        if faults:
+            self.send_error(faults.pop(0))
+            return
+        if url.path == SEARCH_PATH:
+            start = int(parse_qs(url.query).get("start", ["0"])[0])
+            body = search_page(fixtures.url, start, fixtures.jobs)
+        else:
+            match = re.match(r"/jobs/view/[\w-]*?(\d{6,})/?$", url.path)
+            index = int(match.group(1)) - FIRST_JOB_ID if match else -1
+            if not 0 <= index < fixtures.jobs:
+                self.send_error(404)
+                return
+            body = job_page(index, fixtures.padding)
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        fixtures.requests += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Local HTTP server standing in for LinkedIn: the guest search API at
+    `search_url` and `jobs` job pages, each served after `delay` seconds.
+    `faults` maps a path to error statuses answered, one per request, before
+    it is served normally. Use as a context manager; it listens on a free
+    localhost port.
+    """
+
+    def __init__(self, jobs: int = 100, delay: float = 0.02, padding: int = 60_000):
+        self.jobs = jobs
+        self.delay = delay
+        self.padding = padding
+        self.requests = 0
+        self.faults = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fixtures = self
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.search_url = self.url + SEARCH_PATH
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def job_url(self, index: int) -> str:
+        return self.url + job_path(index)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+__all__ = [
+    "FixtureServer",
+    "job",
+    "job_page",
+    "job_path",
+    "search_page",
+]
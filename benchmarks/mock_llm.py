@@ -0,0 +1,270 @@
+import ast
+import asyncio
+import re
+import time
+import zlib
+from collections import Counter
+from typing import Any
+
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.llms import (
+    ChatMessage,
+    ChatResponse,
+    CompletionResponse,
+    CompletionResponseGen,
+    CustomLLM,
+    LLMMetadata,
+)
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.tools import ToolSelection
+
+# Prompts whose answer is (part of) their input, so rewritten LaTeX stays valid
+_ECHO_RES = (
+    re.compile(r"Fragment:\n\n(.*?)\n\nMarkdown:", re.DOTALL),
+    re.compile(r"CV Section:\n\n(.*?)\n\n(?:Job Posting|Your output):", re.DOTALL),
+)
+
+_WORDS = (
+    "python kubernetes docker llm retrieval pipelines mlops aws gcp pytorch "
+    "leadership stakeholders analytics sql spark airflow latency evaluation "
+    "fine-tuning deployment monitoring testing mentoring architecture skills "
+    "experience summary"
+).split()
+
+# What the scripted agent reads from the user's message
+_JOB_URL_RE = re.compile(r"https?://\S+")
+_CV_PATH_RE = re.compile(r"\S+\.tex\b")
+_FILENAME_RE = re.compile(r"\bas (\w+)")
+
+
+def filler(seed: str, tokens: int) -> str:
+    """Deterministic text of about `tokens` tokens (~4 characters each)."""
+    state = zlib.crc32(seed.encode("utf-8"))
+    words, size = [], 0
+    while size < tokens * 4:
+        state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+        words.append(_WORDS[state % len(_WORDS)])
+        size += len(words[-1]) + 1
+    return " ".join(words)
+
+
+class BenchmarkLLM(CustomLLM, FunctionCallingLLM):
+    """
+    Deterministic offline LLM with configurable speed.
+
+    Every call waits `latency` seconds (time to first token) and then
+    produces its answer at `tokens_per_second`. Conversion, rewrite and
+    repair prompts get their LaTeX fragment echoed back; other prompts get
+    `completion_tokens` tokens of filler. Calls are counted by method in
+    `calls`.
+
+    Given tools, it acts as the agent `main.py` runs: it reads the job and
+    the CV named in the user's message, assesses and rewrites the CV, saves
+    it, and then answers with filler.
+    """
+
+    latency: float = 0.05
+    tokens_per_second: float = 2000.0
+    completion_tokens: int = 300
+    chunk_tokens: int = 16
+    _calls: Counter = PrivateAttr(default_factory=Counter)
+
+    @property
+    def calls(self) -> Counter:
+        return self._calls
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(
+            model_name="benchmark-mock", num_output=4096, is_function_calling_model=True
+        )
+
+    def answer(self, prompt: str) -> str:
+        for pattern in _ECHO_RES:
+            match = pattern.search(prompt)
+            if match:
+                return match.group(1)
+        return filler(prompt, self.completion_tokens)
+
+    def _duration(self, text: str) -> float:
+        return self.latency + len(text) / 4 / self.tokens_per_second
+
+    def _chunks(self, text: str) -> list:
+        size = self.chunk_tokens * 4
+        return [text[i : i + size] for i in range(0, len(text), size)] or [""]
+
+    def complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        self._calls["complete"] += 1
+        text = self.answer(prompt)
+        time.sleep(self._duration(text))
+        return CompletionResponse(text=text)
+
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseGen:
+        self._calls["stream_complete"] += 1
+        text = self.answer(prompt)
+        chunks = self._chunks(text)
+
+        def gen():
+            time.sleep(self.latency)
+            sent = ""
+            for chunk in chunks:
+                time.sleep(len(chunk) / 4 / self.tokens_per_second)
+                sent += chunk
+                yield CompletionResponse(text=sent, delta=chunk)
+
+        return gen()
+
+    async def acomplete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        self._calls["acomplete"] += 1
+        text = self.answer(prompt)
+        await asyncio.sleep(self._duration(text))
+        return CompletionResponse(text=text)
+
+    async def astream_complete(self, prompt: str, formatted: bool = False, **kwargs):
+        self._calls["astream_complete"] += 1
+        text = self.answer(prompt)
+        chunks = self._chunks(text)
+
+        async def gen():
+            await asyncio.sleep(self.latency)
+            sent = ""
+            for chunk in chunks:
+                await asyncio.sleep(len(chunk) / 4 / self.tokens_per_second)
+                sent += chunk
+                yield CompletionResponse(text=sent, delta=chunk)
+
+        return gen()
+
+    async def astructured_predict(self, output_cls, prompt, **prompt_args):
+        """An `output_cls` with ints in 1..10 and filler strings, seeded by the prompt."""
+        self._calls["astructured_predict"] += 1
+        text = prompt.format(**prompt_args)
+        seed = zlib.crc32(text.encode("utf-8"))
+        values = {}
+        for name, field in output_cls.model_fields.items():
+            if field.annotation is int:
+                values[name] = 1 + (seed >> len(values)) % 10
+            else:
+                values[name] = filler(f"{name}{seed}", self.completion_tokens // 3)
+        await asyncio.sleep(self._duration(str(values)))
+        return output_cls(**values)
+
+    # Function calling
+
+    def _prepare_chat_with_tools(
+        self,
+        tools,
+        user_msg=None,
+        chat_history=None,
+        verbose: bool = False,
+        allow_parallel_tool_calls: bool = False,
+        tool_required: bool = False,
+        **kwargs: Any,
+    ) -> dict:
+        messages = list(chat_history or [])
+        if user_msg:
+            if isinstance(user_msg, str):
+                user_msg = ChatMessage(role="user", content=user_msg)
+            messages.append(user_msg)
+        return {"messages": messages, "tools": tools}
+
+    def get_tool_calls_from_response(
+        self, response: ChatResponse, error_on_no_tool_call: bool = True, **kwargs
+    ) -> list:
+        tool_calls = response.message.additional_kwargs.get("tool_calls", [])
+        if not tool_calls and error_on_no_tool_call:
+            raise ValueError("Expected at least one tool call")
+        return tool_calls
+
+    def agent_turn(self, messages: list) -> ChatMessage:
+        """The agent's next message: the next tools to call, or its final answer."""
+        request = next(m.content for m in messages if m.role == "user")
+        # Tool call IDs start with the tool's name, so results can be matched up
+        results = {
+            m.additional_kwargs["tool_call_id"].split(":")[0]: m.content
+            for m in messages
+            if m.role == "tool"
+        }
+        if "read_job" not in results:
+            calls = {
+                "read_job": {"job_url": _JOB_URL_RE.search(request).group(0)},
+                "read_cv": {"cv_path": _CV_PATH_RE.search(request).group(0)},
+            }
+        elif "assess_cv" not in results:
+            _, cv_markdown = ast.literal_eval(results["read_cv"])
+            calls = {
+                "assess_cv": {
+                    "cv_content": cv_markdown,
+                    "job_posting": results["read_job"],
+                }
+            }
+        elif "rewrite_cv" not in results:
+            latex_cv, _ = ast.literal_eval(results["read_cv"])
+            calls = {
+                "rewrite_cv": {
+                    "latex_cv": latex_cv,
+                    "job_posting": results["read_job"],
+                    "cv_assessment": results["assess_cv"],
+                }
+            }
+        elif "save_resume" not in results:
+            match = _FILENAME_RE.search(request)
+            calls = {
+                "save_resume": {
+                    "resume_content": results["rewrite_cv"],
+                    "filename": match.group(1) if match else "resume",
+                }
+            }
+        else:
+            return ChatMessage(
+                role="assistant", content=filler(request, self.completion_tokens)
+            )
+        tool_calls = [
+            ToolSelection(
+                tool_id=f"{name}:{len(messages)}", tool_name=name, tool_kwargs=kwargs
+            )
+            for name, kwargs in calls.items()
+        ]
+        return ChatMessage(
+            role="assistant", content="", additional_kwargs={"tool_calls": tool_calls}
+        )
+
+    async def achat(self, messages, **kwargs: Any) -> ChatResponse:
+        if not kwargs.get("tools"):
+            return await super().achat(messages, **kwargs)
+        self._calls["achat"] += 1
+        message = self.agent_turn(list(messages))
+        await asyncio.sleep(self._duration(message.content or str(message)))
+        return ChatResponse(message=message)
+
+    async def astream_chat(self, messages, **kwargs: Any):
+        if not kwargs.get("tools"):
+            return await super().astream_chat(messages, **kwargs)
+        self._calls["astream_chat"] += 1
+        message = self.agent_turn(list(messages))
+        text = message.content or ""
+
+        async def gen():
+            await asyncio.sleep(self.latency)
+            sent = ""
+            for chunk in self._chunks(text) if text else []:
+                await asyncio.sleep(len(chunk) / 4 / self.tokens_per_second)
+                sent += chunk
+                yield ChatResponse(
+                    message=ChatMessage(role="assistant", content=sent), delta=chunk
+                )
+            yield ChatResponse(message=message, delta="")
+
+        return gen()
+
+
+__all__ = [
+    "BenchmarkLLM",
+    "filler",
+]
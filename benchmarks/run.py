@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class Bench:
+    """What a scenario runs against: the fixture server and a scratch directory."""
+
+    def __init__(self, server, directory: str, workers: int):
+        self.server = server
+        self.directory = directory
+        self.workers = workers
+        self._cvs = {}
+
+    def cvs(self, count: int) -> list:
+        from .scenarios import write_cvs
+
+        if count not in self._cvs:
+            self._cvs[count] = write_cvs(
+                os.path.join(self.directory, f"cvs_{count}"), count
+            )
+        return self._cvs[count]
+
+
+def run_worker(args) -> dict:
+    """Run one scenario in this (fresh) process and return its metrics."""
+    directory = tempfile.mkdtemp(prefix=f"bench_{args.worker}_")
+    # Cold caches, an empty job store and vector index, outputs kept out of the repo
+    os.environ["CACHE_DIR"] = os.path.join(directory, "cache")
+    os.environ["JOB_STORE_PATH"] = os.path.join(directory, "jobs.db")
+    os.environ["VECTOR_INDEX_DIR"] = os.path.join(directory, "vectors")
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+    sys.path.insert(0, ROOT)
+    os.chdir(directory)
+
+    from llama_index.core import Settings
+
+    from src.llm import LLMGateway, set_gateway
+    from src.tracing import get_tracer
+
+    from .fixtures import FixtureServer
+    from .mock_llm import BenchmarkLLM
+    from .scenarios import SCENARIOS
+
+    scenario, jobs = SCENARIOS[args.worker]
+    llm = BenchmarkLLM(
+        latency=args.llm_latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+    )
+    Settings.llm = llm
+    gateway = LLMGateway(llm=llm)
+    set_gateway(gateway)
+
+    with FixtureServer(jobs, delay=args.http_latency) as server:
+        os.environ["LINKEDIN_SEARCH_URL"] = server.search_url
+        bench = Bench(server, directory, args.workers)
+        output = sys.stderr if args.verbose else open(os.devnull, "w")
+        with contextlib.redirect_stdout(output):
+            started = time.perf_counter()
+            items, latencies = asyncio.run(scenario(bench))
+            wall = time.perf_counter() - started
+        http_requests = server.requests
+
+    tools = {
+        name: round(s["total_seconds"], 3)
+        for name, s in get_tracer().summary().items()
+        if s["kind"] == "tool"
+    }
+    return {
+        "scenario": args.worker,
+        "items": items,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(items / wall, 3) if wall else 0.0,
+        "p50_seconds": round(percentile(latencies, 0.5), 4),
+        "p95_seconds": round(percentile(latencies, 0.95), 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "llm_calls": sum(llm.calls.values()),
+        "llm_calls_by_method": dict(llm.calls),
+        "prompt_tokens": gateway.stats["prompt_tokens"],
+        "completion_tokens": gateway.stats["completion_tokens"],
+        "http_requests": http_requests,
+        "tool_seconds": tools,
+    }
+
+
+def run_scenario(name: str, args) -> dict:
+    """Run a scenario in a subprocess so its caches and peak RSS are its own."""
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", name]
+    for option in (
+        "llm_latency",
+        "tokens_per_second",
+        "completion_tokens",
+        "llm_concurrency",
+        "http_latency",
+        "workers",
+    ):
+        command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+    if args.verbose:
+        command.append("--verbose")
+    process = subprocess.run(
+        command, cwd=ROOT, stdout=subprocess.PIPE, text=True, check=False
+    )
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX) :])
+    return {"scenario": name, "error": f"exit code {process.returncode}"}
+
+
+def _change(value, baseline) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value - baseline) / baseline:+.0%})"
+
+
+def format_results(results: list, baseline: dict = None) -> str:
+    """Markdown table of results, with changes against a baseline run if given."""
+    baseline = baseline or {}
+    lines = [
+        "| Scenario | Items | Wall s | Items/s | p50 s | p95 s | Peak RSS MB | LLM calls |",
+        "| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for r in results:
+        if "error" in r:
+            lines.append(f"| {r['scenario']} | failed: {r['error']} |||||||")
+            continue
+        b = baseline.get(r["scenario"], {})
+        cells = [r["scenario"], str(r["items"])]
+        for key, fmt in (
+            ("wall_seconds", "{:.2f}"),
+            ("throughput_per_second", "{:.2f}"),
+            ("p50_seconds", "{:.3f}"),
+            ("p95_seconds", "{:.3f}"),
+            ("peak_rss_mb", "{:.0f}"),
+            ("llm_calls", "{}"),
+        ):
+            cells.append(fmt.format(r[key]) + _change(r[key], b.get(key)))
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    from .scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks with a mock LLM and local LinkedIn fixtures."
+    )
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})",
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument(
+        "--http-latency", type=float, default=0.02, help="fixture response delay"
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="compare against results saved by --json")
+    parser.add_argument("--verbose", action="store_true", help="show tool output")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    # Checked here: argparse's `choices` with nargs="*" needs [] among them,
+    # which --help would show
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(
+            f"unknown scenarios {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}"
+        )
+
+    if args.worker:
+        print(RESULT_PREFIX + json.dumps(run_worker(args)), flush=True)
+        return
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        print(f"Running {name}...", file=sys.stderr)
+        results.append(run_scenario(name, args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = {r["scenario"]: r for r in json.load(file)}
+    print(format_results(results, baseline))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
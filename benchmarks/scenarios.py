@@ -0,0 +1,154 @@
+# Each scenario takes the run's `Bench` and returns `(items, latencies)`: how
+# many units of work it did and the seconds each one took. `src` is imported
+# lazily, once the runner has pointed caches, the job store and the crawler
+# at a scratch directory and the fixture server.
+import asyncio
+import io
+import os
+import time
+
+SAMPLE_CV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "resumes_repo",
+    "sample_resume.tex",
+)
+
+_FOCUS = [
+    "computer vision",
+    "natural language processing",
+    "recommendation systems",
+    "time series forecasting",
+    "MLOps and platform work",
+    "reinforcement learning",
+    "data engineering",
+    "speech recognition",
+]
+
+
+def write_cvs(directory: str, count: int) -> list:
+    """`count` variants of the sample CV, differing in their summary's focus."""
+    with open(SAMPLE_CV, "r", encoding="utf-8") as file:
+        source = file.read()
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        focus = _FOCUS[i % len(_FOCUS)]
+        variant = source.replace(
+            "\\section{Summary}\n",
+            f"\\section{{Summary}}\nFocused on {focus} (profile {i + 1}).\n",
+            1,
+        )
+        path = os.path.join(directory, f"cv_{i + 1:02d}.tex")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(variant)
+        paths.append(path)
+    return paths
+
+
+async def single(bench) -> tuple:
+    """One CV tailored to one job through the workflow `main.py --pipeline` runs."""
+    from src.main import stream_agent_output
+    from src.pipeline import TailoringPipeline
+    from src.render import EventRenderer
+
+    started = time.perf_counter()
+    handler = TailoringPipeline(timeout=600).run(
+        job_url=bench.server.job_url(0), cv_path=bench.cvs(1)[0], filename="bench"
+    )
+    await stream_agent_output(handler, EventRenderer("jsonl", out=io.StringIO()))
+    result = await handler
+    if "saved" not in str(result):
+        raise RuntimeError(f"Pipeline did not save the resume: {result}")
+    return 1, [time.perf_counter() - started]
+
+
+async def agent(bench) -> tuple:
+    """
+    One CV tailored to one job by the agent `main.py` runs without --pipeline,
+    with the mock LLM choosing the tools: five agent turns around the same tools.
+    """
+    from llama_index.core import Settings
+
+    from src.main import build_agent, stream_agent_output
+    from src.render import EventRenderer
+
+    started = time.perf_counter()
+    handler = build_agent(Settings.llm).run(
+        f"Tailor my CV at {bench.cvs(1)[0]} to the job at {bench.server.job_url(0)}"
+        " and save it as bench."
+    )
+    await stream_agent_output(handler, EventRenderer("jsonl", out=io.StringIO()))
+    await handler
+    if not os.path.exists(os.path.join("generated_resumes", "bench.tex")):
+        raise RuntimeError("The agent did not save the resume")
+    return 1, [time.perf_counter() - started]
+
+
+async def one_by_100(bench) -> tuple:
+    """One CV read once, then each of 100 jobs read and assessed; the best 5 rewritten."""
+    from src.tools import assess_cv, parse_assessment, read_cv, read_job, rewrite_cv
+
+    latex_cv, cv_markdown = await read_cv(bench.cvs(1)[0])
+    limit = asyncio.Semaphore(bench.workers)
+    latencies = []
+
+    async def assess(index):
+        async with limit:
+            started = time.perf_counter()
+            job_posting = await read_job(bench.server.job_url(index))
+            cv_assessment = await assess_cv(cv_markdown, job_posting)
+            latencies.append(time.perf_counter() - started)
+            return job_posting, cv_assessment
+
+    assessed = await asyncio.gather(*(assess(i) for i in range(100)))
+    best = sorted(assessed, key=lambda pair: -parse_assessment(pair[1]).match_score)[:5]
+    for job_posting, cv_assessment in best:
+        await rewrite_cv(latex_cv, job_posting, cv_assessment)
+    return 100, latencies
+
+
+async def batch_20x20(bench) -> tuple:
+    """The batch command: 20 CVs x 20 postings, every pair assessed and rewritten."""
+    from src.batch import fetch_postings, run_batch
+    from src.tracing import get_tracer
+
+    postings = await fetch_postings([bench.server.job_url(i) for i in range(20)])
+    results = await run_batch(
+        bench.cvs(20),
+        postings,
+        output_dir=os.path.join(bench.directory, "batch"),
+        workers=bench.workers,
+        resume=False,
+    )
+    latencies = [s.duration for s in get_tracer().spans if s.name == "assess_cv"]
+    return len(results), latencies
+
+
+async def scrape_500(bench) -> tuple:
+    """500 postings crawled, stored, deduplicated and embedded."""
+    from src.fetch import get_http_session
+    from src.scrape import scrape_linkedin_jobs
+
+    latencies = []
+    session = get_http_session()
+    session.hooks["response"].append(
+        lambda response, *args, **kwargs: latencies.append(
+            response.elapsed.total_seconds()
+        )
+    )
+    totals = await scrape_linkedin_jobs(
+        max_jobs=500, concurrency=bench.workers * 2, rate=None
+    )
+    stored = totals["inserted"] + totals["updated"] + totals["unchanged"]
+    if stored != 500:
+        raise RuntimeError(f"Expected 500 postings, stored {stored}: {totals}")
+    return stored, latencies
+
+
+SCENARIOS = {
+    "single": (single, 1),
+    "agent": (agent, 1),
+    "1x100": (one_by_100, 100),
+    "20x20": (batch_20x20, 20),
+    "scrape500": (scrape_500, 500),
+}
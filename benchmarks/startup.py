@@ -0,0 +1,78 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wall time allowed for `python -m src.main --help`, interpreter start included.
+# Importing llama_index's workflow package alone takes well over a second.
+STARTUP_BUDGET_SECONDS = 0.5
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def wall_time(command: list, repeat: int) -> float:
+    """Median seconds `command` takes to run, in fresh processes."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def slowest_imports(module: str, top: int = 10) -> list:
+    """`(seconds, name)` for the modules `module` imports directly, slowest first."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    children = []
+    # A module's imports are logged before it, indented two more spaces
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3)) // 2
+        if depth == 0 and match.group(4) == module:
+            return sorted(children, reverse=True)[:top]
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((int(match.group(2)) / 1e6, match.group(4)))
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the CLI starts within its import-time budget."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=STARTUP_BUDGET_SECONDS,
+        help="seconds allowed for `python -m src.main --help`",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baseline = wall_time([sys.executable, "-c", "pass"], args.repeat)
+    help_time = wall_time([sys.executable, "-m", "src.main", "--help"], args.repeat)
+    print(f"Interpreter start:        {baseline:.3f}s")
+    print(f"python -m src.main --help: {help_time:.3f}s (budget {args.budget:.3f}s)")
+    print("Slowest imports of src.main:")
+    for seconds, module in slowest_imports("src.main"):
+        print(f"  {seconds:7.3f}s  {module}")
+    if help_time > args.budget:
+        print("Over budget: move the slow imports into the functions that use them.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
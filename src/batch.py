@@ -0,0 +1,352 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, replace
+from typing import Optional
+
+from .cache import cache_key
+from .dedup import cluster_postings
+from .fetch import fetch_job
+from .postings import JobPosting, job_id_from_link
+from .ranking import rank_postings
+from .store import DEFAULT_STORE_PATH, JobStore, content_hash, parse_posting_file
+from .tools import (
+    READ_CV_ERROR,
+    assess_cv,
+    parse_assessment,
+    read_cv,
+    tailor_latex_cv,
+)
+from .tracing import get_tracer
+
+CHECKPOINT_NAME = ".batch_checkpoint.jsonl"
+SUMMARY_NAME = "summary.md"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of tailoring one CV to one posting."""
+
+    key: str
+    cv: str
+    job_id: str
+    title: str
+    company: str
+    match_score: Optional[int] = None
+    output: str = ""
+    error: Optional[str] = None
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w-]+", "_", text).strip("_") or "unknown"
+
+
+def load_posting_files(directory: str) -> list:
+    """Postings saved in the job_postings/*.txt layout."""
+    postings = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+            posting = parse_posting_file(file.read())
+        if posting is None:
+            print(f"Skipping {name}: not a job posting file")
+            continue
+        posting.job_id = posting.job_id or os.path.splitext(name)[0]
+        postings.append(posting)
+    return postings
+
+
+async def fetch_postings(urls: list) -> list:
+    """Fetch each job URL once, concurrently."""
+
+    async def fetch(url):
+        try:
+            details, _ = await fetch_job(url)
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            return None
+        return JobPosting(job_id=job_id_from_link(url), link=url, **details)
+
+    return [p for p in await asyncio.gather(*(fetch(u) for u in urls)) if p]
+
+
+async def load_postings(
+    source: str, query: str = None, limit: int = 100, db: str = DEFAULT_STORE_PATH
+) -> list:
+    """
+    Postings from a directory of posting files, a file of job URLs (one per
+    line), or, without `source`, the job store (searched with `query`).
+    """
+    if source and os.path.isdir(source):
+        return load_posting_files(source)[:limit]
+    if source:
+        with open(source, "r", encoding="utf-8") as file:
+            urls = [line.strip() for line in file if line.strip()]
+        return await fetch_postings(urls[:limit])
+    with JobStore(db) as store:
+        return store.search(query, limit=limit) if query else store.page(0, limit)
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines record of finished (CV, posting) pairs.
+
+    Each line is written as soon as its pair finishes, so an interrupted
+    batch resumes where it stopped. Failed pairs aren't recorded and run again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        done = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interruption
+                    done[record["key"]] = BatchResult(**record)
+        except OSError:
+            pass
+        return done
+
+    def record(self, result: BatchResult) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(result)) + "\n")
+
+
+def format_summary(results: list) -> str:
+    """Markdown table of match scores, best first."""
+    lines = [
+        "| Score | CV | Job | Company | Resume |",
+        "| ---: | --- | --- | --- | --- |",
+    ]
+    ranked = sorted(
+        results, key=lambda r: (r.match_score is None, -(r.match_score or 0), r.cv)
+    )
+    for r in ranked:
+        score = r.match_score if r.match_score is not None else "error"
+        output = os.path.basename(r.output) if r.output else r.error or "-"
+        lines.append(
+            f"| {score} | {r.cv} | [{r.job_id}] {r.title} | {r.company} | {output} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+async def run_batch(
+    cv_paths: list,
+    postings: list,
+    output_dir: str = "generated_resumes",
+    workers: int = 4,
+    min_score: int = 0,
+    resume: bool = True,
+    top_k: int = None,
+) -> list:
+    """
+    Assess every CV against every posting and rewrite the CVs that score at
+    least `min_score`, with at most `workers` pairs in flight.
+
+    With `top_k`, each CV is only assessed against its `top_k` best postings
+    by local BM25 ranking, so LLM calls scale with K rather than with the
+    number of postings. Each CV and posting is read once. Finished pairs are
+    checkpointed in `output_dir`, and a `summary.md` table of match scores is
+    written there.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_dir, CHECKPOINT_NAME))
+    done = checkpoint.load() if resume else {}
+
+    cvs = {}
+    for path, (latex_cv, cv_markdown) in zip(
+        cv_paths, await asyncio.gather(*(read_cv(path) for path in cv_paths))
+    ):
+        if latex_cv == READ_CV_ERROR:
+            print(f"Skipping {path}: could not read it")
+            continue
+        cv_hash = hashlib.sha256(latex_cv.encode("utf-8")).hexdigest()
+        cvs[path] = (latex_cv, cv_markdown, cv_hash)
+    # Near-duplicate postings (reposts, cross-listings) are assessed and
+    # rewritten once; the copies share their original's result
+    postings = list({p.job_id: p for p in postings if not p.error}.values())
+    clusters = cluster_postings(postings)
+    duplicates = defaultdict(list)
+    for posting in postings:
+        if clusters[posting.job_id] != posting.job_id:
+            duplicates[clusters[posting.job_id]].append(posting)
+    if duplicates:
+        copies = sum(len(d) for d in duplicates.values())
+        print(f"{copies} near-duplicate postings will share their original's result")
+    jobs = [(p, p.to_text()) for p in postings if clusters[p.job_id] == p.job_id]
+
+    results = []
+    queue = asyncio.Queue()
+    total = 0
+    for path, (_, cv_markdown, cv_hash) in cvs.items():
+        shortlist = [posting for posting, _ in jobs]
+        if top_k and top_k < len(shortlist):
+            shortlist = [p for p, _ in rank_postings(cv_markdown, shortlist, top_k)]
+        total += len(shortlist)
+        for posting in shortlist:
+            key = cache_key(cv_hash, content_hash(posting))
+            previous = done.get(key)
+            if previous and (
+                os.path.exists(previous.output)
+                if previous.output
+                else previous.match_score < min_score
+            ):
+                results.append(previous)
+            else:
+                queue.put_nowait((key, path, posting))
+    job_texts = {posting.job_id: text for posting, text in jobs}
+    if results:
+        print(f"Resuming: {len(results)}/{total} pairs already done")
+    started = time.monotonic()
+    finished = 0
+
+    async def tailor(key, path, posting):
+        latex_cv, cv_markdown, _ = cvs[path]
+        cv_name = os.path.splitext(os.path.basename(path))[0]
+        result = BatchResult(
+            key=key,
+            cv=cv_name,
+            job_id=posting.job_id,
+            title=posting.title,
+            company=posting.company,
+        )
+        job_text = job_texts[posting.job_id]
+        try:
+            cv_assessment = await assess_cv(cv_markdown, job_text)
+            assessment = parse_assessment(cv_assessment)
+            if assessment is None:
+                result.error = "the assessment could not be parsed"
+                return result
+            result.match_score = assessment.match_score
+            if result.match_score >= min_score:
+                output = os.path.join(
+                    output_dir,
+                    f"{_slug(posting.company)}_{cv_name}_{_slug(posting.job_id)}.tex",
+                )
+                await tailor_latex_cv(latex_cv, job_text, cv_assessment, output)
+                result.output = output
+            checkpoint.record(result)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    async def worker():
+        nonlocal finished
+        while True:
+            try:
+                key, path, posting = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await tailor(key, path, posting)
+            results.append(result)
+            finished += 1
+            elapsed = time.monotonic() - started
+            status = result.error or f"score {result.match_score}/10"
+            print(
+                f"[{len(results)}/{total}] {result.cv} x [{result.job_id}] "
+                f"{result.title}: {status} ({finished / elapsed * 60:.1f} pairs/min)"
+            )
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    for result in list(results):
+        for copy in duplicates.get(result.job_id, ()):
+            results.append(
+                replace(
+                    result, job_id=copy.job_id, title=copy.title, company=copy.company
+                )
+            )
+
+    summary = format_summary(results)
+    with open(os.path.join(output_dir, SUMMARY_NAME), "w", encoding="utf-8") as f:
+        f.write(summary)
+    print(summary)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tailor a directory of LaTeX CVs to a set of job postings."
+    )
+    parser.add_argument("--cvs", default="resumes_repo", help="directory of .tex CVs")
+    parser.add_argument(
+        "--postings",
+        help="directory of job posting .txt files or a file of job URLs; "
+        "defaults to the job store",
+    )
+    parser.add_argument("--query", help="search the job store instead of paging it")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="job store path")
+    parser.add_argument("--limit", type=int, default=100, help="max postings")
+    parser.add_argument("--output", default="generated_resumes")
+    parser.add_argument("--workers", type=int, default=4, help="pairs in flight")
+    parser.add_argument(
+        "--min-score", type=int, default=0, help="only rewrite CVs scoring this or more"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=20,
+        help="assess each CV against only its K best postings by local ranking "
+        "(0 for all)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the checkpoint and redo all"
+    )
+    parser.add_argument(
+        "--trace",
+        default=os.getenv("TRACE_FILE"),
+        help="write an OTLP/JSON trace of tool and LLM spans to this file",
+    )
+    args = parser.parse_args(argv)
+
+    from llama_index.core import Settings
+    from llama_index.llms.openai import OpenAI
+
+    Settings.llm = OpenAI(model="gpt-4o-mini")
+
+    cv_paths = [
+        os.path.join(args.cvs, name)
+        for name in sorted(os.listdir(args.cvs))
+        if name.endswith(".tex")
+    ]
+
+    async def run():
+        postings = await load_postings(args.postings, args.query, args.limit, args.db)
+        print(f"{len(cv_paths)} CVs x {len(postings)} postings")
+        await run_batch(
+            cv_paths,
+            postings,
+            output_dir=args.output,
+            workers=args.workers,
+            min_score=args.min_score,
+            resume=not args.restart,
+            top_k=args.top_k,
+        )
+
+    asyncio.run(run())
+    print(get_tracer().report())
+    if args.trace:
+        get_tracer().export(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
+
+__all__ = [
+    "BatchResult",
+    "Checkpoint",
+    "format_summary",
+    "load_postings",
+    "run_batch",
+]
@@ -0,0 +1,210 @@
+import asyncio
+import atexit
+import functools
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+@functools.lru_cache(maxsize=None)
+def chrome_driver_path() -> str:
+    """Resolve (and download if needed) the chromedriver binary once per process."""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+
+def new_chrome_driver():
+    """Start a headless Chrome using the cached driver path."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless")  # Run in headless mode (no GUI)
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    return webdriver.Chrome(service=Service(chrome_driver_path()), options=options)
+
+
+class BrowserPool:
+    """
+    A fixed-size pool of warm headless browsers.
+
+    Drivers are started lazily up to `size`, handed out with `checkout()` and
+    given back with `checkin()` (or used through the `driver()` context manager).
+    A driver is health-checked on checkout, wiped between postings and recycled
+    after `max_pages` pages so long runs don't accumulate browser state.
+    """
+
+    def __init__(self, size: int = 2, max_pages: int = 25, driver_factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self._driver_factory = driver_factory or new_chrome_driver
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._started = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = None
+
+    def _start_driver(self):
+        driver = self._driver_factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._started -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def warm(self, n: int = None) -> None:
+        """Start drivers ahead of time so the first postings don't pay startup."""
+        n = self.size if n is None else min(n, self.size)
+        started = []
+        while True:
+            with self._lock:
+                if self._started >= n:
+                    break
+                self._started += 1
+            try:
+                started.append(self._start_driver())
+            except Exception:
+                with self._lock:
+                    self._started -= 1
+                raise
+        for driver in started:
+            self._idle.put(driver)
+
+    def checkout(self, timeout: float = None):
+        """Borrow a healthy driver, starting a new one if the pool isn't full yet."""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed.")
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_start = self._started < self.size
+                    if can_start:
+                        self._started += 1
+                if can_start:
+                    try:
+                        return self._start_driver()
+                    except Exception:
+                        with self._lock:
+                            self._started -= 1
+                        raise
+                driver = self._idle.get(timeout=timeout)
+
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def checkin(self, driver, broken: bool = False) -> None:
+        """Return a driver to the pool, recycling it if it is broken or worn out."""
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+        if broken or self._closed or pages >= self.max_pages:
+            self._discard(driver)
+            return
+        try:
+            # Clear state left by the previous posting.
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: float = None):
+        driver = self.checkout(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except BaseException:
+            broken = not self._is_healthy(driver)
+            raise
+        finally:
+            self.checkin(driver, broken=broken)
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(driver, *args)` on a pooled driver in a worker thread.
+
+        Selenium calls are blocking, so they never run on the event loop. The
+        executor is bounded by the pool size, which lets callers fan out with
+        `asyncio.gather` without oversubscribing the browsers.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(self._run_sync, fn, *args)
+        )
+
+    def _run_sync(self, fn, *args):
+        with self.driver() as driver:
+            return fn(driver, *args)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="browser"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size: int = None, max_pages: int = 25) -> BrowserPool:
+    """
+    Return the process-wide browser pool, creating it on first use with
+    `size` (default `BROWSER_POOL_SIZE`, or 2) browsers.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            size = size or int(os.getenv("BROWSER_POOL_SIZE", 2))
+            _default_pool = BrowserPool(size=size, max_pages=max_pages)
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+__all__ = [
+    "BrowserPool",
+    "chrome_driver_path",
+    "new_chrome_driver",
+    "get_browser_pool",
+]
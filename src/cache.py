@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+from .tracing import get_tracer
+
+DEFAULT_CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+def cache_key(*parts: str) -> str:
+    """SHA-256 over the given parts, separated so ("ab", "c") != ("a", "bc")."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU mapping with a fixed number of entries."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    JSON values stored one file per key under `directory`.
+
+    Reads refresh a file's mtime, so evicting the oldest mtimes once the
+    directory grows past `max_bytes` drops the least recently used entries.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                value = json.load(file)
+        except (OSError, ValueError):
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value) -> None:
+        # Write to a temp file and rename so readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(value, file)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def pop(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits `max_bytes`."""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of a `DiskCache`, with hit/miss counters.
+
+    Entries older than `ttl` seconds (if set) are treated as misses and dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str = None,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(
+            os.path.join(directory or DEFAULT_CACHE_DIR, name), max_bytes
+        )
+        self.stats = Counter()
+
+    def _fresh(self, entry) -> bool:
+        if not isinstance(entry, dict) or "value" not in entry:
+            return False
+        return self.ttl is None or time.time() - entry["stored_at"] <= self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.memory.get(key)
+        if entry is not None and self._fresh(entry):
+            self.stats["memory_hits"] += 1
+            get_tracer().cache_lookup(hit=True)
+            return entry["value"]
+        if entry is None:
+            entry = self.disk.get(key)
+            if entry is not None and self._fresh(entry):
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, entry)
+                get_tracer().cache_lookup(hit=True)
+                return entry["value"]
+        if entry is not None:
+            self.stats["expired"] += 1
+            self.pop(key)
+        self.stats["misses"] += 1
+        get_tracer().cache_lookup(hit=False)
+        return None
+
+    def set(self, key: str, value) -> None:
+        entry = {"stored_at": time.time(), "value": value}
+        self.memory.set(key, entry)
+        self.disk.set(key, entry)
+
+    def pop(self, key: str) -> None:
+        self.memory.pop(key)
+        self.disk.pop(key)
+
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, directory: str = None, **kwargs) -> TieredCache:
+    """
+    Return the process-wide cache called `name`, creating it on first use.
+    Caches are kept per absolute directory, so a process that changes its
+    working directory (the daemon) gets the cache of the directory it is in.
+    """
+    directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+    with _caches_lock:
+        if (name, directory) not in _caches:
+            _caches[name, directory] = TieredCache(name, directory, **kwargs)
+        return _caches[name, directory]
+
+
+__all__ = [
+    "DiskCache",
+    "LRUCache",
+    "TieredCache",
+    "cache_key",
+    "get_cache",
+]
@@ -0,0 +1,216 @@
+import contextvars
+import functools
+import glob
+import json
+import os
+import secrets
+import tempfile
+import time
+from typing import Optional
+
+from .cache import DEFAULT_CACHE_DIR, cache_key
+
+DEFAULT_CHECKPOINT_DIR = os.getenv(
+    "CHECKPOINT_DIR", os.path.join(DEFAULT_CACHE_DIR, "runs")
+)
+# Runs kept in the checkpoint directory; the least recently written go first
+MAX_RUNS = int(os.getenv("CHECKPOINT_MAX_RUNS", 50))
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+
+
+def new_run_id() -> str:
+    """A sortable, unique run ID, e.g. "20250301-142233-9f2c1a"."""
+    return time.strftime("%Y%m%d-%H%M%S-") + secrets.token_hex(3)
+
+
+class RunCheckpoint:
+    """
+    Append-only JSON-lines log of one run, at `<directory>/<run_id>.jsonl`.
+
+    The first line holds the run's arguments, and each checkpointed tool's
+    result is appended as soon as it finishes. A line cut short by a crash
+    is skipped. After each checkpointed tool returns or fails, the running
+    workflow's `Context` is saved to `<run_id>.context.json`, replacing the
+    previous snapshot, so even a killed process leaves one behind.
+
+    Resuming restores that snapshot, so only the steps that were still
+    running start again. Without one, the run restarts from its arguments.
+    Either way, tool calls repeated with the same arguments are answered
+    from the log. Starting a run prunes all but the `MAX_RUNS` most recent.
+    """
+
+    def __init__(self, run_id: str = None, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.abspath(os.path.join(directory, f"{self.run_id}.jsonl"))
+        self.context_path = self.path[: -len(".jsonl")] + ".context.json"
+        self.args = {}
+        self.results = {}
+        self.context = None
+        self.finished = False
+        self.result = None
+        self._ctx = None
+
+    @classmethod
+    def load(
+        cls, run_id: str, directory: str = DEFAULT_CHECKPOINT_DIR
+    ) -> "RunCheckpoint":
+        """Read a run's log; raises FileNotFoundError if there is none."""
+        checkpoint = cls(run_id, directory)
+        with open(checkpoint.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interruption
+                if record["type"] == "run":
+                    checkpoint.args = record["args"]
+                elif record["type"] == "tool":
+                    checkpoint.results[record["key"]] = record["result"]
+                elif record["type"] == "finished":
+                    checkpoint.finished = True
+                    checkpoint.result = record["result"]
+        try:
+            with open(checkpoint.context_path, "r", encoding="utf-8") as file:
+                checkpoint.context = json.load(file)
+        except (OSError, ValueError):
+            pass
+        return checkpoint
+
+    def _append(self, record: dict) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def start(self, **args) -> None:
+        """Record the arguments a resumed run is restarted with."""
+        self.args = args
+        self._append({"type": "run", "args": args, "time": time.time()})
+        prune_runs(os.path.dirname(self.path))
+
+    def activate(self) -> None:
+        """Make checkpointed tools called from this task (and tasks it starts) use this log."""
+        _current_run.set(self)
+
+    def attach(self, ctx) -> None:
+        """Snapshot `ctx`, a running handler's context, after each checkpointed tool."""
+        self._ctx = ctx
+
+    def restore(self, workflow):
+        """A `Context` for `workflow` from the last snapshot, or None if there is none."""
+        if self.context is None:
+            return None
+        from llama_index.core.workflow import Context, JsonSerializer
+
+        return Context.from_dict(workflow, self.context, serializer=JsonSerializer())
+
+    def record_tool(self, key: str, tool: str, result) -> None:
+        self.results[key] = result
+        self._append({"type": "tool", "key": key, "tool": tool, "result": result})
+
+    def snapshot(self) -> None:
+        """Replace the saved `Context` with the attached one's current state."""
+        if self._ctx is None:
+            return
+        from llama_index.core.workflow import JsonSerializer
+
+        self.context = self._ctx.to_dict(serializer=JsonSerializer())
+        directory = os.path.dirname(self.context_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so a crash never leaves half a snapshot
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(self.context, file, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.context_path)
+
+    def finish(self, result) -> None:
+        self.finished = True
+        self.result = str(result)
+        self._append({"type": "finished", "result": self.result})
+        # A finished run is never resumed
+        try:
+            os.remove(self.context_path)
+        except OSError:
+            pass
+
+
+def prune_runs(directory: str = DEFAULT_CHECKPOINT_DIR, keep: int = None) -> int:
+    """Delete all but the `keep` (default `MAX_RUNS`) most recently written runs."""
+    keep = MAX_RUNS if keep is None else keep
+    logs = glob.glob(os.path.join(directory, "*.jsonl"))
+    if len(logs) <= keep:
+        return 0
+    by_age = []
+    for path in logs:
+        try:
+            by_age.append((os.path.getmtime(path), path))
+        except OSError:
+            pass  # Pruned by another process
+    by_age.sort(reverse=True)
+    for _, path in by_age[keep:]:
+        for run_file in (path, path[: -len(".jsonl")] + ".context.json"):
+            try:
+                os.remove(run_file)
+            except OSError:
+                pass
+    return max(0, len(by_age) - keep)
+
+
+def current_run() -> Optional[RunCheckpoint]:
+    return _current_run.get()
+
+
+def _call_key(name: str, args: tuple, kwargs: dict) -> str:
+    from llama_index.core.workflow import Context
+
+    # The Context a tool is handed differs between runs and isn't an input
+    parts = [repr(a) for a in args if not isinstance(a, Context)]
+    parts += [
+        f"{k}={v!r}" for k, v in sorted(kwargs.items()) if not isinstance(v, Context)
+    ]
+    return cache_key(name, *parts)
+
+
+def checkpointed(fn=None, *, ok=None):
+    """
+    Decorator recording an async tool's result in the current run's log, and
+    returning the recorded result when a resumed run calls it again with the
+    same arguments. Results failing `ok` aren't recorded, so they're retried.
+    """
+    if fn is None:
+        return functools.partial(checkpointed, ok=ok)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        checkpoint = current_run()
+        if checkpoint is None:
+            return await fn(*args, **kwargs)
+        key = _call_key(fn.__name__, args, kwargs)
+        if key in checkpoint.results:
+            print(f"Reusing {fn.__name__} result from run {checkpoint.run_id}")
+            return checkpoint.results[key]
+        try:
+            result = await fn(*args, **kwargs)
+            if ok is None or ok(result):
+                checkpoint.record_tool(key, fn.__name__, result)
+        finally:
+            # The workflow is still running here, so the snapshot shows this
+            # step in progress and resuming restarts just the unfinished steps
+            try:
+                checkpoint.snapshot()
+            except Exception as e:
+                print(f"Couldn't save run {checkpoint.run_id}'s context: {e}")
+        return result
+
+    return wrapper
+
+
+__all__ = [
+    "DEFAULT_CHECKPOINT_DIR",
+    "MAX_RUNS",
+    "RunCheckpoint",
+    "checkpointed",
+    "current_run",
+    "new_run_id",
+    "prune_runs",
+]
@@ -0,0 +1,239 @@
+import asyncio
+import functools
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from .fetch import get_http_session, parse_job_page
+from .postings import JobPosting
+
+# The guest endpoint serves the same job cards as the public search page,
+# 25 at a time, and accepts a `start` offset for pagination.
+LINKEDIN_SEARCH_URL = (
+    "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+)
+PAGE_SIZE = 25
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def parse_search_cards(html: str) -> list[dict]:
+    """
+    Extract title, company, location and link from each job card on a search page.
+
+    Cards that can't be parsed are kept with an `error` key instead of dropped.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    cards = []
+    for job in soup.find_all("div", class_="base-card"):
+        try:
+            cards.append(
+                {
+                    "title": job.find("h3", class_="base-search-card__title").get_text(
+                        strip=True
+                    ),
+                    "company": job.find(
+                        "h4", class_="base-search-card__subtitle"
+                    ).get_text(strip=True),
+                    "location": job.find(
+                        "span", class_="job-search-card__location"
+                    ).get_text(strip=True),
+                    "link": job.find("a", class_="base-card__full-link")["href"],
+                }
+            )
+        except Exception as e:
+            print(f"Error processing job card: {e}")
+            link = job.find("a", href=True)
+            cards.append(
+                {"link": link["href"] if link else "", "error": f"Bad job card: {e}"}
+            )
+    return cards
+
+
+class JobCrawler:
+    """
+    Concurrent LinkedIn search crawler.
+
+    Search pages are walked with the `start` offset until a page comes back
+    empty or `max_jobs` cards were seen. Each card's posting is fetched on a
+    shared keep-alive session, with at most `concurrency` requests in flight,
+    at most `rate` requests per second, and exponential backoff on transient
+    failures. Postings are yielded as soon as each one completes.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session = None,
+        concurrency: int = 8,
+        rate: Optional[float] = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        search_url: str = None,
+    ):
+        self.session = session or get_http_session()
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # LINKEDIN_SEARCH_URL points crawls elsewhere, e.g. at a fixture server
+        self.search_url = search_url or os.getenv(
+            "LINKEDIN_SEARCH_URL", LINKEDIN_SEARCH_URL
+        )
+        self._bucket = TokenBucket(rate) if rate else None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # requests is blocking; give every in-flight request its own thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="crawler"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    async def get(self, url: str, params: dict = None) -> str:
+        """GET `url` under the concurrency and rate limits, retrying transient errors."""
+        for attempt in range(self.retries + 1):
+            async with self._semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                try:
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        self._executor,
+                        functools.partial(
+                            self.session.get, url, params=params, timeout=self.timeout
+                        ),
+                    )
+                    if response.status_code == 200:
+                        return response.text
+                    error = f"HTTP {response.status_code}"
+                    retryable = response.status_code in RETRY_STATUSES
+                except requests.RequestException as e:
+                    error = str(e)
+                    retryable = True
+            if not retryable or attempt == self.retries:
+                raise RuntimeError(f"Failed to retrieve {url}: {error}")
+            await asyncio.sleep(self.backoff * 2**attempt * (1 + random.random()))
+
+    async def search_pages(
+        self, keywords: str, location: str, max_jobs: int
+    ) -> AsyncIterator[list[dict]]:
+        seen = 0
+        start = 0
+        while seen < max_jobs:
+            html = await self.get(
+                self.search_url,
+                params={"keywords": keywords, "location": location, "start": start},
+            )
+            cards = parse_search_cards(html)
+            if not cards:
+                return
+            cards = cards[: max_jobs - seen]
+            seen += len(cards)
+            start += PAGE_SIZE
+            yield cards
+
+    async def fetch_posting(self, card: dict) -> JobPosting:
+        if card.get("error"):
+            return JobPosting.from_card(card, error=card["error"])
+        try:
+            details = parse_job_page(await self.get(card["link"]))
+        except Exception as e:
+            print(f"Error processing job: {e}")
+            return JobPosting.from_card(card, error=str(e))
+        if details is None:
+            return JobPosting.from_card(card, error="Job description not found")
+        return JobPosting.from_card(card, description=details["description"])
+
+    async def crawl(
+        self, keywords: str, location: str, max_jobs: int = 100
+    ) -> AsyncIterator[JobPosting]:
+        """
+        Yield `JobPosting` records in completion order while later pages are
+        still loading. A posting that fails comes through with `error` set
+        rather than ending the crawl.
+        """
+        results = asyncio.Queue()
+        pending = set()
+
+        async def fetch(card):
+            await results.put(await self.fetch_posting(card))
+
+        async def paginate():
+            async for cards in self.search_pages(keywords, location, max_jobs):
+                for card in cards:
+                    pending.add(asyncio.create_task(fetch(card)))
+
+        pager = asyncio.create_task(paginate())
+        received = 0
+        try:
+            while True:
+                if pager.done():
+                    if pager.exception() is not None:
+                        raise pager.exception()
+                    if received == len(pending):
+                        return
+                    posting = await results.get()
+                else:
+                    getter = asyncio.ensure_future(results.get())
+                    await asyncio.wait(
+                        {getter, pager}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not getter.done():
+                        getter.cancel()
+                        continue
+                    posting = getter.result()
+                received += 1
+                yield posting
+        finally:
+            pager.cancel()
+            for task in pending:
+                task.cancel()
+
+
+async def crawl_linkedin_jobs(
+    keywords: str, location: str, max_jobs: int = 100, **crawler_kwargs
+) -> AsyncIterator[JobPosting]:
+    """Convenience wrapper: stream postings for a search with a fresh `JobCrawler`."""
+    crawler = JobCrawler(**crawler_kwargs)
+    try:
+        async for posting in crawler.crawl(keywords, location, max_jobs=max_jobs):
+            yield posting
+    finally:
+        crawler.close()
+
+
+__all__ = [
+    "JobCrawler",
+    "TokenBucket",
+    "crawl_linkedin_jobs",
+    "parse_search_cards",
+]
@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import traceback
+from typing import Optional
+
+from .cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SOCKET = os.getenv(
+    "CV_DAEMON_SOCKET", os.path.join(DEFAULT_CACHE_DIR, "daemon.sock")
+)
+# Ends a response; followed by the command's exit code
+EXIT_MARKER = "\x00exit "
+
+
+class _SocketOut(io.TextIOBase):
+    """A text stream writing to a client connection, for `redirect_stdout`."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not self.writer.is_closing():
+            self.writer.write(text.encode("utf-8"))
+        return len(text)
+
+
+def warm() -> None:
+    """Import everything a command needs, so requests don't pay for it."""
+    from llama_index.core.agent.workflow import AgentWorkflow  # noqa: F401
+    from llama_index.llms.openai import OpenAI  # noqa: F401
+
+    from . import pipeline, registry, render  # noqa: F401
+
+    for spec in registry.TOOLS.values():
+        spec.load()
+    # Start a browser for pages plain HTTP can't parse, without holding up
+    # the socket while Chrome boots
+    threading.Thread(target=_warm_browser, daemon=True).start()
+
+
+def _warm_browser() -> None:
+    from .browser import get_browser_pool
+
+    try:
+        get_browser_pool().warm(1)
+    except Exception as e:
+        print(f"Couldn't start a browser ahead of time ({e}); starting on demand")
+
+
+async def _run_command(argv: list, out) -> int:
+    from .main import build_parser, execute
+
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            parser = build_parser()
+            args = parser.parse_args(argv)
+            if not args.pipeline:
+                parser.error("the daemon only runs --pipeline commands")
+            await execute(args, parser)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception:
+        out.write(traceback.format_exc())
+        return 1
+    return 0
+
+
+async def serve(path: str = DEFAULT_SOCKET) -> None:
+    """
+    Keep the imports, caches and LLM gateway warm and run commands sent by
+    `forward`, one at a time (they share the working directory and stdout).
+    The socket is only accessible to the user running the daemon.
+    """
+    warm()
+    lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        request = json.loads(await reader.readline())
+        async with lock:
+            out = _SocketOut(writer)
+            cwd = os.getcwd()
+            try:
+                os.chdir(request["cwd"])
+                code = await _run_command(request["argv"], out)
+            finally:
+                os.chdir(cwd)
+            out.write(f"{EXIT_MARKER}{code}\n")
+            with contextlib.suppress(ConnectionError):
+                await writer.drain()
+            writer.close()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    # Requests run in the client's directory and write the paths it names, so
+    # only the owner may connect; the umask closes the gap before the chmod
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(handle, path=path)
+    finally:
+        os.umask(umask)
+    os.chmod(path, 0o600)
+    print(f"Serving on {path}; run with --no-daemon to bypass it. Ctrl+C stops.")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def forward(argv: list, path: str = DEFAULT_SOCKET) -> Optional[int]:
+    """
+    Run a command in the daemon listening on `path`, streaming its output to
+    stdout. Returns its exit code, or None if no daemon is running.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:  # Stale socket left by a daemon that was killed
+        client.close()
+        return None
+    with client:
+        request = {"argv": list(argv), "cwd": os.getcwd()}
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        marker = EXIT_MARKER.encode("utf-8")
+        received = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            received += chunk
+            if marker not in received:
+                # Write whole lines; a partial marker never contains a newline
+                lines, newline, received = received.rpartition(b"\n")
+                sys.stdout.write((lines + newline).decode("utf-8"))
+                sys.stdout.flush()
+    text, _, code = received.decode("utf-8").partition(EXIT_MARKER)
+    sys.stdout.write(text)
+    sys.stdout.flush()
+    return int(code.strip() or 1)
+
+
+__all__ = [
+    "DEFAULT_SOCKET",
+    "forward",
+    "serve",
+    "warm",
+]
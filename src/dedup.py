@@ -0,0 +1,216 @@
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+from .postings import parse_job_details
+from .store import DEFAULT_STORE_PATH, JobStore
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 Jaccard usually collide
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+
+# Fixed seed, so signatures stored in the job store stay comparable
+_SEEDS = (
+    np.random.RandomState(1)
+    .randint(0, np.iinfo(np.int64).max, size=(NUM_PERM, 1), dtype=np.int64)
+    .astype(np.uint64)
+)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: a fast, well-spread 64-bit hash (wrapping arithmetic)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """CRC32 hashes of the distinct `size`-word shingles of a text."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        words = [" ".join(words)]
+        size = 1
+    hashes = {
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def minhash(text: str) -> np.ndarray:
+    """`NUM_PERM` MinHash values of a text's shingles, as uint32."""
+    # One seeded hash per permutation instead of a*x+b mod p, which keeps
+    # small shingle hashes small and biases the minimum
+    permuted = _mix(shingles(text)[None, :] ^ _SEEDS)
+    return (permuted.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive index over MinHash signatures.
+
+    Each signature is split into `bands`; two signatures become candidates
+    when any band matches exactly, so a query only looks at its buckets
+    instead of every stored signature.
+    """
+
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = {}
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [
+            signature[i * self.rows : (i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        self.signatures[key] = signature
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            bucket[band].append(key)
+
+    def query(self, signature: np.ndarray, threshold: float = THRESHOLD) -> list:
+        """Stored keys at least `threshold` similar, as `(key, similarity)`, best first."""
+        candidates = set()
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band, ()))
+        matches = []
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= threshold:
+                matches.append((key, score))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.signatures
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+
+class DuplicateDetector:
+    """
+    Groups near-duplicate postings into clusters named after their first
+    member. A posting joins the cluster of its most similar indexed posting,
+    or starts its own.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.index = LSHIndex()
+        self.clusters = {}
+        self._lock = threading.Lock()
+
+    def load(self, rows) -> None:
+        """Restore `(job_id, cluster_id, signature bytes)` rows from the store."""
+        for job_id, cluster_id, signature in rows:
+            self.index.add(job_id, np.frombuffer(signature, dtype=np.uint32))
+            self.clusters[job_id] = cluster_id
+
+    def assign(self, job_id: str, text: str) -> tuple[str, Optional[np.ndarray]]:
+        """
+        Cluster ID for a posting, and its signature if it was newly indexed
+        (None when the posting was already known).
+        """
+        with self._lock:
+            if job_id in self.index:
+                return self.clusters[job_id], None
+            signature = minhash(text)
+            matches = self.index.query(signature, self.threshold)
+            cluster_id = self.clusters[matches[0][0]] if matches else job_id
+            self.index.add(job_id, signature)
+            self.clusters[job_id] = cluster_id
+            return cluster_id, signature
+
+    def cluster_for_text(self, text: str) -> Optional[str]:
+        """Cluster of the indexed posting most similar to `text`, if any."""
+        matches = self.index.query(minhash(text), self.threshold)
+        return self.clusters[matches[0][0]] if matches else None
+
+
+def posting_text(posting) -> str:
+    """The text a posting's signature is built from."""
+    return f"{posting.title}\n{posting.description}"
+
+
+def job_posting_text(job_posting: str) -> str:
+    """
+    `posting_text` of a posting as `read_job` returns it, so looking it up
+    compares the same text its stored duplicates were signed from.
+    """
+    posting = parse_job_details(job_posting)
+    return posting_text(posting) if posting else job_posting
+
+
+def cluster_postings(postings: list, detector: DuplicateDetector = None) -> dict:
+    """Map each posting's job ID to the ID of its cluster."""
+    detector = detector or DuplicateDetector()
+    return {
+        p.job_id: detector.assign(p.job_id, posting_text(p))[0]
+        for p in postings
+        if not p.error
+    }
+
+
+def deduplicate(store, postings: list) -> dict:
+    """
+    Cluster freshly scraped postings against everything in `store` and save
+    the new signatures there. Returns job ID -> cluster ID for `postings`.
+    """
+    detector = get_detector(store.path)
+    clusters, rows = {}, []
+    for posting in postings:
+        if posting.error or not posting.job_id:
+            continue
+        cluster_id, signature = detector.assign(posting.job_id, posting_text(posting))
+        clusters[posting.job_id] = cluster_id
+        if signature is not None:
+            rows.append((posting.job_id, cluster_id, signature.tobytes()))
+    store.save_signatures(rows)
+    duplicates = sum(1 for job_id, c in clusters.items() if job_id != c)
+    if duplicates:
+        print(f"Found {duplicates} near-duplicate postings")
+    return clusters
+
+
+_detectors = {}
+_detectors_lock = threading.Lock()
+
+
+def get_detector(path: str = DEFAULT_STORE_PATH) -> DuplicateDetector:
+    """The process-wide detector for a job store, loaded from it on first use."""
+    path = os.path.abspath(path)
+    with _detectors_lock:
+        detector = _detectors.get(path)
+        if detector is None:
+            detector = DuplicateDetector()
+            if os.path.exists(path):
+                with JobStore(path) as store:
+                    detector.load(store.signatures())
+            _detectors[path] = detector
+        return detector
+
+
+__all__ = [
+    "DuplicateDetector",
+    "LSHIndex",
+    "cluster_postings",
+    "deduplicate",
+    "get_detector",
+    "job_posting_text",
+    "minhash",
+    "similarity",
+]
@@ -0,0 +1,185 @@
+import asyncio
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .browser import get_browser_pool
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Only the topcard and description nodes are parsed; the rest of the page
+# (scripts, recommendations, footer) is skipped by the parser entirely.
+_JOB_PAGE_STRAINER = SoupStrainer(
+    attrs={
+        "class": re.compile(
+            r"(?:^|\s)(?:top-card-layout__title|topcard__title|topcard__org-name-link"
+            r"|topcard__flavor--bullet|show-more-less-html__markup)(?:\s|$)"
+        )
+    }
+)
+
+# How many postings each tier served in this process, e.g. {"http": 48, "selenium": 2}
+tier_counts = Counter()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session(pool_size: int = 16) -> requests.Session:
+    """Return a process-wide keep-alive session shared by all job page fetches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            _session = session
+        return _session
+
+
+def parse_job_page(html: str) -> Optional[dict]:
+    """
+    Extract title, company, location and description from a public job page.
+
+    Returns None when the page doesn't carry the expected markup (login wall,
+    removed posting, A/B layout) so the caller can fall back to a browser.
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=_JOB_PAGE_STRAINER)
+
+    title = soup.find(class_="top-card-layout__title") or soup.find(
+        class_="topcard__title"
+    )
+    company = soup.find(class_="topcard__org-name-link")
+    location = soup.find(class_="topcard__flavor--bullet")
+    description = soup.find(class_="show-more-less-html__markup")
+    if title is None or description is None:
+        return None
+
+    job_details = {
+        "title": title.get_text(strip=True),
+        "company": company.get_text(strip=True) if company else "",
+        "location": location.get_text(strip=True) if location else "",
+        "description": description.get_text("\n", strip=True),
+    }
+    if not job_details["title"] or not job_details["description"]:
+        return None
+    return job_details
+
+
+def fetch_job_http(job_url: str, session: requests.Session = None, timeout=10):
+    """Fast tier: plain HTTP GET plus targeted parsing. Returns None on failure."""
+    session = session or get_http_session()
+    try:
+        response = session.get(job_url, timeout=timeout)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {job_url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    return parse_job_page(response.text)
+
+
+def fetch_job_selenium(driver, job_url: str) -> dict:
+    """Slow tier: render the page in a pooled browser and read the same fields."""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(job_url)
+    wait = WebDriverWait(driver, 10)
+
+    # Extract Job Details
+    job_details = {}
+
+    # Get Job Title
+    job_details["title"] = wait.until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "h1"))
+    ).text
+
+    # Get Company Name
+    job_details["company"] = wait.until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "a.topcard__org-name-link"))
+    ).text
+
+    # Get Location
+    job_details["location"] = wait.until(
+        EC.presence_of_element_located(
+            (By.CSS_SELECTOR, "span.topcard__flavor--bullet")
+        )
+    ).text
+
+    description_locator = (By.CSS_SELECTOR, "div.show-more-less-html__markup")
+
+    # Click "See more" button to expand job description if it exists. The
+    # topcard is loaded by now, so a missing button isn't waited for
+    see_more_locator = (By.CSS_SELECTOR, "button.show-more-less-html__button")
+    if not driver.find_elements(*see_more_locator):
+        print("No 'See more' button found, continuing...")
+    else:
+        try:
+            WebDriverWait(driver, 2).until(
+                EC.element_to_be_clickable(see_more_locator)
+            ).click()
+            # Wait for the description to drop its clamp class instead of sleeping
+            WebDriverWait(driver, 2).until(
+                lambda d: "clamp"
+                not in (
+                    d.find_element(*description_locator).get_attribute("class") or ""
+                )
+            )
+        except TimeoutException:
+            print("'See more' didn't expand the description in time, continuing...")
+        except Exception as e:
+            print(f"Couldn't expand the description ({e}), continuing...")
+
+    # Extract Job Description
+    job_details["description"] = wait.until(
+        EC.presence_of_element_located(description_locator)
+    ).text
+
+    return job_details
+
+
+async def fetch_job(job_url: str, session: requests.Session = None, browser_pool=None):
+    """
+    Fetch a job posting through the cheapest tier that works.
+
+    Returns `(job_details, tier)` where tier is "http" or "selenium".
+    Selenium is only used when the HTTP response can't be parsed.
+    """
+    job_details = await asyncio.to_thread(fetch_job_http, job_url, session)
+    if job_details is not None:
+        tier_counts["http"] += 1
+        return job_details, "http"
+
+    pool = browser_pool or get_browser_pool()
+    job_details = await pool.run(fetch_job_selenium, job_url)
+    tier_counts["selenium"] += 1
+    return job_details, "selenium"
+
+
+__all__ = [
+    "fetch_job",
+    "fetch_job_http",
+    "fetch_job_selenium",
+    "get_http_session",
+    "parse_job_page",
+    "tier_counts",
+]
@@ -0,0 +1,1113 @@
+import re
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterator
+
+_TOKEN_RE = re.compile(
+    r"""
+    \\(?P<cmd>[A-Za-z@]+\*?)
+    |\\(?P<sym>.)
+    |(?P<comment>%[^\n]*\n?)
+    |\$(?P<math>[^$]*)\$
+    |(?P<par>\n[ \t]*\n\s*)
+    |(?P<nl>\n)
+    |(?P<open>\{)
+    |(?P<close>\})
+    |(?P<lbrack>\[)
+    |(?P<rbrack>\])
+    |(?P<text>[^\\{}\[\]%$\n]+|\$)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+@dataclass
+class Token:
+    kind: str
+    value: str
+    raw: str
+
+
+def tokenize(source: str) -> Iterator[Token]:
+    """Lazily split LaTeX source into commands, braces, math, comments and text."""
+    for match in _TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        value = match.group(kind)
+        yield Token(kind, value, match.group(0))
+
+
+def raw_text(tokens) -> str:
+    return "".join(token.raw for token in tokens)
+
+
+class TokenStream:
+    """Token iterator with pushback and balanced-group helpers."""
+
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self._buffer = deque()
+
+    def next(self):
+        if self._buffer:
+            return self._buffer.popleft()
+        return next(self._tokens, None)
+
+    def peek(self):
+        if not self._buffer:
+            token = next(self._tokens, None)
+            if token is None:
+                return None
+            self._buffer.append(token)
+        return self._buffer[0]
+
+    def push(self, token) -> None:
+        self._buffer.appendleft(token)
+
+    def skip_spaces(self) -> list:
+        """Skip inline whitespace (not blank lines) and return what was skipped."""
+        skipped = []
+        while True:
+            token = self.peek()
+            if token is None:
+                return skipped
+            if (token.kind == "text" and not token.value.strip()) or token.kind in (
+                "nl",
+                "comment",
+            ):
+                skipped.append(self.next())
+            else:
+                return skipped
+
+    def read_balanced(self, close_kind: str = "close") -> list:
+        """Read tokens up to the matching closer; the opener was already consumed."""
+        open_kind = "open" if close_kind == "close" else "lbrack"
+        depth = 1
+        tokens = []
+        while True:
+            token = self.next()
+            if token is None:
+                return tokens
+            if token.kind == open_kind:
+                depth += 1
+            elif token.kind == close_kind:
+                depth -= 1
+                if depth == 0:
+                    return tokens
+            tokens.append(token)
+
+    def read_group(self):
+        """Read a `{...}` argument, or None if the next token doesn't open one."""
+        skipped = self.skip_spaces()
+        token = self.peek()
+        if token is None or token.kind != "open":
+            for token in reversed(skipped):
+                self.push(token)
+            return None
+        self.next()
+        return self.read_balanced("close")
+
+    def read_optional(self):
+        """Read a `[...]` argument, or None if there isn't one."""
+        token = self.peek()
+        if token is None or token.kind != "lbrack":
+            return None
+        self.next()
+        return self.read_balanced("rbrack")
+
+    def read_arg(self):
+        """Read one macro argument: a `{...}` group or a single token."""
+        group = self.read_group()
+        if group is not None:
+            return group
+        self.skip_spaces()
+        token = self.next()
+        return [token] if token is not None else []
+
+
+@dataclass
+class Macro:
+    nargs: int
+    body: str
+
+
+@dataclass
+class Environment:
+    nargs: int
+    is_list: bool
+
+
+@dataclass
+class Definitions:
+    """Macros and environments defined with \\newcommand / \\newenvironment."""
+
+    commands: dict = field(default_factory=dict)
+    environments: dict = field(default_factory=dict)
+
+
+def parse_definitions(source: str) -> Definitions:
+    """Collect `\\newcommand` and `\\newenvironment` definitions from LaTeX source."""
+    definitions = Definitions()
+    stream = TokenStream(tokenize(source))
+    while True:
+        token = stream.next()
+        if token is None:
+            return definitions
+        if token.kind != "cmd":
+            continue
+        if token.value in ("newcommand", "renewcommand", "providecommand"):
+            name = stream.read_arg()
+            nargs = stream.read_optional()
+            stream.read_optional()  # default value of the first argument
+            body = stream.read_group()
+            name = raw_text(name).strip().lstrip("\\")
+            if name and body is not None:
+                definitions.commands[name] = Macro(
+                    int(raw_text(nargs).strip() or 0) if nargs else 0,
+                    raw_text(body),
+                )
+        elif token.value in ("newenvironment", "renewenvironment"):
+            name = stream.read_group()
+            nargs = stream.read_optional()
+            stream.read_optional()
+            begin = stream.read_group()
+            stream.read_group()
+            if name is not None and begin is not None:
+                begin = raw_text(begin)
+                definitions.environments[raw_text(name).strip()] = Environment(
+                    int(raw_text(nargs).strip() or 0) if nargs else 0,
+                    bool(re.search(r"\\begin\{(itemize|enumerate)\}", begin)),
+                )
+
+
+def split_document(source: str) -> tuple[str, str, str]:
+    """
+    Split LaTeX source into `(preamble, body, tail)`.
+
+    The preamble runs through `\\begin{document}` and the tail starts at
+    `\\end{document}`, so `preamble + body + tail == source`. Sources without
+    a document environment are all body.
+    """
+    begin = re.search(r"\\begin\s*\{document\}", source)
+    if begin is None:
+        return "", source, ""
+    end = None
+    for end in re.finditer(r"\\end\s*\{document\}", source):
+        pass
+    if end is None or end.start() < begin.end():
+        return source[: begin.end()], source[begin.end() :], ""
+    return (
+        source[: begin.end()],
+        source[begin.end() : end.start()],
+        source[end.start() :],
+    )
+
+
+_COMMENT_LINE_RE = re.compile(r"^[ \t]*(?<!\\)%[^\n]*\n", re.MULTILINE)
+_INLINE_COMMENT_RE = re.compile(r"(?<!\\)%[^\n]*")
+
+
+def compact_body(body: str, strip_comments: bool = True) -> str:
+    """
+    Shrink a document body without changing what it typesets.
+
+    Whole-line comments are removed, inline comments are cut down to the bare
+    `%` (which still swallows the newline), indentation and trailing spaces
+    are dropped and runs of blank lines become one.
+    """
+    if strip_comments:
+        body = _COMMENT_LINE_RE.sub("", body)
+        body = _INLINE_COMMENT_RE.sub("%", body)
+    body = re.sub(r"^[ \t]+|[ \t]+$", "", body, flags=re.MULTILINE)
+    return re.sub(r"\n{3,}", "\n\n", body)
+
+
+@dataclass
+class LatexParts:
+    """A LaTeX document split so only its body needs to go through an LLM."""
+
+    preamble: str
+    body: str
+    tail: str
+    definitions: Definitions
+
+    def defined_names(self) -> str:
+        """Custom environments and commands the body may use, for the prompt."""
+        names = [f"{{{name}}}" for name in self.definitions.environments]
+        names += [f"\\{name}" for name in self.definitions.commands]
+        return ", ".join(names)
+
+
+def split_latex(source: str) -> LatexParts:
+    preamble, body, tail = split_document(source)
+    return LatexParts(
+        preamble=preamble,
+        body=body,
+        tail=tail,
+        definitions=parse_definitions(preamble),
+    )
+
+
+def extract_body(text: str) -> str:
+    """
+    Recover a document body from LLM output.
+
+    Markdown code fences are removed, and if the model echoed a full document
+    anyway only the part between `\\begin{document}` and `\\end{document}` is kept.
+    """
+    text = re.sub(r"^\s*```[a-zA-Z]*\s*\n", "", text)
+    text = re.sub(r"\n\s*```\s*$", "\n", text)
+    preamble, body, tail = split_document(text)
+    if preamble or tail:
+        return body
+    return text
+
+
+_SECTION_RE = re.compile(r"^[ \t]*\\section\*?\s*\{", re.MULTILINE)
+_TRAILER_RE = re.compile(r"(?:\s*\\vspace\*?\{[^}]*\})*\s*$")
+
+
+@dataclass
+class Section:
+    """A slice of the document body: the part before the first \\section, or one section."""
+
+    title: str
+    text: str
+    trailer: str = ""
+
+    @property
+    def source(self) -> str:
+        return self.text + self.trailer
+
+
+def split_sections(body: str) -> list:
+    """
+    Split a document body at each `\\section`, keeping every byte.
+
+    Trailing `\\vspace`s and blank lines before the next section are kept in
+    `trailer` so they survive a rewrite of the section itself.
+    """
+    starts = [m.start() for m in _SECTION_RE.finditer(body)]
+    bounds = [0] + starts + [len(body)]
+    sections = []
+    for start, end in zip(bounds, bounds[1:]):
+        chunk = body[start:end]
+        if not chunk:
+            continue
+        match = re.match(r"\s*\\section\*?\s*\{([^}]*)\}", chunk)
+        title = match.group(1).strip() if match else ""
+        trailer = _TRAILER_RE.search(chunk)
+        cut = trailer.start() if trailer else len(chunk)
+        sections.append(Section(title=title, text=chunk[:cut], trailer=chunk[cut:]))
+    return sections
+
+
+_BALANCE_RE = re.compile(
+    r"\\begin\s*\{([^{}]*)\}|\\end\s*\{([^{}]*)\}|\\.|%[^\n]*\n|[{}]", re.DOTALL
+)
+
+
+def _escaped(text: str, index: int) -> bool:
+    """Whether `text[index]` follows an odd run of backslashes."""
+    start = index
+    while start > 0 and text[start - 1] == "\\":
+        start -= 1
+    return (index - start) % 2 == 1
+
+
+class BalanceChecker:
+    """
+    Incremental brace and `\\begin`/`\\end` balance check for streamed LaTeX.
+
+    Feed chunks as they arrive; `feed` returns an error message as soon as the
+    text can no longer be balanced (a stray `}`, a mismatched `\\end`, or
+    nesting deeper than `max_depth`). `close` checks that everything opened
+    was closed.
+    """
+
+    def __init__(self, max_depth: int = 32):
+        self.max_depth = max_depth
+        self.depth = 0
+        self.environments = []
+        self.error = None
+        self._pending = ""
+
+    def feed(self, text: str):
+        if self.error:
+            return self.error
+        self._pending += text
+        # Hold back a trailing command or unfinished comment split across chunks.
+        # A backslash closing a `\\` line break starts nothing, so it isn't held
+        cut = len(self._pending)
+        backslash = self._pending.rfind("\\", max(0, cut - 64))
+        if (
+            backslash != -1
+            and "\n" not in self._pending[backslash:]
+            and not _escaped(self._pending, backslash)
+        ):
+            cut = backslash
+        comment = self._pending.rfind("%", 0, cut)
+        if comment != -1 and "\n" not in self._pending[comment:cut]:
+            if not _escaped(self._pending, comment):
+                cut = comment
+        ready, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._check(ready)
+
+    def _check(self, text: str):
+        for match in _BALANCE_RE.finditer(text):
+            token = match.group(0)
+            if match.group(1) is not None:
+                self.environments.append(match.group(1).strip())
+            elif match.group(2) is not None:
+                name = match.group(2).strip()
+                if not self.environments:
+                    self.error = f"\\end{{{name}}} without a matching \\begin"
+                elif self.environments[-1] != name:
+                    self.error = (
+                        f"\\end{{{name}}} closes \\begin{{{self.environments[-1]}}}"
+                    )
+                else:
+                    self.environments.pop()
+            elif token == "{":
+                self.depth += 1
+                if self.depth > self.max_depth:
+                    self.error = f"braces nested deeper than {self.max_depth}"
+            elif token == "}":
+                self.depth -= 1
+                if self.depth < 0:
+                    self.error = "unbalanced '}'"
+            if self.error:
+                return self.error
+        return None
+
+    def close(self):
+        """Check the remaining text; returns an error if anything is left open."""
+        pending, self._pending = self._pending, ""
+        if self._check(pending + "\n"):
+            return self.error
+        if self.environments:
+            self.error = f"\\begin{{{self.environments[-1]}}} is never closed"
+        elif self.depth:
+            self.error = f"{self.depth} unclosed '{{'"
+        return self.error
+
+
+# Markdown wrappers for inline formatting commands.
+_INLINE = {
+    "textbf": "**",
+    "textit": "*",
+    "emph": "*",
+    "textsl": "*",
+    "texttt": "`",
+    "underline": "",
+    "textsc": "",
+    "textrm": "",
+    "textsf": "",
+    "textmd": "",
+    "textup": "",
+    "textnormal": "",
+    "mbox": "",
+    "makebox": "",
+    "text": "",
+}
+
+_HEADINGS = {
+    "section": "## ",
+    "subsection": "### ",
+    "subsubsection": "#### ",
+    "paragraph": "**",
+}
+
+# Layout commands dropped along with their (brace) arguments.
+_DROP_WITH_ARGS = {
+    "vspace": 1,
+    "hspace": 1,
+    "fontsize": 2,
+    "setlength": 2,
+    "addtolength": 2,
+    "setcounter": 2,
+    "color": 1,
+    "linespread": 1,
+    "needspace": 1,
+    "label": 1,
+    "pagestyle": 1,
+    "thispagestyle": 1,
+    "pagenumbering": 1,
+    "hypersetup": 1,
+    "addvspace": 1,
+    "rule": 2,
+    "phantom": 1,
+}
+
+_LITERALS = {
+    "textbar": "|",
+    "textbullet": "•",
+    "bullet": "•",
+    "cdot": "·",
+    "ldots": "…",
+    "dots": "…",
+    "textendash": "–",
+    "textemdash": "—",
+    "textasciitilde": "~",
+    "textasciicircum": "^",
+    "textbackslash": "\\",
+    "textless": "<",
+    "textgreater": ">",
+    "LaTeX": "LaTeX",
+    "TeX": "TeX",
+    "copyright": "©",
+    "times": "×",
+    "pm": "±",
+    "sim": "~",
+    "approx": "≈",
+    "leq": "≤",
+    "geq": "≥",
+    "to": "→",
+    "rightarrow": "→",
+    "quad": " ",
+    "qquad": " ",
+    "newline": "\n",
+    "linebreak": "\n",
+    "par": "\n\n",
+    "hrule": "\n\n---\n\n",
+    "titlerule": "\n\n---\n\n",
+}
+
+_DROP = {
+    "selectfont",
+    "normalsize",
+    "small",
+    "footnotesize",
+    "scriptsize",
+    "tiny",
+    "large",
+    "Large",
+    "LARGE",
+    "huge",
+    "Huge",
+    "centering",
+    "raggedright",
+    "raggedleft",
+    "noindent",
+    "bfseries",
+    "itshape",
+    "mdseries",
+    "upshape",
+    "rmfamily",
+    "sffamily",
+    "ttfamily",
+    "hfill",
+    "vfill",
+    "newpage",
+    "clearpage",
+    "pagebreak",
+    "smallskip",
+    "medskip",
+    "bigskip",
+    "null",
+    "relax",
+    "protect",
+    "maketitle",
+    "displaystyle",
+    "nopagebreak",
+    "strut",
+}
+
+_SYMBOLS = {
+    "\\": "\x01\n",
+    ",": " ",
+    " ": " ",
+    ";": " ",
+    "-": "",
+    "/": "",
+    "@": "",
+    "\n": " ",
+}
+
+_LIST_ENVIRONMENTS = {"itemize": "-", "enumerate": "1.", "description": "-"}
+_TRANSPARENT_ENVIRONMENTS = {
+    "document",
+    "center",
+    "flushleft",
+    "flushright",
+    "minipage",
+    "quote",
+    "quotation",
+    "small",
+    "footnotesize",
+    "multicols",
+}
+
+FRAGMENT_MARK = "\x00"
+
+
+@dataclass
+class MarkdownConversion:
+    """
+    Result of converting LaTeX locally.
+
+    `markdown` carries a placeholder for each entry in `fragments`, the raw
+    LaTeX the converter couldn't map; `unknown` names the constructs involved.
+    """
+
+    markdown: str
+    fragments: list = field(default_factory=list)
+    unknown: list = field(default_factory=list)
+
+    def fill(self, converted: list = None) -> str:
+        """Substitute converted fragments (or the raw LaTeX) into the placeholders."""
+        converted = converted if converted is not None else self.fragments
+
+        def replace(match):
+            return converted[int(match.group(1))]
+
+        return re.sub(f"{FRAGMENT_MARK}(\\d+){FRAGMENT_MARK}", replace, self.markdown)
+
+
+class _Converter:
+    def __init__(self, definitions: Definitions):
+        self.definitions = definitions
+        self.fragments = []
+        self.unknown = set()
+        self.lists = []
+        self.depth = 0
+
+    def fragment(self, name: str, raw: str) -> str:
+        self.unknown.add(name)
+        self.fragments.append(raw)
+        return f"{FRAGMENT_MARK}{len(self.fragments) - 1}{FRAGMENT_MARK}"
+
+    def convert_tokens(self, tokens) -> str:
+        return self.convert(TokenStream(tokens))
+
+    def convert(self, stream: TokenStream) -> str:
+        out = []
+        while True:
+            token = stream.next()
+            if token is None:
+                return "".join(out)
+            if token.kind == "cmd" and token.value == "item":
+                # Items start on their own line; drop whitespace left before them
+                while out and not out[-1].strip():
+                    out.pop()
+                if out:
+                    out[-1] = out[-1].rstrip()
+            out.append(self.convert_token(token, stream))
+
+    def convert_token(self, token: Token, stream: TokenStream) -> str:
+        kind = token.kind
+        if kind == "text":
+            return _typography(token.value)
+        if kind in ("nl", "comment"):
+            return "\n" if kind == "nl" or token.value.endswith("\n") else ""
+        if kind == "par":
+            return "\n\n"
+        if kind == "open":
+            return self.convert_tokens(stream.read_balanced("close"))
+        if kind in ("close", "lbrack", "rbrack"):
+            return {"close": "", "lbrack": "[", "rbrack": "]"}[kind]
+        if kind == "math":
+            return self.convert_math(token)
+        if kind == "sym":
+            if token.value == "\\":
+                # A forced line break already ends the line
+                stream.skip_spaces()
+            return _SYMBOLS.get(token.value, token.value)
+        return self.convert_command(token, stream)
+
+    def convert_math(self, token: Token) -> str:
+        text = re.sub(
+            r"\\([A-Za-z]+|.)",
+            lambda m: (
+                _LITERALS.get(m.group(1), m.group(0))
+                if len(m.group(1)) > 1
+                else m.group(1)
+            ),
+            token.value,
+        )
+        if "\\" in text or "^" in text or "_" in text:
+            return token.raw
+        return text.replace("{", "").replace("}", "")
+
+    def convert_command(self, token: Token, stream: TokenStream) -> str:
+        name = token.value
+        base = name.rstrip("*")
+
+        if base in ("begin", "end"):
+            env = stream.read_group()
+            env_name = raw_text(env or []).strip()
+            if base == "end":
+                # Stray \end (its \begin was handled by the caller): drop it
+                return ""
+            return self.convert_environment(env_name, token, env or [], stream)
+
+        if name == "item":
+            label = stream.read_optional()
+            stream.skip_spaces()
+            marker, counter = self.lists[-1] if self.lists else ("-", 0)
+            if self.lists and marker == "1.":
+                self.lists[-1] = (marker, counter + 1)
+                marker = f"{counter + 1}."
+            indent = "  " * max(len(self.lists) - 1, 0)
+            prefix = f"\n{indent}{marker} "
+            if label is not None:
+                return f"{prefix}**{self.convert_tokens(label).strip()}** "
+            return prefix
+
+        if base in _HEADINGS:
+            stream.read_optional()
+            title = self.convert_tokens(stream.read_arg()).strip()
+            prefix = _HEADINGS[base]
+            if prefix == "**":
+                return f"\n\n**{title}** "
+            return f"\n\n{prefix}{title}\n\n"
+
+        if name in _INLINE:
+            if name == "makebox":
+                stream.read_optional()
+                stream.read_optional()
+            inner = self.convert_tokens(stream.read_arg())
+            mark = _INLINE[name]
+            if not mark or not inner.strip():
+                return inner
+            # Keep surrounding spaces outside the markers so markdown parses them
+            lead = inner[: len(inner) - len(inner.lstrip())]
+            trail = inner[len(inner.rstrip()) :]
+            return f"{lead}{mark}{inner.strip()}{mark}{trail}"
+
+        if name == "href":
+            url = raw_text(stream.read_arg()).strip()
+            text = self.convert_tokens(stream.read_arg()).strip()
+            return f"[{text}]({url})"
+        if name == "url":
+            url = raw_text(stream.read_arg()).strip()
+            return f"<{url}>"
+
+        if base in _DROP_WITH_ARGS:
+            stream.read_optional()
+            for _ in range(_DROP_WITH_ARGS[base]):
+                stream.read_group()
+            return ""
+        if name in _DROP:
+            return ""
+        if name in _LITERALS:
+            return _LITERALS[name]
+
+        macro = self.definitions.commands.get(name)
+        if macro is not None and self.depth < 20:
+            args = [raw_text(stream.read_arg()) for _ in range(macro.nargs)]
+            body = re.sub(r"#(\d)", lambda m: args[int(m.group(1)) - 1], macro.body)
+            self.depth += 1
+            try:
+                return self.convert_tokens(tokenize(body))
+            finally:
+                self.depth -= 1
+
+        # Unknown command: hand it and its arguments to the fallback
+        raw = [token]
+        while True:
+            optional = stream.read_optional()
+            if optional is not None:
+                raw += [Token("lbrack", "[", "["), *optional, Token("rbrack", "]", "]")]
+                continue
+            group = stream.read_group()
+            if group is None:
+                break
+            raw += [Token("open", "{", "{"), *group, Token("close", "}", "}")]
+        return self.fragment(f"\\{name}", raw_text(raw))
+
+    def convert_environment(self, name, begin_token, name_tokens, stream) -> str:
+        body = self.read_environment(name, stream)
+        base = name.rstrip("*")
+
+        if base in _LIST_ENVIRONMENTS or base in _TRANSPARENT_ENVIRONMENTS:
+            inner = TokenStream(body)
+            inner.read_optional()
+            if base in ("minipage", "multicols"):
+                inner.read_group()
+            if base in _LIST_ENVIRONMENTS:
+                return self.convert_list(_LIST_ENVIRONMENTS[base], inner)
+            return self.convert(inner)
+
+        custom = self.definitions.environments.get(name)
+        if custom is not None:
+            inner = TokenStream(body)
+            inner.read_optional()
+            args = [
+                self.convert_tokens(inner.read_arg()).strip()
+                for _ in range(custom.nargs)
+            ]
+            lead = " ".join(a for a in args if a)
+            lead = f"\n{lead}\n" if lead else ""
+            if custom.is_list:
+                return lead + self.convert_list("-", inner)
+            text = lead + self.convert(inner)
+            if name == "header":
+                # The first line of the header is the candidate's name
+                text = re.sub(r"^\s*(\S)", r"\n# \1", text, count=1)
+            return text
+
+        raw = f"{begin_token.raw}{{{raw_text(name_tokens)}}}{raw_text(body)}\\end{{{name}}}"
+        return self.fragment(f"{{{name}}}", raw)
+
+    def convert_list(self, marker: str, stream: TokenStream) -> str:
+        self.lists.append((marker, 0))
+        try:
+            return "\n" + self.convert(stream) + "\n\n"
+        finally:
+            self.lists.pop()
+
+    @staticmethod
+    def read_environment(name: str, stream: TokenStream) -> list:
+        """Read tokens up to the `\\end{name}` matching an already-consumed `\\begin`."""
+        body = []
+        depth = 1
+        while True:
+            token = stream.next()
+            if token is None:
+                return body
+            if token.kind == "cmd" and token.value in ("begin", "end"):
+                group = stream.read_group()
+                if group is not None and raw_text(group).strip() == name:
+                    depth += 1 if token.value == "begin" else -1
+                    if depth == 0:
+                        return body
+                body.append(token)
+                if group is not None:
+                    body += [Token("open", "{", "{"), *group, Token("close", "}", "}")]
+                continue
+            body.append(token)
+
+
+def _typography(text: str) -> str:
+    return (
+        text.replace("---", "—")
+        .replace("--", "–")
+        .replace("``", "“")
+        .replace("''", "”")
+        .replace("~", " ")
+    )
+
+
+def _tidy(markdown: str) -> str:
+    lines = []
+    for line in markdown.split("\n"):
+        line = re.sub(r"[ \t]+", " ", line).strip()
+        if line.endswith("\x01"):
+            line = line[:-1].rstrip() + "  "
+        lines.append(line.replace("\x01", ""))
+    markdown = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip() + "\n"
+
+
+def latex_to_markdown(source: str) -> MarkdownConversion:
+    """
+    Convert a LaTeX CV to markdown without an LLM.
+
+    Sections, lists, inline formatting, links, common layout macros and
+    environments/commands defined in the preamble are mapped locally.
+    Anything else is left as a placeholder fragment for a fallback converter.
+    """
+    preamble, body, _ = split_document(source)
+    converter = _Converter(parse_definitions(preamble))
+    markdown = _tidy(converter.convert(TokenStream(tokenize(body))))
+    return MarkdownConversion(
+        markdown=markdown,
+        fragments=converter.fragments,
+        unknown=sorted(converter.unknown),
+    )
+
+
+# Commands and environments that need no definition: the LaTeX kernel, the
+# common article-class commands, and everything the converter maps.
+_STANDARD_COMMANDS = {
+    *_INLINE,
+    *_HEADINGS,
+    *_DROP_WITH_ARGS,
+    *_LITERALS,
+    *_DROP,
+    *"""
+    begin end item section subsection subsubsection paragraph subparagraph
+    part chapter title author date today thanks footnote footnotemark
+    footnotetext textsuperscript textsubscript textup textcolor colorbox
+    fbox framebox parbox raisebox resizebox scalebox includegraphics
+    hline cline multicolumn multirow tabularnewline arraybackslash
+    ref pageref cite nocite caption index hfil vfil hss vss kern
+    hskip vskip enspace thinspace negthinspace space nobreakspace
+    ldots cdots vdots ddots dag ddag S P pounds euro textregistered
+    texttrademark textdegree textperiodcentered textquotesingle
+    textquotedbl textsterling textellipsis alpha beta gamma delta epsilon
+    lambda mu pi sigma theta omega infty sum prod int frac sqrt cdot mid
+    le ge ne neq ll gg in notin subset supset cup cap leftarrow
+    Rightarrow Leftarrow leftrightarrow uparrow downarrow star ast circ
+    diamond checkmark bigskip medskip smallskip vspace hspace newline
+    linebreak nolinebreak pagebreak nopagebreak enlargethispage
+    baselineskip baselinestretch parindent parskip textwidth linewidth
+    columnwidth textheight paperwidth paperheight tabcolsep arraystretch
+    itemsep topsep leftmargin labelsep fill stretch the value arabic
+    roman Roman alph Alph fnsymbol stepcounter addtocounter refstepcounter
+    newcommand renewcommand providecommand newenvironment renewenvironment
+    newcounter newlength settowidth settoheight def let edef gdef
+    makeatletter makeatother ifthenelse equal isundefined whiledo
+    usepackage documentclass input include includeonly hyphenation
+    emph textnormal em it bf sl sc tt rm sf normalfont boldmath
+    unboldmath ensuremath mathrm mathbf mathit mathsf mathtt mathcal
+    left right big Big bigg Bigg lbrace rbrace langle rangle vert Vert
+    verb url nolinkurl href hyperlink hypertarget
+    """.split(),
+}
+
+_STANDARD_ENVIRONMENTS = {
+    *_LIST_ENVIRONMENTS,
+    *_TRANSPARENT_ENVIRONMENTS,
+    *"""
+    verse verbatim tabular tabular* tabbing array table table* figure
+    figure* equation equation* align align* gather gather* math
+    displaymath abstract titlepage thebibliography list trivlist
+    """.split(),
+}
+
+# Commands and environments provided by the packages CVs commonly load.
+# Names ending in "*" are prefixes (e.g. every fontawesome icon).
+_PACKAGE_NAMES = {
+    "geometry": "newgeometry restoregeometry",
+    "titlesec": "titleformat titlespacing titlerule titlelabel",
+    "array": "newcolumntype",
+    "xcolor": "color textcolor colorbox fcolorbox definecolor pagecolor",
+    "color": "color textcolor colorbox fcolorbox definecolor pagecolor",
+    "enumitem": "setlist newlist setlistdepth",
+    "hyperref": "href url nolinkurl hyperlink hypertarget hypersetup autoref",
+    "url": "url urlstyle",
+    "paracol": "switchcolumn columnratio setcolumnwidth paracol",
+    "ifthen": "ifthenelse equal isundefined whiledo boolean newboolean setboolean",
+    "needspace": "needspace Needspace",
+    "multicol": "columnbreak multicols multicols*",
+    "graphicx": "includegraphics graphicspath rotatebox scalebox resizebox",
+    "tabularx": "tabularx",
+    "longtable": "longtable",
+    "booktabs": "toprule midrule bottomrule cmidrule addlinespace",
+    "fontawesome": "fa*",
+    "fontawesome5": "fa*",
+    "fontawesome6": "fa*",
+    "academicons": "ai*",
+    "marvosym": "Mobilefone Letter Email Telefon Mundus Lightning",
+    "amssymb": "checkmark square blacksquare mathbb",
+    "amsmath": "text align align* gather gather* eqref",
+    "fancyhdr": "fancyhf fancyhead fancyfoot lhead chead rhead lfoot cfoot rfoot",
+    "tcolorbox": "tcbset tcolorbox",
+    "tikz": "tikz draw node fill path tikzpicture",
+    "latexsym": "",
+    "fontenc": "",
+    "inputenc": "",
+    "lmodern": "",
+    "charter": "",
+    "helvet": "",
+    "babel": "",
+    "microtype": "",
+    "verbatim": "",
+    "parskip": "",
+    "setspace": "singlespacing onehalfspacing doublespacing setstretch spacing",
+    "ragged2e": "justifying RaggedRight Centering RaggedLeft",
+    "soul": "hl ul st so",
+    "bookmark": "",
+    "etoolbox": "",
+    "xparse": "NewDocumentCommand RenewDocumentCommand",
+}
+
+_COMMAND_USE_RE = re.compile(r"(?<!\\)(?:\\\\)*\\([A-Za-z@]+)|(?<!\\)%[^\n]*")
+_ENVIRONMENT_USE_RE = re.compile(r"\\begin\s*\{([^{}]*)\}")
+_PACKAGE_RE = re.compile(
+    r"\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}"
+)
+_LOW_LEVEL_DEFINITION_RE = re.compile(
+    r"\\(?:g|e|x)?def\s*\\([A-Za-z@]+)|\\let\s*\\([A-Za-z@]+)"
+    r"|\\new(?:length|savebox|if)\s*\{?\\([A-Za-z@]+)"
+    r"|\\(?:Declare|New|Renew|Provide)\w*Command\s*\{?\\([A-Za-z@]+)"
+)
+
+
+@dataclass
+class LatexIssue:
+    """A structural problem in a LaTeX document, located by line and section."""
+
+    kind: str  # "balance", "environment", "command" or "document"
+    message: str
+    line: int
+    section: str = ""
+    section_index: int = -1  # index into `split_sections(body)`; -1 outside the body
+
+    def __str__(self) -> str:
+        where = f"'{self.section}'" if self.section else "header"
+        if self.section_index < 0:
+            where = "preamble/end of document"
+        return f"line {self.line} ({where}): {self.message}"
+
+
+def _command_uses(source: str) -> Iterator[re.Match]:
+    for match in _COMMAND_USE_RE.finditer(source):
+        if match.group(1):
+            yield match
+
+
+def _known_names(preamble: str, reference: str = None):
+    """
+    Commands and environments the body may use, or None for each if the
+    preamble loads a package this module knows nothing about.
+    """
+    definitions = parse_definitions(preamble)
+    commands = set(_STANDARD_COMMANDS) | set(definitions.commands)
+    environments = set(_STANDARD_ENVIRONMENTS) | set(definitions.environments)
+    for match in _LOW_LEVEL_DEFINITION_RE.finditer(preamble):
+        commands.add(next(group for group in match.groups() if group))
+    prefixes = []
+    complete = True
+    for match in _PACKAGE_RE.finditer(preamble):
+        for package in match.group(1).split(","):
+            names = _PACKAGE_NAMES.get(package.strip())
+            if names is None:
+                complete = False
+                continue
+            for name in names.split():
+                if name.endswith("*") and name[:-1].islower():
+                    prefixes.append(name[:-1])
+                else:
+                    commands.add(name)
+                    environments.add(name)
+    if reference is not None:
+        # Whatever the original CV used is known to compile with its preamble
+        complete = True
+        commands.update(m.group(1) for m in _command_uses(reference))
+        environments.update(
+            m.group(1).strip() for m in _ENVIRONMENT_USE_RE.finditer(reference)
+        )
+    if not complete:
+        return None, None
+    return (
+        lambda name: name in commands or name.startswith(tuple(prefixes)),
+        lambda name: name in environments,
+    )
+
+
+def validate_latex(source: str, reference: str = None) -> list:
+    """
+    Check a LaTeX document's structure without running TeX.
+
+    Reports unbalanced braces, mismatched or unclosed environments, a missing
+    `\\end{document}`, and body environments and commands that are neither
+    standard, defined in the preamble, provided by a known package, nor used
+    in `reference` (the original document, if any). Each issue carries the
+    line and the body section it was found in.
+    """
+    preamble, body, tail = split_document(source)
+    newlines = [m.start() for m in re.finditer("\n", source)]
+    sections = split_sections(body)
+    section_starts = []
+    offset = len(preamble)
+    for section in sections:
+        section_starts.append(offset)
+        offset += len(section.source)
+    body_end = len(preamble) + len(body)
+    issues = []
+
+    def report(kind, message, pos):
+        index = -1
+        if len(preamble) <= pos < body_end and sections:
+            index = max(bisect_right(section_starts, pos) - 1, 0)
+        issues.append(
+            LatexIssue(
+                kind=kind,
+                message=message,
+                line=bisect_right(newlines, pos - 1) + 1,
+                section=sections[index].title if index >= 0 else "",
+                section_index=index,
+            )
+        )
+
+    # One stack for braces and environments, so a brace left open inside an
+    # environment is blamed on the brace rather than on the \end
+    # \newenvironment splits \begin and \end across groups, so environments
+    # are only matched from \begin{document} on; preamble braces still count
+    document = re.search(r"\\begin\s*\{document\}", preamble)
+    environments_from = document.start() if document else 0
+    stack = []
+    for match in _BALANCE_RE.finditer(source):
+        token = match.group(0)
+        is_environment = match.group(1) is not None or match.group(2) is not None
+        if is_environment and match.start() < environments_from:
+            continue
+        if match.group(1) is not None:
+            stack.append((match.group(1).strip(), match.start()))
+        elif match.group(2) is not None:
+            name = match.group(2).strip()
+            if not any(opened == name for opened, _ in stack):
+                report(
+                    "balance",
+                    f"\\end{{{name}}} without a matching \\begin",
+                    match.start(),
+                )
+                continue
+            while stack[-1][0] != name:
+                opened, pos = stack.pop()
+                if opened == "{":
+                    report("balance", f"'{{' is not closed before \\end{{{name}}}", pos)
+                else:
+                    report(
+                        "balance",
+                        f"\\begin{{{opened}}} is closed by \\end{{{name}}}",
+                        pos,
+                    )
+            stack.pop()
+        elif token == "{":
+            stack.append(("{", match.start()))
+        elif token == "}":
+            if stack and stack[-1][0] == "{":
+                stack.pop()
+            else:
+                report("balance", "unbalanced '}'", match.start())
+    for opened, pos in stack:
+        if opened == "document":
+            report("document", "\\end{document} is missing", len(source))
+        elif opened == "{":
+            report("balance", "'{' is never closed", pos)
+        else:
+            report("balance", f"\\begin{{{opened}}} is never closed", pos)
+
+    is_command, is_environment = _known_names(preamble, reference)
+    start = len(preamble)
+    if is_environment is not None:
+        for match in _ENVIRONMENT_USE_RE.finditer(body):
+            name = match.group(1).strip()
+            if not is_environment(name):
+                report(
+                    "environment",
+                    f"unknown environment '{name}'",
+                    start + match.start(),
+                )
+    if is_command is not None:
+        for match in _command_uses(body):
+            if not is_command(match.group(1)):
+                report(
+                    "command",
+                    f"undefined command \\{match.group(1)}",
+                    start + match.start(1) - 1,
+                )
+    issues.sort(key=lambda issue: issue.line)
+    return issues
+
+
+__all__ = [
+    "BalanceChecker",
+    "LatexIssue",
+    "LatexParts",
+    "MarkdownConversion",
+    "Section",
+    "compact_body",
+    "extract_body",
+    "split_latex",
+    "split_sections",
+    "latex_to_markdown",
+    "parse_definitions",
+    "split_document",
+    "tokenize",
+    "validate_latex",
+]
@@ -0,0 +1,351 @@
+import asyncio
+import os
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from .tracing import gateway_call, get_tracer
+
+
+@dataclass
+class LLMCall:
+    """Accounting for one gateway call."""
+
+    kind: str
+    latency: float
+    queue_wait: float
+    prompt_tokens: int
+    completion_tokens: int
+    retries: int = 0
+    ok: bool = True
+
+
+def model_id(llm) -> str:
+    """Name of an LLM's model, for cache keys."""
+    return getattr(llm, "model", None) or llm.metadata.model_name
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for when the API reports none."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return (
+        status == 429
+        or type(error).__name__ == "RateLimitError"
+        or "rate limit" in str(error).lower()
+    )
+
+
+def response_usage(response, prompt: str) -> tuple[int, int]:
+    """Prompt/completion token counts from an LLM response, estimated if missing."""
+    raw = getattr(response, "raw", None)
+    usage = getattr(raw, "usage", None)
+    if usage is None and isinstance(raw, dict):
+        usage = raw.get("usage")
+    if isinstance(usage, dict):
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+    else:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+    if prompt_tokens is None:
+        prompt_tokens = estimate_tokens(prompt)
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(getattr(response, "text", str(response)))
+    return prompt_tokens, completion_tokens
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit that halves on rate limiting and creeps back up on success.
+
+    After a rate limit every caller also waits out a shared cooldown, so one
+    429 doesn't turn into a burst of retries.
+    """
+
+    def __init__(self, limit: int):
+        self.max_limit = limit
+        self.limit = float(limit)
+        self.active = 0
+        self.cooldown_until = 0.0
+        self._condition = None
+        self._loop = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # One gateway can outlive several `asyncio.run` loops
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.active = 0
+        return self._condition
+
+    async def acquire(self) -> None:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        delay = self.cooldown_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, rate_limited: bool = False, backoff: float = 0.0):
+        async with self.condition:
+            self.active -= 1
+            if rate_limited:
+                self.limit = max(1.0, int(self.limit) / 2)
+                self.cooldown_until = max(
+                    self.cooldown_until, time.monotonic() + backoff
+                )
+            else:
+                # Additive increase: about one extra slot per window of successes
+                self.limit = min(self.max_limit, self.limit + 1 / int(self.limit))
+            self.condition.notify_all()
+
+
+class LLMGateway:
+    """
+    Shared async entry point for every LLM call made by the tools.
+
+    Calls are bounded by an adaptive concurrency limit, time out after
+    `timeout` seconds, are retried with exponential backoff on rate limits
+    and timeouts, and are recorded in `calls` / `stats` for accounting.
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        max_concurrency: int = None,
+        timeout: float = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self._llm = llm
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("LLM_MAX_CONCURRENCY", 8)
+        )
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", 180))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limit = AdaptiveLimit(self.max_concurrency)
+        self.calls = deque(maxlen=1000)
+        self.stats = Counter()
+
+    @property
+    def llm(self):
+        if self._llm is not None:
+            return self._llm
+        from llama_index.core import Settings
+
+        return Settings.llm
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return delay * (0.5 + random.random() / 2)
+
+    async def _call(self, kind: str, make_call, prompt_text: str, usage=None):
+        queued = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            await self.limit.acquire()
+            started = time.monotonic()
+            rate_limited = False
+            try:
+                with gateway_call():
+                    response = await asyncio.wait_for(make_call(), timeout=self.timeout)
+            except asyncio.CancelledError:
+                await self.limit.release()
+                raise
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                retryable = rate_limited or isinstance(e, asyncio.TimeoutError)
+                delay = self._backoff(attempt)
+                await self.limit.release(rate_limited=rate_limited, backoff=delay)
+                self.stats["rate_limited" if rate_limited else "errors"] += 1
+                if not retryable or attempt == self.max_retries:
+                    self._record(kind, started, queued, 0, 0, attempt, ok=False)
+                    raise
+                self.stats["retries"] += 1
+                if not rate_limited:
+                    await asyncio.sleep(delay)
+                continue
+            await self.limit.release()
+            prompt_tokens, completion_tokens = (usage or response_usage)(
+                response, prompt_text
+            )
+            self._record(
+                kind, started, queued, prompt_tokens, completion_tokens, attempt
+            )
+            return response
+
+    def _record(
+        self, kind, started, queued, prompt_tokens, completion_tokens, retries, ok=True
+    ):
+        now = time.monotonic()
+        call = LLMCall(
+            kind=kind,
+            latency=now - started,
+            queue_wait=started - queued,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            retries=retries,
+            ok=ok,
+        )
+        self.calls.append(call)
+        get_tracer().record(
+            kind,
+            "llm",
+            call.latency,
+            queue_wait=call.queue_wait,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            ok=ok,
+            retries=retries,
+        )
+        self.stats["calls"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["completion_tokens"] += completion_tokens
+        return call
+
+    async def complete(self, prompt: str, **kwargs):
+        """`llm.acomplete` under the gateway's limits."""
+        llm = self.llm
+        return await self._call(
+            "complete", lambda: llm.acomplete(prompt, **kwargs), prompt
+        )
+
+    async def stream_complete(self, prompt: str, **kwargs):
+        """
+        `llm.astream_complete` under the gateway's limits, yielding text deltas.
+
+        Failures before the first delta are retried like `complete`; once
+        output has started, errors propagate and the call is recorded as
+        failed. Closing the generator early (e.g. to abort a bad generation)
+        frees the slot immediately.
+        """
+        llm = self.llm
+        queued = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            await self.limit.acquire()
+            started = time.monotonic()
+            try:
+                with gateway_call():
+                    stream = await asyncio.wait_for(
+                        llm.astream_complete(prompt, **kwargs), timeout=self.timeout
+                    )
+                    iterator = stream.__aiter__()
+                    first = await asyncio.wait_for(iterator.__anext__(), self.timeout)
+            except StopAsyncIteration:
+                await self.limit.release()
+                self._record("stream_complete", started, queued, 0, 0, attempt)
+                return
+            except asyncio.CancelledError:
+                await self.limit.release()
+                raise
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                retryable = rate_limited or isinstance(e, asyncio.TimeoutError)
+                delay = self._backoff(attempt)
+                await self.limit.release(rate_limited=rate_limited, backoff=delay)
+                self.stats["rate_limited" if rate_limited else "errors"] += 1
+                if not retryable or attempt == self.max_retries:
+                    self._record(
+                        "stream_complete", started, queued, 0, 0, attempt, ok=False
+                    )
+                    raise
+                self.stats["retries"] += 1
+                if not rate_limited:
+                    await asyncio.sleep(delay)
+                continue
+            break
+
+        text = []
+        ok = True
+        try:
+            response = first
+            while True:
+                if response.delta:
+                    text.append(response.delta)
+                    yield response.delta
+                try:
+                    response = await asyncio.wait_for(
+                        iterator.__anext__(), self.timeout
+                    )
+                except StopAsyncIteration:
+                    break
+        except Exception:
+            ok = False
+            self.stats["errors"] += 1
+            raise
+        finally:
+            await self.limit.release()
+            self._record(
+                "stream_complete",
+                started,
+                queued,
+                estimate_tokens(prompt),
+                estimate_tokens("".join(text)),
+                attempt,
+                ok=ok,
+            )
+
+    async def structured_predict(self, output_cls, prompt, **prompt_args):
+        """`llm.astructured_predict` under the gateway's limits."""
+        llm = self.llm
+        prompt_text = prompt.format(**prompt_args)
+
+        def usage(result, prompt_text):
+            completion = (
+                result.model_dump_json() if hasattr(result, "model_dump_json") else ""
+            )
+            return estimate_tokens(prompt_text), estimate_tokens(completion)
+
+        return await self._call(
+            "structured_predict",
+            lambda: llm.astructured_predict(output_cls, prompt, **prompt_args),
+            prompt_text,
+            usage=usage,
+        )
+
+    def summary(self) -> dict:
+        latencies = sorted(call.latency for call in self.calls)
+        summary = dict(self.stats)
+        if latencies:
+            summary["p50_latency"] = latencies[len(latencies) // 2]
+            summary["max_latency"] = latencies[-1]
+        return summary
+
+
+_gateway = None
+
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide gateway, creating it on first use."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
+
+
+def set_gateway(gateway: LLMGateway) -> None:
+    """Replace the process-wide gateway, e.g. with one wrapping a mock LLM."""
+    global _gateway
+    _gateway = gateway
+
+
+__all__ = [
+    "AdaptiveLimit",
+    "LLMCall",
+    "LLMGateway",
+    "estimate_tokens",
+    "get_gateway",
+    "model_id",
+    "set_gateway",
+]
@@ -1,92 +1,218 @@
-from llama_index.tools.duckduckgo import DuckDuckGoSearchToolSpec
-from llama_index.core.tools import FunctionTool
-from llama_index.core.agent.workflow import (
-    AgentStream,
-    AgentWorkflow,
-    FunctionAgent,
-    AgentInput,
-    AgentOutput,
-    ToolCall,
-    ToolCallResult,
-)
-from llama_index.llms.openai import OpenAI
+import argparse
 import asyncio
-import dotenv
-from .tools import (
-    read_job,
-    read_cv,
-    assess_cv,
-    rewrite_cv,
-    save_resume,
-    # scrape_linkedin_jobs,
-    # record_notes,
-    # review_resume,
-    # job_match_review,
-)
-from colorama import Fore, Back, Style
-from tkinter.constants import YES
-
-dotenv.load_dotenv()
-
-with open("job_postings/sample_job_posting.txt", "r") as f:
-    sample_job_posting = f.read()
-
-
-async def stream_agent_output(handler) -> None:
-    current_agent = None
-    async for event in handler.stream_events():
-        if (
-            hasattr(event, "current_agent_name")
-            and event.current_agent_name != current_agent
-        ):
-            current_agent = event.current_agent_name
-            print(f"\n{'='*50}")
-            print(f"🤖 {Fore.GREEN}Agent: {current_agent}")
-            print(Style.RESET_ALL, end="")
-            print(f"{'='*50}\n")
-
-        if isinstance(event, AgentStream):
-            if event.delta:
-                print(Fore.CYAN + event.delta, end="", flush=True)
-        elif isinstance(event, AgentInput):
-            print(f"📥 {Fore.CYAN}Input:", event.input)
-
-        elif isinstance(event, AgentOutput):
-            if event.response.content:
-                print("📤 Output:", event.response.content)
-            if event.tool_calls:
-                print(
-                    f"🛠️  {Fore.GREEN}Planning to use tools:",
-                    [call.tool_name for call in event.tool_calls],
-                )
-        elif isinstance(event, ToolCallResult):
-            print(f"🔧 {Style.NORMAL}Tool Result ({event.tool_name}):")
-            print(f"  {Style.NORMAL}Arguments: {event.tool_kwargs}")
-            print(f"  {Style.NORMAL}Output: {event.tool_output}")
-
-        elif isinstance(event, ToolCall):
-            print(f"🔨 {Fore.GREEN}Calling Tool: {event.tool_name}")
-            print(f"  {Fore.GREEN}With arguments: {event.tool_kwargs}")
-        print(Style.RESET_ALL, end="")
-
-
-async def main():
+import os
+import sys
+
+from .checkpoint import DEFAULT_CHECKPOINT_DIR, RunCheckpoint
+from .render import MODES
+from .tracing import get_tracer
+
+# Only what parsing arguments needs is imported here. llama_index, the LLM
+# client and the tools load when a command runs, so --help and commands
+# forwarded to a warm daemon start in milliseconds.
+
+AGENT_TOOLS = ["read_cv", "read_job", "assess_cv", "rewrite_cv", "save_resume"]
+# Arguments recorded with a run, and restored from it by --resume
+RUN_ARGS = ("pipeline", "job_url", "cv", "filename")
+
+
+async def stream_agent_output(handler, renderer=None) -> None:
+    from .render import EventRenderer
+
+    renderer = renderer or EventRenderer()
+    try:
+        async for event in handler.stream_events():
+            renderer.render(event)
+    finally:
+        renderer.close()
+
+
+def report_trace(path: str = None) -> None:
+    """Print the per-span timing report and export the spans to `path`."""
+    print(get_tracer().report())
+    if path:
+        get_tracer().export(path)
+        print(f"Trace written to {path}")
+
+
+async def run_pipeline(
+    job_url: str,
+    cv_path: str,
+    filename: str = None,
+    output: str = "pretty",
+    checkpoint: RunCheckpoint = None,
+) -> None:
+    """
+    Tailor one CV to one job through the fixed tool DAG, without a planner LLM.
+    With a `checkpoint`, continue from its last snapshot and keep adding to it.
+    """
+    from llama_index.core import Settings
+    from llama_index.llms.openai import OpenAI
+
+    from .pipeline import TailoringPipeline
+    from .render import EventRenderer
+
+    Settings.llm = OpenAI(model="gpt-4o-mini")
+    pipeline = TailoringPipeline(timeout=30 * 60)
+    ctx = checkpoint.restore(pipeline) if checkpoint else None
+    if ctx is None:
+        handler = pipeline.run(job_url=job_url, cv_path=cv_path, filename=filename)
+    else:
+        handler = pipeline.run(ctx=ctx)
+    if checkpoint:
+        checkpoint.attach(handler.ctx)
+    await stream_agent_output(handler, EventRenderer(output))
+    result = await handler
+    if checkpoint:
+        checkpoint.finish(result)
+    print(f"📄 {result}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tailor a CV to a job posting.")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="run read -> assess -> rewrite -> save directly instead of chatting",
+    )
+    parser.add_argument("--job-url", help="LinkedIn job posting URL (pipeline mode)")
+    parser.add_argument(
+        "--cv", default="resumes_repo/sample_resume.tex", help="LaTeX CV path"
+    )
+    parser.add_argument("--filename", help="name of the saved resume, without .tex")
+    parser.add_argument(
+        "--output",
+        choices=MODES,
+        default="pretty",
+        help="event output: colored, quiet, or JSON lines for scripts",
+    )
+    parser.add_argument(
+        "--trace",
+        default=os.getenv("TRACE_FILE"),
+        help="write an OTLP/JSON trace of tool and LLM spans to this file",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="continue an interrupted run from its last checkpoint "
+        f"(kept in {DEFAULT_CHECKPOINT_DIR})",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="stay running with everything imported and run --pipeline "
+        "commands sent by later invocations",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="run here even if a warm daemon (--serve) is running",
+    )
+    return parser
+
+
+async def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.serve:
+        from .daemon import serve
+
+        await serve()
+        return
+    if args.pipeline and not args.no_daemon:
+        from .daemon import forward
+
+        code = forward(sys.argv[1:] if argv is None else argv)
+        if code is not None:
+            raise SystemExit(code)
+    await execute(args, parser)
+
+
+async def execute(args, parser) -> None:
+    """Run a parsed command here, with tracing, and print its timing report."""
+    import dotenv
+
+    from .tracing import instrument_llama_index
+
+    dotenv.load_dotenv()
+    get_tracer().clear()
+    instrument_llama_index()
+    try:
+        await run(args, parser)
+    finally:
+        report_trace(args.trace)
+
+
+def start_run(checkpoint: RunCheckpoint, args, **extra) -> None:
+    """Record a new run's arguments so --resume can restart it."""
+    checkpoint.start(**{name: getattr(args, name) for name in RUN_ARGS}, **extra)
+    print(f"Run {checkpoint.run_id}; continue it with --resume {checkpoint.run_id}")
+
+
+def build_agent(llm):
+    """The HR consultant agent run without --pipeline, with `AGENT_TOOLS`."""
+    from llama_index.core.agent.workflow import AgentWorkflow
+
+    from .registry import function_tools
+
+    return AgentWorkflow.from_tools_or_functions(
+        tools_or_functions=function_tools(AGENT_TOOLS),
+        llm=llm,
+        system_prompt=(
+            "You are a professional HR Consultant. "
+            "Your job is to evaluate CVs provided by the user against job postings and "
+            "Give advice on what to improve on the CV and even rewrite the CV to add "
+            "the recommended changes. "
+            "You should always verify from the user if he wants to save the final written CV."
+        ),
+    )
+
+
+async def run(args, parser) -> None:
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.load(args.resume)
+        except FileNotFoundError:
+            parser.error(f"no checkpoint for run {args.resume}")
+        if checkpoint.finished:
+            print(f"Run {checkpoint.run_id} already finished: {checkpoint.result}")
+            return
+        vars(args).update(checkpoint.args)
+        print(f"Resuming run {checkpoint.run_id}")
+    else:
+        checkpoint = RunCheckpoint()
+    # Tools called by this run's steps record their results in its checkpoint
+    checkpoint.activate()
+
+    if args.pipeline:
+        if not args.job_url:
+            parser.error("--pipeline needs --job-url")
+        if not args.resume:
+            start_run(checkpoint, args)
+        await run_pipeline(
+            args.job_url, args.cv, args.filename, args.output, checkpoint
+        )
+        return
+
+    from llama_index.llms.openai import OpenAI
+
+    from .render import EventRenderer
+
     default_llm = OpenAI(model="gpt-4o-mini")
     # advanced_llm = OpenAI(model="gpt-4o")
     # reasoning_llm = OpenAI(model="o1-mini")
 
+    # from llama_index.tools.duckduckgo import DuckDuckGoSearchToolSpec
     # tool_spec = DuckDuckGoSearchToolSpec()
-    job_read_tool = FunctionTool.from_defaults(async_fn=assess_cv)
-    cv_read_tool = FunctionTool.from_defaults(async_fn=read_cv)
-    cv_assess_tool = FunctionTool.from_defaults(async_fn=read_cv)
-    cv_rewrite_tool = FunctionTool.from_defaults(async_fn=rewrite_cv)
-    save_cv_tool = FunctionTool.from_defaults(async_fn=save_resume)
-
-    # linkedin_scraping_tool = FunctionTool.from_defaults(async_fn=scrape_linkedin_jobs)
-    # load_resume_tool = FunctionTool.from_defaults(async_fn=load_resume)
-    # record_notes_tool = FunctionTool.from_defaults(async_fn=record_notes)
-    # resume_review_tool = FunctionTool.from_defaults(async_fn=review_resume)
-    # job_match_review_tool = FunctionTool.from_defaults(async_fn=job_match_review)
+
+    # Tools are declared in the registry and only imported here, when the
+    # agent is built. Other agents' tools would be built the same way:
+    # linkedin_scraping_tool, record_notes_tool, resume_review_tool,
+    # job_match_review_tool, match_jobs_tool = function_tools(
+    #     ["scrape_linkedin_jobs", "record_notes", "review_resume",
+    #      "job_match_review", "match_job_postings"]
+    # )
+    # from llama_index.core.agent.workflow import AgentWorkflow, FunctionAgent
 
     # research_agent = FunctionAgent(
     #     name="JobResearcher",
@@ -133,10 +259,11 @@ async def main():
     #     system_prompt=(
     #         "You are a job matching assistant capable of looking at job postings and applicant's resume/CV "
     #         "and accurately selecting the best matching job postings to the applicant's resume/CV. "
+    #         "Use the match_job_postings tool to shortlist similar postings before reviewing them. "
     #         "You have to select more than one job postings and provide a justification for your selection. "
     #         "You must use the ResumeAnalyzer and JobDescriptionAnalyzer agents first to generate your output."
     #     ),
-    #     tools=[job_match_review_tool],
+    #     tools=[match_jobs_tool, job_match_review_tool],
     #     llm=default_llm,
     # )
 
@@ -168,23 +295,7 @@ async def main():
     #     tools=[save_resume_tool],
     #     llm=default_llm,
     # )
-    agent = AgentWorkflow.from_tools_or_functions(
-        tools_or_functions=[
-            cv_read_tool,
-            job_read_tool,
-            cv_assess_tool,
-            cv_rewrite_tool,
-            save_cv_tool,
-        ],
-        llm=default_llm,
-        system_prompt=(
-            "You are a professional HR Consultant. "
-            "Your job is to evaluate CVs provided by the user against job postings and "
-            "Give advice on what to improve on the CV and even rewrite the CV to add "
-            "the recommended changes. "
-            "You should always verify from the user if he wants to save the final written CV."
-        ),
-    )
+    agent = build_agent(default_llm)
 
     # workflow = AgentWorkflow(
     #     agents=[
@@ -200,9 +311,16 @@ async def main():
     #     timeout=30 * 360,
     # )
 
-    prompt = input("🖊️ User: ")
-    handler = agent.run(prompt)
-    await stream_agent_output(handler)
+    ctx = None
+    if args.resume:
+        ctx = checkpoint.restore(agent)
+    else:
+        args.prompt = input("🖊️ User: ")
+        start_run(checkpoint, args, prompt=args.prompt)
+    handler = agent.run(ctx=ctx) if ctx is not None else agent.run(args.prompt)
+    checkpoint.attach(handler.ctx)
+    await stream_agent_output(handler, EventRenderer(args.output))
+    checkpoint.finish(await handler)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+import os
+import re
+from typing import Optional, Union
+
+from llama_index.core.workflow import (
+    Context,
+    Event,
+    StartEvent,
+    StopEvent,
+    Workflow,
+    step,
+)
+
+from .postings import parse_job_details
+from .tools import (
+    READ_CV_ERROR,
+    READ_JOB_ERROR,
+    assess_cv,
+    read_cv,
+    read_job,
+    rewrite_cv,
+    save_resume,
+)
+
+
+class ReadJob(Event):
+    job_url: str
+
+
+class ReadCV(Event):
+    cv_path: str
+    filename: Optional[str] = None
+
+
+class JobRead(Event):
+    job_posting: str
+
+
+class CVRead(Event):
+    cv_path: str
+    latex_cv: str
+    cv_markdown: str
+    filename: Optional[str] = None
+
+
+class CVAssessed(Event):
+    latex_cv: str
+    job_posting: str
+    cv_assessment: str
+    filename: str
+
+
+class CVRewritten(Event):
+    resume_content: str
+    filename: str
+
+
+def resume_filename(job_posting: str, cv_path: str) -> str:
+    """<COMPANY_NAME>_<APPLICANT_NAME>-style name, as `save_resume` expects."""
+    posting = parse_job_details(job_posting)
+    company = (posting and posting.company) or "company"
+    applicant = os.path.splitext(os.path.basename(cv_path))[0]
+    return re.sub(r"[^\w-]+", "_", f"{company}_{applicant}").strip("_")
+
+
+class TailoringPipeline(Workflow):
+    """
+    Fixed read -> assess -> rewrite -> save DAG over the tools.
+
+    The job and the CV are read concurrently; no LLM is asked which tool to
+    call next, so the only LLM calls are the ones the tools make themselves.
+    If either read fails, the run stops with the error before any LLM call.
+    Run with `job_url`, `cv_path` and optionally `filename`.
+    """
+
+    @step
+    async def start(self, ctx: Context, ev: StartEvent) -> Union[ReadJob, ReadCV]:
+        ctx.send_event(ReadJob(job_url=ev.job_url))
+        ctx.send_event(ReadCV(cv_path=ev.cv_path, filename=ev.get("filename")))
+
+    @step
+    async def fetch_job(self, ev: ReadJob) -> JobRead:
+        return JobRead(job_posting=await read_job(ev.job_url))
+
+    @step
+    async def load_cv(self, ev: ReadCV) -> CVRead:
+        latex_cv, cv_markdown = await read_cv(ev.cv_path)
+        return CVRead(
+            cv_path=ev.cv_path,
+            latex_cv=latex_cv,
+            cv_markdown=cv_markdown,
+            filename=ev.filename,
+        )
+
+    @step
+    async def assess(
+        self, ctx: Context, ev: Union[JobRead, CVRead]
+    ) -> Union[CVAssessed, StopEvent]:
+        ready = ctx.collect_events(ev, [JobRead, CVRead])
+        if ready is None:
+            return None
+        job, cv = ready
+        if job.job_posting == READ_JOB_ERROR:
+            return StopEvent(result=f"{READ_JOB_ERROR} Couldn't read the job posting.")
+        if cv.latex_cv == READ_CV_ERROR:
+            return StopEvent(result=f"{READ_CV_ERROR} {cv.cv_path}")
+        cv_assessment = await assess_cv(cv.cv_markdown, job.job_posting)
+        return CVAssessed(
+            latex_cv=cv.latex_cv,
+            job_posting=job.job_posting,
+            cv_assessment=cv_assessment,
+            filename=cv.filename or resume_filename(job.job_posting, cv.cv_path),
+        )
+
+    @step
+    async def rewrite(self, ctx: Context, ev: CVAssessed) -> CVRewritten:
+        resume_content = await rewrite_cv(
+            ev.latex_cv, ev.job_posting, ev.cv_assessment, ctx=ctx
+        )
+        return CVRewritten(resume_content=resume_content, filename=ev.filename)
+
+    @step
+    async def save(self, ctx: Context, ev: CVRewritten) -> StopEvent:
+        result = await save_resume(ctx, ev.resume_content, ev.filename)
+        return StopEvent(result=result)
+
+
+__all__ = [
+    "TailoringPipeline",
+    "resume_filename",
+]
@@ -0,0 +1,89 @@
+import ast
+import re
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+_JOB_ID_RE = re.compile(r"(\d{6,})(?:/|\?|$)")
+
+
+def job_id_from_link(link: str) -> str:
+    """Pull the numeric LinkedIn job ID out of a posting URL, falling back to the URL."""
+    match = _JOB_ID_RE.search(link.split("?")[0] + "?")
+    return match.group(1) if match else link
+
+
+@dataclass
+class JobPosting:
+    """One scraped posting. `error` is set (and `description` empty) when it failed."""
+
+    job_id: str
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    link: str = ""
+    description: str = ""
+    error: Optional[str] = None
+
+    @classmethod
+    def from_card(cls, card: dict, description: str = "", error: str = None):
+        return cls(
+            job_id=job_id_from_link(card.get("link", "")),
+            title=card.get("title", ""),
+            company=card.get("company", ""),
+            location=card.get("location", ""),
+            link=card.get("link", ""),
+            description=description,
+            error=error,
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_text(self) -> str:
+        """Render in the same plain-text layout the job_postings/ files use."""
+        return (
+            f"Job Title: {self.title}\n"
+            f"Company: {self.company}\n"
+            f"Location: {self.location}\n"
+            f"Job Link: {self.link}\n"
+            "Job Description:\n"
+            f"{self.description}"
+        )
+
+    def summary_line(self) -> str:
+        if self.error:
+            return f"[{self.job_id}] ERROR: {self.error}"
+        return f"[{self.job_id}] {self.title} | {self.company} | {self.location}"
+
+
+def parse_job_details(job_posting: str) -> Optional[JobPosting]:
+    """The posting `read_job` returned as text (a dict repr), or None if it isn't one."""
+    try:
+        details = ast.literal_eval(job_posting)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    if not isinstance(details, dict):
+        return None
+    names = {f.name for f in fields(JobPosting)} - {"job_id"}
+    return JobPosting(
+        job_id="", **{k: str(v) for k, v in details.items() if k in names}
+    )
+
+
+def summarize_postings(postings: list, page: int = 1, page_size: int = 10) -> str:
+    """Compact, paged listing of postings (IDs, titles, companies) for the agent."""
+    total = len(postings)
+    pages = max(1, -(-total // page_size))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * page_size
+    lines = [p.summary_line() for p in postings[start : start + page_size]]
+    lines.append(f"Page {page}/{pages} ({total} postings).")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "JobPosting",
+    "parse_job_details",
+    "job_id_from_link",
+    "summarize_postings",
+]
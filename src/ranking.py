@@ -0,0 +1,365 @@
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from .cache import DEFAULT_CACHE_DIR, LRUCache, cache_key
+from .store import content_hash
+
+DEFAULT_BM25_DIR = os.getenv("BM25_INDEX_DIR", os.path.join(DEFAULT_CACHE_DIR, "bm25"))
+
+# Candidate terms; trailing punctuation is trimmed per distinct token, so tech
+# spellings like c++, c#, node.js and ci/cd survive as single terms
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#./:-]*")
+_TRAILING = ".:/-"
+
+_STOPWORDS = frozenset("""
+    a about above after all also an and any are as at be been being both but by
+    can could did do does doing during each etc for from further had has have
+    having he her here hers him his how i if in into is it its itself just me
+    more most my no nor not of off on once only or other our ours out over own
+    per same she should so some such than that the their theirs them then there
+    these they this those through to too under until up very via was we were
+    what when where which while who whom why will with within without would
+    you your yours able ability across ensure including strong excellent good
+    great work working team teams role job candidate candidates experience
+    years year required requirements preferred responsibilities join us new
+    using use based well within looking opportunity company january february
+    march april may june july august september october november december present
+    """.split())
+
+_SKILL_HEADING_RE = re.compile(
+    r"^#+\s*.*\b(skill|technolog|tool|stack|keyword|competenc)", re.IGNORECASE
+)
+
+
+def _normalize(token: str) -> str:
+    """The term a raw token counts as, or "" if it doesn't count."""
+    if "://" in token or token.startswith("www."):
+        return ""
+    term = token.rstrip(_TRAILING)
+    if len(term) < 2 or term in _STOPWORDS:
+        return ""
+    return term
+
+
+def terms(text: str) -> list:
+    """Lowercased content terms of a text, stopwords and one-letter words dropped."""
+    normalized = (_normalize(token) for token in _TOKEN_RE.findall(text.lower()))
+    return [term for term in normalized if term]
+
+
+def cv_query(cv_markdown: str, skills_boost: float = 2.0) -> Counter:
+    """
+    Weighted query terms for a markdown CV.
+
+    Terms under a skills/technologies heading count `skills_boost` times, so
+    listed skills outweigh words from prose bullets.
+    """
+    weights = Counter()
+    boost = 1.0
+    for line in cv_markdown.splitlines():
+        if line.lstrip().startswith("#"):
+            boost = skills_boost if _SKILL_HEADING_RE.match(line.strip()) else 1.0
+        for term in terms(line):
+            weights[term] += boost
+    return weights
+
+
+def count_terms(documents: list, vocabulary: dict) -> tuple:
+    """
+    Term counts of each document as `(term_ids, tf, sizes)`: flat arrays
+    grouped by document, `sizes` entries per document. Terms not yet in
+    `vocabulary` are added to it.
+    """
+    # Count raw tokens per document in C (Counter) and intern only the
+    # distinct ones; normalizing once per vocabulary entry keeps per-token
+    # Python work out of the build
+    raw_vocabulary = defaultdict()
+    raw_vocabulary.default_factory = raw_vocabulary.__len__
+    raw_ids, counts, doc_sizes = [], [], []
+    for document in documents:
+        tokens = Counter(_TOKEN_RE.findall(document.lower()))
+        raw_ids.extend(map(raw_vocabulary.__getitem__, tokens))
+        counts.extend(tokens.values())
+        doc_sizes.append(len(tokens))
+
+    to_term = np.full(len(raw_vocabulary) + 1, -1, dtype=np.int64)
+    for token, raw_id in raw_vocabulary.items():
+        term = _normalize(token)
+        if term:
+            to_term[raw_id] = vocabulary.setdefault(term, len(vocabulary))
+    term_ids = to_term[np.asarray(raw_ids, dtype=np.int64)]
+    tf = np.asarray(counts, dtype=np.float64)
+    docs = np.repeat(np.arange(len(documents), dtype=np.int64), doc_sizes)
+    kept = term_ids >= 0
+    term_ids, tf, docs = term_ids[kept], tf[kept], docs[kept]
+
+    # Merge tokens that normalize to the same term ("python." and "python")
+    width = max(len(vocabulary), 1)
+    pairs, inverse = np.unique(docs * width + term_ids, return_inverse=True)
+    tf = np.bincount(inverse.ravel(), weights=tf, minlength=len(pairs))
+    sizes = np.bincount(pairs // width, minlength=len(documents))
+    return (pairs % width).astype(np.int32), tf.astype(np.float32), sizes
+
+
+class BM25Index:
+    """
+    BM25 over a fixed set of documents, stored as a term-sorted sparse matrix.
+
+    Per-entry BM25 weights are precomputed at build time, so scoring a query
+    is a handful of array slices and one `np.bincount` over the matches.
+    """
+
+    def __init__(self, documents: list, k1: float = 1.5, b: float = 0.75):
+        vocabulary = {}
+        self._build(vocabulary, *count_terms(documents, vocabulary), k1, b)
+
+    @classmethod
+    def from_counts(
+        cls, vocabulary: dict, term_ids, tf, sizes, k1: float = 1.5, b: float = 0.75
+    ) -> "BM25Index":
+        """An index over documents already counted by `count_terms`."""
+        index = cls.__new__(cls)
+        index._build(vocabulary, term_ids, tf, sizes, k1, b)
+        return index
+
+    def _build(self, vocabulary: dict, term_ids, tf, sizes, k1: float, b: float):
+        self.size = len(sizes)
+        self.vocabulary = vocabulary
+        docs = np.repeat(np.arange(self.size, dtype=np.int32), sizes)
+        tf = tf.astype(np.float64)
+        lengths = np.bincount(docs, weights=tf, minlength=self.size)
+
+        # Sort the (term, document) pairs by term; a stable sort keeps each
+        # term's documents in order
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, tf, self.doc_ids = term_ids[order], tf[order], docs[order]
+        df = np.bincount(term_ids, minlength=len(vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(df)))
+        self.idf = np.log1p((self.size - df + 0.5) / (df + 0.5))
+
+        average = lengths.mean() if self.size else 0.0
+        norm = k1 * (1 - b + b * lengths / (average or 1.0))
+        self.weights = (
+            self.idf[term_ids] * tf * (k1 + 1) / (tf + norm[self.doc_ids])
+        ).astype(np.float32)
+
+    def scores(self, query: dict) -> np.ndarray:
+        """BM25 score of every document for `{term: weight}`."""
+        docs, weights = [], []
+        for term, weight in query.items():
+            term_id = self.vocabulary.get(term)
+            # A shared vocabulary may have grown since this index was built
+            if term_id is None or term_id >= len(self.idf):
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs.append(self.doc_ids[start:end])
+            # Saturate repeated query terms like BM25 does for documents
+            weights.append(self.weights[start:end] * (1 + math.log(weight)))
+        if not docs:
+            return np.zeros(self.size, dtype=np.float32)
+        return np.bincount(
+            np.concatenate(docs), np.concatenate(weights), minlength=self.size
+        ).astype(np.float32)
+
+    def top_k(self, query: dict, k: int) -> list:
+        """`(document index, score)` of the `k` best matches, best first."""
+        scores = self.scores(query)
+        k = min(k, self.size)
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(i), float(scores[i])) for i in best]
+
+
+def _document(posting) -> str:
+    # Titles are short but say the most about a role; count them twice
+    return f"{posting.title}\n{posting.title}\n{posting.description}"
+
+
+def _key(posting) -> str:
+    return posting.job_id or cache_key(_document(posting))
+
+
+class PostingTerms:
+    """
+    Term counts of postings' titles and descriptions, kept in
+    `<directory>/terms.npz`.
+
+    Like `VectorIndex.upsert`, `upsert` only tokenizes postings that are new
+    or changed, so ranking a store that grew by one scrape doesn't tokenize
+    the rest again. `index` assembles a `BM25Index` over any stored postings
+    from their counts. A changed posting's old counts are dropped once they
+    outnumber the live ones.
+    """
+
+    def __init__(self, directory: str = DEFAULT_BM25_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, "terms.npz")
+        self._lock = threading.Lock()
+        self.vocabulary = {}
+        # Per row: the posting's key and the hash of the text counted
+        self.keys, self.hashes = [], []
+        self.rows = {}
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.term_ids = np.zeros(0, dtype=np.int32)
+        self.tf = np.zeros(0, dtype=np.float32)
+        try:
+            self._load()
+        except (OSError, ValueError, KeyError):
+            pass  # Missing or unreadable: postings are counted again
+
+    def _load(self) -> None:
+        with np.load(self.path) as arrays:
+            # Term IDs are positions, in the order they were assigned
+            vocabulary = {t: i for i, t in enumerate(arrays["terms"].tolist())}
+            keys, hashes = arrays["keys"].tolist(), arrays["hashes"].tolist()
+            starts, sizes = arrays["starts"], arrays["sizes"]
+            term_ids, tf = arrays["term_ids"], arrays["tf"]
+        self.vocabulary, self.keys, self.hashes = vocabulary, keys, hashes
+        self.starts, self.sizes, self.term_ids, self.tf = starts, sizes, term_ids, tf
+        self.rows = {key: row for row, key in enumerate(keys)}
+
+    def _save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see half the counts
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.savez(
+                file,
+                terms=np.array(list(self.vocabulary), dtype=str),
+                keys=np.array(self.keys, dtype=str),
+                hashes=np.array(self.hashes, dtype=str),
+                starts=self.starts,
+                sizes=self.sizes,
+                term_ids=self.term_ids,
+                tf=self.tf,
+            )
+        os.replace(tmp_path, self.path)
+
+    def _gather(self, rows) -> tuple:
+        """`(term_ids, tf, sizes)` of `rows`, in that order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        sizes = self.sizes[rows]
+        # Each entry's position in its row, offset by where the row starts
+        shift = np.repeat(self.starts[rows] - (np.cumsum(sizes) - sizes), sizes)
+        entries = shift + np.arange(shift.size)
+        return self.term_ids[entries], self.tf[entries], sizes
+
+    def upsert(self, postings: list) -> dict:
+        """
+        Count the terms of postings that are new or changed, and save them.
+        Returns counts of added, updated and unchanged postings.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        with self._lock:
+            pending = {}
+            for posting in postings:
+                key, text = _key(posting), _document(posting)
+                digest = cache_key(text)
+                row = self.rows.get(key)
+                if row is not None and self.hashes[row] == digest:
+                    counts["unchanged"] += 1
+                else:
+                    pending[key] = (text, digest, row is None)
+            if not pending:
+                return counts
+
+            term_ids, tf, sizes = count_terms(
+                [text for text, _, _ in pending.values()], self.vocabulary
+            )
+            starts = len(self.term_ids) + np.cumsum(sizes) - sizes
+            self.starts = np.concatenate((self.starts, starts))
+            self.sizes = np.concatenate((self.sizes, sizes))
+            self.term_ids = np.concatenate((self.term_ids, term_ids))
+            self.tf = np.concatenate((self.tf, tf))
+            for key, (_, digest, new) in pending.items():
+                self.rows[key] = len(self.keys)
+                self.keys.append(key)
+                self.hashes.append(digest)
+                counts["added" if new else "updated"] += 1
+
+            if len(self.keys) > 2 * len(self.rows):
+                self._compact()
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Couldn't save posting term counts to {self.path}: {e}")
+        return counts
+
+    def _compact(self) -> None:
+        """Drop the rows of postings that have since changed."""
+        live = sorted(self.rows.values())
+        self.term_ids, self.tf, self.sizes = self._gather(live)
+        self.starts = np.cumsum(self.sizes) - self.sizes
+        self.keys = [self.keys[row] for row in live]
+        self.hashes = [self.hashes[row] for row in live]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+
+    def index(self, postings: list, k1: float = 1.5, b: float = 0.75) -> BM25Index:
+        """BM25 over `postings`, in order; they must have been upserted."""
+        with self._lock:
+            rows = [self.rows[_key(posting)] for posting in postings]
+            counts = self._gather(rows)
+        return BM25Index.from_counts(self.vocabulary, *counts, k1=k1, b=b)
+
+
+_terms = {}
+_terms_lock = threading.Lock()
+
+
+def get_posting_terms(directory: str = DEFAULT_BM25_DIR) -> PostingTerms:
+    """Return the process-wide term counts kept in `directory`, loading them on first use."""
+    directory = os.path.abspath(directory)
+    with _terms_lock:
+        if directory not in _terms:
+            _terms[directory] = PostingTerms(directory)
+        return _terms[directory]
+
+
+_indexes = LRUCache(max_entries=4)
+
+
+def posting_index(postings: list, directory: str = DEFAULT_BM25_DIR) -> BM25Index:
+    """
+    BM25 index over postings' titles and descriptions, reused while they're
+    unchanged. Term counts are kept in `directory`, so only postings that
+    are new or changed since an earlier run are tokenized.
+    """
+    key = cache_key(*(f"{p.job_id}:{content_hash(p)}" for p in postings))
+    index = _indexes.get(key)
+    if index is None:
+        terms = get_posting_terms(directory)
+        terms.upsert(postings)
+        index = terms.index(postings)
+        _indexes.set(key, index)
+    return index
+
+
+def rank_postings(cv_markdown: str, postings: list, top_k: int = 10) -> list:
+    """
+    The `top_k` postings that best match a CV, as `(posting, score)`, best
+    first. Scores are BM25 over the titles and descriptions; no LLM is used.
+    """
+    ranked = posting_index(postings).top_k(cv_query(cv_markdown), top_k)
+    return [(postings[i], score) for i, score in ranked]
+
+
+__all__ = [
+    "BM25Index",
+    "DEFAULT_BM25_DIR",
+    "PostingTerms",
+    "count_terms",
+    "cv_query",
+    "get_posting_terms",
+    "posting_index",
+    "rank_postings",
+    "terms",
+]
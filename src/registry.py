@@ -0,0 +1,107 @@
+import importlib
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """
+    A tool declared by name and signature. The module defining it (and its
+    dependencies: llama_index, requests, bs4, numpy) is only imported when
+    the tool is first loaded, so `signature` is written out by hand;
+    tests/test_registry.py checks it against the function's.
+    """
+
+    name: str
+    signature: str
+    module: str = ".tools"
+    _loaded: dict = field(default_factory=dict, compare=False, repr=False)
+
+    def load(self):
+        """The tool's function, importing its module on first use."""
+        if "fn" not in self._loaded:
+            module = importlib.import_module(self.module, __package__)
+            self._loaded["fn"] = getattr(module, self.name)
+        return self._loaded["fn"]
+
+    def function_tool(self):
+        """The tool wrapped as a llama_index `FunctionTool`."""
+        if "tool" not in self._loaded:
+            from llama_index.core.tools import FunctionTool
+
+            self._loaded["tool"] = FunctionTool.from_defaults(async_fn=self.load())
+        return self._loaded["tool"]
+
+    async def __call__(self, *args, **kwargs):
+        return await self.load()(*args, **kwargs)
+
+
+TOOLS = {
+    spec.name: spec
+    for spec in [
+        ToolSpec("read_job", "read_job(job_url: str) -> str"),
+        ToolSpec("read_cv", "read_cv(cv_path: str) -> tuple[str, str]"),
+        ToolSpec("assess_cv", "assess_cv(cv_content: str, job_posting: str) -> str"),
+        ToolSpec(
+            "rewrite_cv",
+            "rewrite_cv(latex_cv: str, job_posting: str, cv_assessment: str, "
+            "ctx: Context = None) -> str",
+        ),
+        ToolSpec(
+            "save_resume",
+            "save_resume(ctx: Context, resume_content: str, filename: str) -> str",
+        ),
+        ToolSpec(
+            "scrape_linkedin_jobs",
+            "scrape_linkedin_jobs(ctx: Context, "
+            "job_name: str = 'Artificial Intelligence', "
+            "location: str = 'Riyadh, Riyadh Region, Saudi Arabia', "
+            "max_jobs: int = 25) -> str",
+        ),
+        ToolSpec(
+            "list_job_postings",
+            "list_job_postings(ctx: Context, page: int = 1, page_size: int = 10) -> str",
+        ),
+        ToolSpec(
+            "search_job_postings",
+            "search_job_postings(query: str, limit: int = 10) -> str",
+        ),
+        ToolSpec("get_job_posting", "get_job_posting(job_id: str) -> str"),
+        ToolSpec(
+            "rank_job_postings",
+            "rank_job_postings(ctx: Context, cv_content: str, top_k: int = 10) -> str",
+        ),
+        ToolSpec(
+            "match_job_postings",
+            "match_job_postings(cv_content: str, top_k: int = 10) -> str",
+        ),
+        ToolSpec(
+            "record_notes",
+            "record_notes(ctx: Context, notes: str, notes_title: str) -> str",
+        ),
+        ToolSpec("review_resume", "review_resume(ctx: Context, review: str) -> str"),
+        ToolSpec(
+            "job_match_review",
+            "job_match_review(ctx: Context, job_name: str, review: str) -> str",
+        ),
+    ]
+}
+
+
+def get_tool(name: str) -> ToolSpec:
+    try:
+        return TOOLS[name]
+    except KeyError:
+        raise ValueError(f"Unknown tool {name!r}; known tools: {', '.join(TOOLS)}")
+
+
+def function_tools(names: list) -> list:
+    """`FunctionTool`s for the named tools, importing what they need now."""
+    return [get_tool(name).function_tool() for name in names]
+
+
+__all__ = [
+    "TOOLS",
+    "ToolSpec",
+    "function_tools",
+    "get_tool",
+]
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import sys
+import time
+
+from colorama import Fore, Style
+
+from .tracing import get_tracer
+
+MODES = ("pretty", "quiet", "jsonl")
+
+
+def preview(value, limit: int = 400) -> str:
+    """`value` as one string, with the middle elided past `limit` characters."""
+    text = str(value)
+    if len(text) <= limit:
+        return text
+    head = text[: limit * 2 // 3]
+    tail = text[-(limit // 3) :]
+    return f"{head} … [{len(text) - len(head) - len(tail):,} chars elided] … {tail}"
+
+
+def preview_kwargs(kwargs: dict, limit: int = 120) -> dict:
+    """Tool arguments with long values (whole CVs, job blobs) shortened."""
+    return {name: preview(value, limit) for name, value in (kwargs or {}).items()}
+
+
+class EventRenderer:
+    """
+    Writes workflow events to a stream in one of `MODES`.
+
+    - "pretty": colored, human-readable output, as an interactive run shows it.
+    - "quiet": only agent changes, tool calls and the final outputs.
+    - "jsonl": one JSON object per event, for batch jobs and other programs.
+
+    Handlers are looked up by event type once per type. Token deltas (the
+    agent's, and the text of sections being rewritten) are buffered instead
+    of printed and flushed one by one. They are written once `flush_bytes`
+    have built up, `flush_interval` seconds after the last write (on a timer,
+    so a stalled stream still shows), or before any other event.
+
+    Tool outputs are cut to `preview_chars`. With `timings`, each tool
+    result shows the time and tokens its traced span took.
+    """
+
+    def __init__(
+        self,
+        mode: str = "pretty",
+        out=None,
+        flush_interval: float = 0.05,
+        flush_bytes: int = 512,
+        preview_chars: int = 400,
+        timings: bool = True,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown output mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.out = out or sys.stdout
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.preview_chars = preview_chars
+        self.timings = timings
+        self.current_agent = None
+        self.rewriting = set()
+        # Buffered deltas by source: ("agent", name) or ("rewrite", section)
+        self._buffers = {}
+        self._buffered = 0
+        self._shown_source = None
+        self._mid_line = False
+        self._last_flush = time.monotonic()
+        self._flush_timer = None
+        self._handlers = {}
+        # Imported here so `MODES` is cheap to import for argument parsing
+        from llama_index.core.agent.workflow import (
+            AgentInput,
+            AgentOutput,
+            AgentStream,
+            ToolCall,
+            ToolCallResult,
+        )
+
+        from .tools import RewriteProgress
+
+        self._by_type = {
+            AgentStream: self.on_stream,
+            AgentInput: self.on_input,
+            AgentOutput: self.on_output,
+            ToolCall: self.on_tool_call,
+            ToolCallResult: self.on_tool_result,
+            RewriteProgress: self.on_rewrite_progress,
+        }
+
+    def _handler(self, event_type):
+        handler = self._handlers.get(event_type)
+        if handler is None:
+            # Subclasses of a registered event use its handler
+            handler = next(
+                (self._by_type[t] for t in event_type.__mro__ if t in self._by_type),
+                self.on_other,
+            )
+            self._handlers[event_type] = handler
+        return handler
+
+    def render(self, event) -> None:
+        handler = self._handler(type(event))
+        streaming = handler == self.on_stream or (
+            handler == self.on_rewrite_progress and event.status == "streaming"
+        )
+        if not streaming:
+            self.flush()
+            self._end_line()
+        agent = getattr(event, "current_agent_name", None)
+        if agent and agent != self.current_agent:
+            self.flush()
+            self._end_line()
+            self.current_agent = agent
+            self.on_agent_change(agent)
+        handler(event)
+        if not streaming:
+            self.out.flush()
+
+    def close(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self.flush()
+        if self.mode == "pretty":
+            self._write(Style.RESET_ALL)
+        self.out.flush()
+
+    def _write(self, text: str) -> None:
+        self.out.write(text)
+
+    def _end_line(self) -> None:
+        """
+        Start other output on a new line after streamed text, and re-label the
+        next stream.
+        """
+        if self._mid_line and self.mode == "pretty":
+            self._write("\n")
+        self._mid_line = False
+        self._shown_source = None
+
+    def _emit(self, record: dict) -> None:
+        self.out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    # Token deltas
+
+    def flush(self, whole_lines: bool = False) -> None:
+        """
+        Write the buffered deltas. With `whole_lines`, pretty mode holds back
+        each section's unfinished last line, so sections rewritten
+        concurrently take turns a line at a time rather than mid-line.
+        """
+        self._last_flush = time.monotonic()
+        if not self._buffers:
+            return
+        for source in list(self._buffers):
+            text = "".join(self._buffers.pop(source))
+            if whole_lines and self.mode == "pretty" and source[0] == "rewrite":
+                head, newline, rest = text.rpartition("\n")
+                if rest and len(rest) < self.flush_bytes:
+                    self._buffers[source] = [rest]
+                    text = head + newline
+            if text:
+                self._write_delta(source, text)
+        self._buffered = sum(
+            len(d) for deltas in self._buffers.values() for d in deltas
+        )
+        self.out.flush()
+
+    def _write_delta(self, source: tuple, text: str) -> None:
+        kind, name = source
+        if self.mode == "pretty":
+            if kind == "rewrite":
+                # Label whose text follows, since sections are rewritten concurrently
+                if self._shown_source != source:
+                    self._end_line()
+                    self._write(f"✏️  {Fore.YELLOW}{name}:{Style.RESET_ALL}\n")
+                self._write(text)
+            else:
+                self._write(Fore.CYAN + text + Style.RESET_ALL)
+            self._mid_line = not text.endswith("\n")
+        elif kind == "rewrite":
+            self._emit(
+                {
+                    "type": "RewriteProgress",
+                    "section": name,
+                    "status": "streaming",
+                    "delta": text,
+                }
+            )
+        else:
+            self._emit({"type": "AgentStream", "agent": name, "delta": text})
+        self._shown_source = source
+
+    def on_stream(self, event) -> None:
+        if not event.delta or self.mode == "quiet":
+            return
+        self._buffer(("agent", self.current_agent), event.delta)
+
+    def _buffer(self, source: tuple, delta: str) -> None:
+        self._buffers.setdefault(source, []).append(delta)
+        self._buffered += len(delta)
+        if (
+            self._buffered >= self.flush_bytes
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush(whole_lines=True)
+        if self._buffers:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """
+        Write what's buffered `flush_interval` seconds after the last write,
+        even if the stream stalls.
+        """
+        if self._flush_timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Rendering outside an event loop: the next event or close() flushes
+        delay = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+        self._flush_timer = loop.call_later(delay, self._on_flush_timer)
+
+    def _on_flush_timer(self) -> None:
+        self._flush_timer = None
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            # Nothing has arrived for a while: show it all, unfinished lines too
+            self.flush()
+        elif self._buffers:
+            self._schedule_flush()
+
+    # Other events
+
+    def on_agent_change(self, agent: str) -> None:
+        if self.mode == "jsonl":
+            self._emit({"type": "AgentChange", "agent": agent})
+        else:
+            rule = "=" * 50
+            self._write(
+                f"\n{rule}\n🤖 {Fore.GREEN}Agent: {agent}{Style.RESET_ALL}\n{rule}\n\n"
+            )
+
+    def on_input(self, event) -> None:
+        if self.mode == "pretty":
+            self._write(f"📥 {Fore.CYAN}Input:{Style.RESET_ALL} {event.input}\n")
+
+    def on_output(self, event) -> None:
+        content = event.response.content
+        tools = [call.tool_name for call in event.tool_calls or ()]
+        if self.mode == "jsonl":
+            self._emit({"type": "AgentOutput", "content": content, "tool_calls": tools})
+            return
+        if content:
+            self._write(f"📤 Output: {content}\n")
+        if tools and self.mode == "pretty":
+            self._write(
+                f"🛠️  {Fore.GREEN}Planning to use tools:{Style.RESET_ALL} {tools}\n"
+            )
+
+    def on_tool_call(self, event) -> None:
+        kwargs = preview_kwargs(event.tool_kwargs)
+        if self.mode == "jsonl":
+            self._emit({"type": "ToolCall", "tool": event.tool_name, "kwargs": kwargs})
+        elif self.mode == "quiet":
+            self._write(f"🔨 {event.tool_name}\n")
+        else:
+            self._write(
+                f"🔨 {Fore.GREEN}Calling Tool: {event.tool_name}\n"
+                f"  With arguments: {kwargs}{Style.RESET_ALL}\n"
+            )
+
+    def on_tool_result(self, event) -> None:
+        output = preview(event.tool_output, self.preview_chars)
+        span = get_tracer().last(event.tool_name) if self.timings else None
+        if self.mode == "jsonl":
+            record = {
+                "type": "ToolCallResult",
+                "tool": event.tool_name,
+                "output": output,
+            }
+            if span is not None:
+                record["seconds"] = round(span.duration, 3)
+                record["prompt_tokens"] = span.prompt_tokens
+                record["completion_tokens"] = span.completion_tokens
+                record["cache_hits"] = span.cache_hits
+            self._emit(record)
+        elif self.mode == "quiet":
+            if span is not None:
+                self._write(f"   {event.tool_name}: {span.timing()}\n")
+        else:
+            timing = f" ⏱ {span.timing()}" if span is not None else ""
+            self._write(
+                f"🔧 Tool Result ({event.tool_name}){timing}:\n"
+                f"  Arguments: {preview_kwargs(event.tool_kwargs)}\n"
+                f"  Output: {output}\n"
+            )
+
+    def on_rewrite_progress(self, event) -> None:
+        if event.status == "streaming":
+            if not event.delta or self.mode == "quiet":
+                return
+            if self.mode == "jsonl" and event.section not in self.rewriting:
+                self.flush()
+                self._emit(
+                    {
+                        "type": "RewriteProgress",
+                        "section": event.section,
+                        "status": "rewriting",
+                    }
+                )
+            self.rewriting.add(event.section)
+            # The section's new text, coalesced like the agent's tokens
+            self._buffer(("rewrite", event.section), event.delta)
+            return
+        if self.mode == "jsonl":
+            self._emit(
+                {
+                    "type": "RewriteProgress",
+                    "section": event.section,
+                    "status": event.status,
+                }
+            )
+        elif self.mode == "pretty":
+            self._write(
+                f"✏️  {Fore.YELLOW}{event.section}: {event.status}{Style.RESET_ALL}\n"
+            )
+
+    def on_other(self, event) -> None:
+        if self.mode == "jsonl":
+            self._emit({"type": type(event).__name__})
+
+
+__all__ = [
+    "EventRenderer",
+    "MODES",
+    "preview",
+    "preview_kwargs",
+]
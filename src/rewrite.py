@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import re
+from collections import Counter, defaultdict
+
+from .cache import cache_key, get_cache
+from .latex import (
+    BalanceChecker,
+    Section,
+    compact_body,
+    extract_body,
+    split_document,
+    split_sections,
+    validate_latex,
+)
+from .llm import get_gateway, model_id
+
+# Bump when the section rewrite prompt changes so cached rewrites are redone
+REWRITE_SECTION_PROMPT_VERSION = "1"
+
+# Words an assessment tends to use for each common CV section, matched at the
+# start of a word (so stems like "technolog" cover their inflections). Words
+# most assessments use anyway ("about", "role", "tools", "bullet") would
+# select every section, so they're left out.
+SECTION_ALIASES = {
+    "summary": ("summary", "profile", "objective"),
+    "skills": ("skill", "technolog", "stack", "keyword"),
+    "experience": ("experience", "achievement", "responsibilit"),
+    "education": ("education", "degree", "coursework", "gpa", "university"),
+    "publications": ("publication", "paper"),
+    "certificates": ("certificat", "credential"),
+    "projects": ("project", "portfolio"),
+}
+# Title words too generic to mean their section when an assessment uses them
+_GENERIC_TITLE_WORDS = {"work", "professional", "relevant", "additional", "other"}
+
+
+def _mentions(text: str, words) -> bool:
+    return any(re.search(rf"\b{re.escape(word)}", text) for word in words)
+
+
+def _title_words(title: str) -> set:
+    """Words that refer to a section titled `title`: its own and its kind's aliases."""
+    words = {title, *re.findall(r"[a-z]{4,}", title)} - _GENERIC_TITLE_WORDS
+    for alias, variants in SECTION_ALIASES.items():
+        if _mentions(title, (alias, *variants)):
+            words.update(variants)
+    return words
+
+
+def section_mentioned(section: Section, enhancements: str) -> bool:
+    """Whether the assessment's enhancements (lowercased) refer to this section."""
+    if not section.title:
+        return bool(re.search(r"\b(header|contact|headline)\b", enhancements))
+    return _mentions(enhancements, _title_words(section.title.lower()))
+
+
+_section_cache_stats = defaultdict(Counter)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def section_cache_report() -> str:
+    """Section rewrite cache hit rates so far, per section type."""
+    return ", ".join(
+        f"{kind} {stats['hits']}/{stats['hits'] + stats['misses']}"
+        f" ({stats['hits'] / (stats['hits'] + stats['misses']):.0%})"
+        for kind, stats in sorted(_section_cache_stats.items())
+    )
+
+
+def section_type(section: Section) -> str:
+    """The `SECTION_ALIASES` kind of a section, "header", or "other"."""
+    if not section.title:
+        return "header"
+    title = section.title.lower()
+    for alias, variants in SECTION_ALIASES.items():
+        if _mentions(title, (alias, *variants)):
+            return alias
+    return "other"
+
+
+def relevant_enhancements(section: Section, enhancements: str) -> str:
+    """
+    The sentences of the enhancements that refer to a section, or all of
+    them when none does (the section was picked as a default target).
+    """
+    sentences = [
+        s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", enhancements) if s.strip()
+    ]
+    relevant = [s for s in sentences if section_mentioned(section, s.lower())]
+    return "\n".join(relevant) if relevant else enhancements.strip()
+
+
+def sections_to_rewrite(sections: list, enhancements: str) -> list:
+    """Indices of the sections to rewrite; all titled sections if none is named."""
+    enhancements = enhancements.lower()
+    touched = [i for i, s in enumerate(sections) if section_mentioned(s, enhancements)]
+    if touched:
+        return touched
+    return [i for i, s in enumerate(sections) if s.title] or list(range(len(sections)))
+
+
+class RewriteAborted(Exception):
+    """A streamed section rewrite was stopped because its output went bad."""
+
+
+class SectionWriter:
+    """
+    Writes sections to a file in document order while they are generated.
+
+    Deltas for the earliest unfinished section go straight to the file; later
+    sections are buffered until everything before them is done. When a
+    section finishes with text that differs from what was streamed (fences
+    stripped, or an aborted generation replaced by the original), its part of
+    the file is truncated and rewritten.
+    """
+
+    def __init__(self, file, count: int):
+        self.file = file
+        self.count = count
+        self.head = 0
+        self.buffers = [[] for _ in range(count)]
+        self.final = [None] * count
+        self.start = file.tell()
+
+    def write(self, index: int, delta: str) -> None:
+        self.buffers[index].append(delta)
+        if index == self.head:
+            self.file.write(delta)
+
+    def reset(self, index: int) -> None:
+        """Forget what was streamed for a section (e.g. before falling back)."""
+        self.buffers[index] = []
+        if index == self.head:
+            self.file.seek(self.start)
+            self.file.truncate()
+
+    def finish(self, index: int, text: str) -> None:
+        self.final[index] = text
+        while self.head < self.count and self.final[self.head] is not None:
+            final = self.final[self.head]
+            if "".join(self.buffers[self.head]) != final:
+                self.file.seek(self.start)
+                self.file.truncate()
+                self.file.write(final)
+            self.buffers[self.head] = []
+            self.head += 1
+            self.start = self.file.tell()
+            if self.head < self.count:
+                self.file.write("".join(self.buffers[self.head]))
+        self.file.flush()
+
+
+async def rewrite_section(
+    section: Section,
+    job_posting: str,
+    enhancements: str,
+    defined_names: str,
+    on_delta=None,
+    max_growth: float = 4.0,
+) -> str:
+    """
+    Stream a rewrite of one section, checking LaTeX balance as tokens arrive.
+
+    `on_delta(delta)` is called for each chunk. The generation is aborted
+    (raising `RewriteAborted`) as soon as braces or environments can't
+    balance, or the output grows past `max_growth` times the section.
+    """
+    what = (
+        f"the '{section.title}' section" if section.title else "the header"
+    ) + " of a cv written in latex"
+    source = compact_body(section.text).strip()
+    lead = section.text[: len(section.text) - len(section.text.lstrip())]
+    # A section gets the same rewrite whenever it and its guidance are unchanged,
+    # so tailoring one CV to similar postings doesn't regenerate it each time
+    enhancements = relevant_enhancements(section, enhancements)
+    cache = get_cache("section_rewrites")
+    key = cache_key(
+        _digest(source),
+        _digest(enhancements),
+        _digest(defined_names),
+        model_id(get_gateway().llm),
+        REWRITE_SECTION_PROMPT_VERSION,
+    )
+    stats = _section_cache_stats[section_type(section)]
+    cached = cache.get(key)
+    if cached is not None:
+        stats["hits"] += 1
+        if on_delta is not None:
+            on_delta(cached)
+        return lead + cached
+    stats["misses"] += 1
+
+    rewrite_section_prompt_raw = (
+        "You are an experienced cv writer. "
+        f"Below is {what}, a job posting and the enhancements recommended "
+        "by an expert after matching the cv against the job. "
+        "Rewrite this part only, applying the enhancements that concern it, "
+        "to make the cv a better match. Keep the same latex structure and commands. "
+        f"Custom environments and commands available: {defined_names or 'none'}. "
+        "Respond with the rewritten latex only."
+        "\nCV Section:\n\n"
+        f"{source}\n\n"
+        "Job Posting:\n\n"
+        f"{job_posting}\n\n"
+        "Enhancements\n\n"
+        f"{enhancements}\n\n"
+        "Your output:"
+    )
+    limit = max(int(len(source) * max_growth), len(source) + 2000)
+    checker = BalanceChecker()
+    chunks = []
+    size = 0
+    stream = get_gateway().stream_complete(rewrite_section_prompt_raw)
+    try:
+        async for delta in stream:
+            chunks.append(delta)
+            size += len(delta)
+            # Fence lines are stripped later; don't let their backticks count
+            error = checker.feed(delta.replace("`", ""))
+            if error is None and size > limit:
+                error = f"output passed {limit} characters"
+            if error:
+                raise RewriteAborted(error)
+            if on_delta is not None:
+                on_delta(delta)
+    finally:
+        await stream.aclose()
+
+    text = extract_body("".join(chunks)).strip("\n")
+    if not text.strip():
+        # An empty answer would delete the section; keep the original instead
+        raise RewriteAborted("empty output")
+    checker = BalanceChecker()
+    error = checker.feed(text) or checker.close()
+    if error:
+        raise RewriteAborted(error)
+    cache.set(key, text)
+    return lead + text
+
+
+async def rewrite_sections(
+    body: str,
+    job_posting: str,
+    enhancements: str,
+    defined_names: str = "",
+    file=None,
+    on_progress=None,
+) -> str:
+    """
+    Rewrite the sections the enhancements touch, concurrently, and stitch the
+    body back together in the original order. Untouched sections are copied
+    through verbatim, and so is any section whose rewrite was aborted.
+
+    With `file`, the body is written to it in order as it is generated.
+    `on_progress(title, delta, status)` reports each chunk (status "streaming")
+    and the outcome of each section ("done" or "aborted: <reason>").
+    """
+    sections = split_sections(body)
+    targets = sections_to_rewrite(sections, enhancements)
+    print(
+        "Rewriting sections: "
+        + ", ".join(sections[i].title or "(header)" for i in targets)
+    )
+    writer = SectionWriter(file, len(sections)) if file is not None else None
+    texts = [section.text for section in sections]
+
+    def report(index, delta, status):
+        if on_progress is not None:
+            on_progress(sections[index].title or "(header)", delta, status)
+
+    async def run(index):
+        def on_delta(delta):
+            if writer is not None:
+                writer.write(index, delta)
+            report(index, delta, "streaming")
+
+        try:
+            texts[index] = await rewrite_section(
+                sections[index], job_posting, enhancements, defined_names, on_delta
+            )
+            report(index, "", "done")
+        except RewriteAborted as e:
+            print(f"Rewrite of {sections[index].title or 'header'} aborted: {e}")
+            if writer is not None:
+                writer.reset(index)
+            report(index, "", f"aborted: {e}")
+        if writer is not None:
+            writer.finish(index, texts[index] + sections[index].trailer)
+
+    if writer is not None:
+        for i, section in enumerate(sections):
+            if i not in targets:
+                writer.finish(i, section.source)
+    await asyncio.gather(*(run(i) for i in targets))
+    print(f"Section rewrite cache hits: {section_cache_report()}")
+    return "".join(text + section.trailer for text, section in zip(texts, sections))
+
+
+async def repair_section(section: Section, issues: list, defined_names: str) -> str:
+    """Ask the LLM to fix only the listed problems in one section."""
+    what = f"the '{section.title}' section" if section.title else "the header"
+    problems = "\n".join(f"- {issue}" for issue in issues)
+    repair_section_prompt_raw = (
+        f"Below is {what} of a cv written in latex. A syntax check found these "
+        f"problems in it:\n{problems}\n"
+        "Fix these problems only: close or rename the environments and braces, "
+        "and replace undefined commands with standard ones. Do not change the wording. "
+        f"Custom environments and commands available: {defined_names or 'none'}. "
+        "Respond with the corrected latex only."
+        "\nCV Section:\n\n"
+        f"{section.text.strip()}\n\n"
+        "Your output:"
+    )
+    response = await get_gateway().complete(repair_section_prompt_raw)
+    text = extract_body(response.text).strip("\n")
+    if not text.strip():
+        return section.text
+    lead = section.text[: len(section.text) - len(section.text.lstrip())]
+    return lead + text
+
+
+async def repair_latex(
+    source: str, reference: str = None, defined_names: str = "", max_attempts: int = 2
+) -> tuple[str, list]:
+    """
+    Validate a LaTeX document and repair only the sections that are broken.
+
+    Broken sections are sent to the LLM concurrently, up to `max_attempts`
+    times. Sections still broken after that are replaced by the section of
+    the same title in `reference` (the original document), and a missing
+    `\\end{document}` is appended. Returns the document and remaining issues.
+    """
+    issues = validate_latex(source, reference)
+    for attempt in range(max_attempts + 1):
+        broken = {}
+        for issue in issues:
+            if issue.section_index >= 0:
+                broken.setdefault(issue.section_index, []).append(issue)
+        if not broken:
+            break
+        preamble, body, tail = split_document(source)
+        sections = split_sections(body)
+        texts = [section.text for section in sections]
+        if attempt < max_attempts:
+            print(
+                "Repairing LaTeX in: "
+                + ", ".join(sections[i].title or "(header)" for i in broken)
+            )
+            results = await asyncio.gather(
+                *(
+                    repair_section(sections[i], found, defined_names)
+                    for i, found in broken.items()
+                ),
+                return_exceptions=True,
+            )
+            for i, result in zip(broken, results):
+                if isinstance(result, Exception):
+                    print(f"Repair of {sections[i].title or 'header'} failed: {result}")
+                else:
+                    texts[i] = result
+        elif reference is not None:
+            originals = {}
+            for section in split_sections(split_document(reference)[1]):
+                originals.setdefault(section.title, section.text)
+            for i in broken:
+                if sections[i].title in originals:
+                    print(f"Restoring original {sections[i].title or 'header'}")
+                    texts[i] = originals[sections[i].title]
+        body = "".join(text + s.trailer for text, s in zip(texts, sections))
+        source = preamble + body + tail
+        issues = validate_latex(source, reference)
+
+    if any(issue.kind == "document" for issue in issues):
+        source = source.rstrip("\n") + "\n\\end{document}\n"
+        issues = validate_latex(source, reference)
+    return source, issues
+
+
+__all__ = [
+    "RewriteAborted",
+    "SectionWriter",
+    "repair_latex",
+    "relevant_enhancements",
+    "repair_section",
+    "rewrite_section",
+    "rewrite_sections",
+    "section_cache_report",
+    "section_type",
+    "sections_to_rewrite",
+]
@@ -0,0 +1,292 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Iterable, Optional
+
+from .postings import JobPosting, job_id_from_link
+
+DEFAULT_STORE_PATH = os.getenv("JOB_STORE_PATH", "job_postings.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    job_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT NOT NULL,
+    link TEXT NOT NULL,
+    description TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_company ON postings (company);
+CREATE TABLE IF NOT EXISTS posting_signatures (
+    job_id TEXT PRIMARY KEY,
+    cluster_id TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+"""
+
+# External-content FTS index kept in sync with `postings` by triggers.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, company, description, content='postings', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS postings_ai AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_ad AFTER DELETE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_au AFTER UPDATE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+    INSERT INTO postings_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+"""
+
+_COLUMNS = "job_id, title, company, location, link, description"
+
+
+def content_hash(posting: JobPosting) -> str:
+    """Hash of the fields that matter to the agent; unchanged re-scrapes hash the same."""
+    content = "\x1f".join(
+        (posting.title, posting.company, posting.location, posting.description)
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def parse_posting_file(text: str) -> Optional[JobPosting]:
+    """Parse the plain-text layout written by `JobPosting.to_text()`."""
+    header, sep, description = text.partition("Job Description:\n")
+    if not sep:
+        return None
+    fields = {}
+    for line in header.splitlines():
+        key, _, value = line.partition(": ")
+        fields[key.strip()] = value.strip()
+    link = fields.get("Job Link", "")
+    return JobPosting(
+        job_id=job_id_from_link(link) if link else "",
+        title=fields.get("Job Title", ""),
+        company=fields.get("Company", ""),
+        location=fields.get("Location", ""),
+        link=link,
+        description=description.strip(),
+    )
+
+
+class JobStore:
+    """
+    SQLite-backed job posting store keyed by LinkedIn job ID.
+
+    Re-scraped postings are only written when their content hash changed, and
+    descriptions are full-text searchable when SQLite ships with FTS5.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert_many(self, postings: Iterable[JobPosting]) -> dict:
+        """
+        Insert new postings and update changed ones in a single transaction.
+
+        Postings with an `error` are skipped. Returns counts of inserted,
+        updated and unchanged postings.
+        """
+        postings = [p for p in postings if not p.error and p.job_id]
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        if not postings:
+            return counts
+
+        existing = {}
+        ids = [p.job_id for p in postings]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i : i + 500]
+            rows = self.conn.execute(
+                "SELECT job_id, content_hash FROM postings WHERE job_id IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            existing.update(rows)
+
+        now = time.time()
+        inserts, updates = [], []
+        for posting in postings:
+            digest = content_hash(posting)
+            old = existing.get(posting.job_id)
+            if old == digest:
+                counts["unchanged"] += 1
+                continue
+            row = (
+                posting.title,
+                posting.company,
+                posting.location,
+                posting.link,
+                posting.description,
+                digest,
+            )
+            if old is None:
+                inserts.append((posting.job_id, *row, now, now))
+                counts["inserted"] += 1
+            else:
+                updates.append((*row, now, posting.job_id))
+                counts["updated"] += 1
+            existing[posting.job_id] = digest
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO postings (job_id, title, company, location, link, "
+                "description, content_hash, scraped_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                inserts,
+            )
+            self.conn.executemany(
+                "UPDATE postings SET title = ?, company = ?, location = ?, link = ?, "
+                "description = ?, content_hash = ?, updated_at = ? WHERE job_id = ?",
+                updates,
+            )
+        return counts
+
+    def get(self, job_id: str) -> Optional[JobPosting]:
+        row = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM postings WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return JobPosting(*row) if row else None
+
+    def get_many(self, job_ids: list) -> list:
+        found = {}
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i : i + 500]
+            rows = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM postings WHERE job_id IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((row[0], JobPosting(*row)) for row in rows)
+        return [found[job_id] for job_id in job_ids if job_id in found]
+
+    def page(self, offset: int = 0, limit: int = 50) -> list:
+        """Most recently updated postings first."""
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM postings ORDER BY updated_at DESC, job_id "
+            "LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [JobPosting(*row) for row in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Full-text search over titles, companies and descriptions, best match first."""
+        if self.has_fts:
+            # Quote each term so user input can't be parsed as FTS syntax
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in query.split())
+            if not match:
+                return []
+            rows = self.conn.execute(
+                f"SELECT {', '.join('p.' + c for c in _COLUMNS.split(', '))} "
+                "FROM postings_fts JOIN postings p ON p.rowid = postings_fts.rowid "
+                "WHERE postings_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit),
+            )
+        else:
+            like = f"%{query}%"
+            rows = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM postings WHERE title LIKE ? "
+                "OR company LIKE ? OR description LIKE ? LIMIT ?",
+                (like, like, like, limit),
+            )
+        return [JobPosting(*row) for row in rows]
+
+    def signatures(self) -> list:
+        """`(job_id, cluster_id, signature)` rows saved by the deduplicator."""
+        return self.conn.execute(
+            "SELECT job_id, cluster_id, signature FROM posting_signatures"
+        ).fetchall()
+
+    def save_signatures(self, rows: list) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO posting_signatures "
+                "(job_id, cluster_id, signature) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def migrate_text_files(self, directory: str = "job_postings") -> dict:
+        """Import the legacy `job_postings/*.txt` files in one bulk upsert."""
+        postings = []
+        skipped = 0
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".txt"):
+                continue
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+                posting = parse_posting_file(file.read())
+            if posting is None:
+                skipped += 1
+                continue
+            if not posting.job_id:
+                # No link to key on: fall back to the file name
+                posting.job_id = os.path.splitext(name)[0]
+            postings.append(posting)
+        counts = self.upsert_many(postings)
+        counts["skipped"] = skipped
+        return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local job posting store.")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="store path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="import job_postings/*.txt files")
+    migrate.add_argument("directory", nargs="?", default="job_postings")
+    search = commands.add_parser("search", help="full-text search postings")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="print one posting by job ID")
+    show.add_argument("job_id")
+    args = parser.parse_args(argv)
+
+    with JobStore(args.db) as store:
+        if args.command == "migrate":
+            print(store.migrate_text_files(args.directory))
+        elif args.command == "search":
+            for posting in store.search(args.query, limit=args.limit):
+                print(posting.summary_line())
+        elif args.command == "show":
+            posting = store.get(args.job_id)
+            print(posting.to_text() if posting else f"No job posting {args.job_id}")
+
+
+if __name__ == "__main__":
+    main()
+
+__all__ = [
+    "JobStore",
+    "content_hash",
+    "parse_posting_file",
+]
@@ -1,95 +1,58 @@
-from llama_index.core.workflow import Context
+from llama_index.core.workflow import Context, Event
 from llama_index.core import PromptTemplate, Settings
-from bs4 import BeautifulSoup
+from llama_index.core.bridge.pydantic import BaseModel, Field
 from typing import Optional
 
-import requests
 import os
 import dotenv
 import asyncio
+import hashlib
+import tempfile
+
+from .cache import cache_key, get_cache
+from .checkpoint import checkpointed
+from .latex import latex_to_markdown, split_latex
+from .llm import get_gateway, model_id
+from .postings import summarize_postings
+from .rewrite import repair_latex, rewrite_sections
+from .store import JobStore
+from .tracing import traced
+
+# Scraping (requests, bs4, selenium) and the numpy-backed dedup, ranking and
+# vector modules are imported inside the tools that use them, so importing
+# this module, or listing its tools, doesn't pay for them
 
 dotenv.load_dotenv()
 
+READ_JOB_ERROR = "An error occured."
+READ_CV_ERROR = "Error loading cv. File path received:"
 
+# Bump when a prompt changes so its cached results are redone
+TEX_TO_MARKDOWN_PROMPT_VERSION = "2"
+ASSESS_CV_PROMPT_VERSION = "1"
+
+
+@checkpointed(ok=lambda result: result != READ_JOB_ERROR)
+@traced
 async def read_job(job_url: str) -> str:
     """
     Useful for scraping job details from a LinkedIn job posting URL.
     """
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from webdriver_manager.chrome import ChromeDriverManager
-
-    # Set up Selenium WebDriver
-    options = Options()
-    options.add_argument("--headless")  # Run in headless mode (no GUI)
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
+    from .browser import get_browser_pool
+    from .fetch import fetch_job
 
+    # Plain HTTP first; a warm headless browser only if the page can't be parsed
     try:
-        driver.get(job_url)
-        wait = WebDriverWait(driver, 10)
-
-        # Extract Job Details
-        job_details = {}
-
-        # Get Job Title
-        job_details["title"] = wait.until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "h1"))
-        ).text
-
-        # Get Company Name
-        job_details["company"] = wait.until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "a.topcard__org-name-link")
-            )
-        ).text
-
-        # Get Location
-        job_details["location"] = wait.until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "span.topcard__flavor--bullet")
-            )
-        ).text
-
-        # Click "See more" button to expand job description if it exists
-        try:
-            see_more_button = wait.until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "button.show-more-less-html__button")
-                )
-            )
-            see_more_button.click()
-            # time.sleep(2)  # Allow time for expansion
-            await asyncio.sleep(2)  # Allow time for expansion
-        except Exception:
-            print("No 'See more' button found, continuing...")
-
-        # Extract Job Description
-        job_details["description"] = wait.until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "div.show-more-less-html__markup")
-            )
-        ).text
-
-        return str(job_details)
-
+        job_details, tier = await fetch_job(job_url, browser_pool=get_browser_pool())
     except Exception as e:
         print(f"Error: {e}")
-        return "An error occured."
-
-    finally:
-        driver.quit()
+        return READ_JOB_ERROR
+    print(f"Read job via {tier}: {job_url}")
+    return str(job_details)
 
 
+@checkpointed(ok=lambda result: result[0] != READ_CV_ERROR)
+@traced
 async def read_cv(cv_path: str) -> tuple[str, str]:  # ctx: Context,
     """
     Useful for reading the applicant's CV
@@ -97,7 +60,7 @@ async def read_cv(cv_path: str) -> tuple[str, str]:  # ctx: Context,
     import os
 
     if cv_path is None or not os.path.exists(cv_path):
-        return ("Error loading cv. File path received:", f"{cv_path}")
+        return (READ_CV_ERROR, f"{cv_path}")
 
     with open(os.path.join(cv_path), "r") as file:
         resume_content = file.read()
@@ -105,32 +68,84 @@ async def read_cv(cv_path: str) -> tuple[str, str]:  # ctx: Context,
     # state["original_latex_cv"] = resume_content
     # await ctx.set("state", state)
     print(f"Read resume file: {cv_path}")
-    tex_to_markdown_prompt_raw = (
-        "You are an experienced latex files reader. "
-        "Convert the cv below written in latex to markdown. "
-        "Respond with the markdown directly. "
-        f"CV:\n\n{resume_content}\n\n"
-        "Markdown:"
-    )
     llm = Settings.llm
-    distilled_cv = llm.complete(tex_to_markdown_prompt_raw, formatted=True)
-    return resume_content, distilled_cv.text
+    cache = get_cache("cv_markdown")
+    key = cache_key(
+        hashlib.sha256(resume_content.encode("utf-8")).hexdigest(),
+        model_id(llm),
+        TEX_TO_MARKDOWN_PROMPT_VERSION,
+    )
+    distilled_cv = cache.get(key)
+    if distilled_cv is not None:
+        return resume_content, distilled_cv
+
+    # Convert locally; only constructs the converter can't map go to the LLM
+    conversion = latex_to_markdown(resume_content)
+    if conversion.fragments:
+        print(f"Converting unmapped LaTeX with the LLM: {conversion.unknown}")
+    gateway = get_gateway()
+    converted_fragments = await asyncio.gather(
+        *(
+            gateway.complete(
+                "You are an experienced latex files reader. "
+                "Convert the fragment below, taken from a cv written in latex, to markdown. "
+                "Respond with the markdown directly. "
+                f"Fragment:\n\n{fragment}\n\n"
+                "Markdown:",
+                formatted=True,
+            )
+            for fragment in conversion.fragments
+        )
+    )
+    converted_fragments = [c.text.strip() for c in converted_fragments]
+    distilled_cv = conversion.fill(converted_fragments)
+    cache.set(key, distilled_cv)
+    return resume_content, distilled_cv
+
+
+class CVAssessment(BaseModel):
+    match_score: int = Field(
+        description="how much the cv matches the job posting", gt=0, lt=11
+    )
+    justification: str = Field(description="justification for the match score given")
+    enhancements: str = Field(
+        description="what can be done to make the cv a better match"
+    )
+
+
+def parse_assessment(cv_assessment: str) -> Optional[CVAssessment]:
+    """Load an assessment returned by `assess_cv`; None if it isn't one."""
+    try:
+        return CVAssessment.model_validate_json(cv_assessment)
+    except ValueError:
+        return None
 
 
+def _normalized_hash(text: str) -> str:
+    # Whitespace-only differences shouldn't cause a re-assessment
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+@checkpointed
+@traced
 async def assess_cv(cv_content: str, job_posting: str) -> str:
     """Useful for evaluating the match between a cv and a job posting"""
-    from llama_index.core.bridge.pydantic import BaseModel, Field
+    from .dedup import get_detector, job_posting_text
 
-    class CVAssessment(BaseModel):
-        match_score: int = Field(
-            description="how much the cv matches the job posting", gt=0, lt=11
-        )
-        justification: str = Field(
-            description="justification for the match score given"
-        )
-        enhancements: str = Field(
-            description="what can be done to make the cv a better match"
-        )
+    cache = get_cache(
+        "assessments", ttl=float(os.getenv("ASSESSMENT_CACHE_TTL", 7 * 24 * 3600))
+    )
+    # Reposts of a role share the assessment of the posting they duplicate
+    cluster_id = get_detector().cluster_for_text(job_posting_text(job_posting))
+    key = cache_key(
+        _normalized_hash(cv_content),
+        f"cluster:{cluster_id}" if cluster_id else _normalized_hash(job_posting),
+        model_id(Settings.llm),
+        ASSESS_CV_PROMPT_VERSION,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return CVAssessment(**cached).model_dump_json()
 
     assess_cv_prompt_raw = (
         "You are an experienced cv analyzer. "
@@ -145,112 +160,203 @@ async def assess_cv(cv_content: str, job_posting: str) -> str:
         "{job_posting}\n\n"
         "Your output:"
     )
-    llm = Settings.llm
-    assessment = await llm.astructured_predict(
+    assessment = await get_gateway().structured_predict(
         CVAssessment,
         PromptTemplate(assess_cv_prompt_raw),
         cv_content=cv_content,
         job_posting=job_posting,
     )
-    return str(assessment)
+    cache.set(key, assessment.model_dump())
+    return assessment.model_dump_json()
+
 
+class RewriteProgress(Event):
+    """Streamed progress of `rewrite_cv`, one event per chunk or finished section."""
 
-async def rewrite_cv(latex_cv: str, job_posting: str, cv_assessment: str) -> str:
+    section: str
+    delta: str = ""
+    status: str = "streaming"
+
+
+async def tailor_latex_cv(
+    latex_cv: str,
+    job_posting: str,
+    cv_assessment: str,
+    output_path: str,
+    on_progress=None,
+) -> str:
+    """
+    Rewrite a LaTeX CV for a job and write it atomically to `output_path`.
+
+    `on_progress(section, delta, status)` receives the streamed rewrite.
+    """
+    # Only the document body goes to the LLM; the preamble is written verbatim
+    parts = split_latex(latex_cv)
+
+    # Sections the enhancements touch are rewritten concurrently, the rest kept.
+    # The file is written as tokens arrive and only renamed into place at the end.
+    assessment = parse_assessment(cv_assessment)
+    enhancements = assessment.enhancements if assessment else cv_assessment
+    output_path = os.path.abspath(output_path)
+    name, ext = os.path.splitext(os.path.basename(output_path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(output_path), prefix=f".{name}.", suffix=ext
+    )
+    try:
+        with os.fdopen(fd, "w+", encoding="utf-8") as f:
+            f.write(parts.preamble)
+            new_body = await rewrite_sections(
+                parts.body,
+                job_posting,
+                enhancements,
+                parts.defined_names(),
+                file=f,
+                on_progress=on_progress,
+            )
+            f.write(parts.tail)
+            # Fix only the sections that don't compile instead of starting over
+            new_cv = parts.preamble + new_body + parts.tail
+            repaired, issues = await repair_latex(
+                new_cv, reference=latex_cv, defined_names=parts.defined_names()
+            )
+            for issue in issues:
+                print(f"LaTeX issue left in the rewrite: {issue}")
+            if repaired != new_cv:
+                new_cv = repaired
+                f.seek(0)
+                f.truncate()
+                f.write(new_cv)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return new_cv
+
+
+@checkpointed
+@traced
+async def rewrite_cv(
+    latex_cv: str, job_posting: str, cv_assessment: str, ctx: Context = None
+) -> str:
     """Useful for professionally rewriting a cv based on match assessment with a job posting"""
-    rewrite_cv_prompt_raw = (
-        "You are an experienced cv writer. "
-        "Your job is to look at the below cv written in latex, "
-        "a job posting and a matching assessment made by an expert then "
-        "Rewrite the cv in latex adding the enhancements mentioned in the assessment "
-        "to make it a better match. "
-        "\nCV Content:\n\n"
-        f"{latex_cv}\n\n"
-        "Job Posting:\n\n"
-        f"{job_posting}\n\n"
-        "CV Assessment\n\n"
-        f"{cv_assessment}\n\n"
-        "Your output:"
+
+    def on_progress(section, delta, status):
+        if ctx is not None:
+            ctx.write_event_to_stream(
+                RewriteProgress(section=section, delta=delta, status=status)
+            )
+
+    return await tailor_latex_cv(
+        latex_cv, job_posting, cv_assessment, "new_cv.tex", on_progress
     )
-    llm = Settings.llm
-    new_cv = await llm.acomplete(rewrite_cv_prompt_raw)
-    with open("new_cv.tex", "w") as f:
-        f.write(new_cv.text)
-    return new_cv.text
 
 
+@traced
 async def scrape_linkedin_jobs(
     ctx: Context,
     job_name: str = "Artificial Intelligence",
     location: str = "Riyadh, Riyadh Region, Saudi Arabia",
+    max_jobs: int = 25,
 ) -> str:
-    """Useful for scraping LinkedIn jobs related to a certain job name `job_name` in a specific location `location`."""
-    # Define the search parameters
-    keywords = job_name
-    location = location
-    url = (
-        f"https://www.linkedin.com/jobs/search?keywords={keywords}&location={location}"
-    )
+    """Useful for scraping LinkedIn jobs related to a certain job name `job_name` in a specific location `location`. Returns a summary of job IDs, titles and companies."""
+    from .crawler import crawl_linkedin_jobs
+    from .dedup import deduplicate
+    from .vectors import get_vector_index
 
-    # Send a GET request to the LinkedIn job search page
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"Failed to retrieve jobs: {response.status_code}")
-        return f"Failed to retrieve jobs: {response.status_code}"
+    postings = []
+    try:
+        # Postings are fetched concurrently and arrive as each one completes
+        async for posting in crawl_linkedin_jobs(job_name, location, max_jobs=max_jobs):
+            print(posting.summary_line())
+            postings.append(posting)
+    except Exception as e:
+        print(f"Failed to retrieve jobs: {e}")
+        if not postings:
+            return f"Failed to retrieve jobs: {e}"
+
+    with JobStore() as store:
+        store.upsert_many(postings)
+        clusters = deduplicate(store, postings)
+    # Only new or changed postings are embedded
+    get_vector_index().upsert(postings)
+
+    # Only IDs live in the context; descriptions are looked up in the store.
+    # Reposts of the same role are left out so they aren't assessed twice.
+    unique = [p for p in postings if clusters.get(p.job_id, p.job_id) == p.job_id]
+    state = await ctx.get("state")
+    state["job_posting_ids"] = [p.job_id for p in unique if not p.error]
+    await ctx.set("state", state)
+    summary = summarize_postings(unique)
+    if len(unique) < len(postings):
+        summary += f"\n({len(postings) - len(unique)} near-duplicate postings hidden)"
+    return summary
 
-    # Parse the HTML content
-    soup = BeautifulSoup(response.text, "html.parser")
 
-    # Find all job postings
-    job_cards = soup.find_all("div", class_="base-card")
+@traced
+async def list_job_postings(ctx: Context, page: int = 1, page_size: int = 10) -> str:
+    """Useful for listing the scraped job postings page by page (IDs, titles, companies, locations)."""
+    state = await ctx.get("state")
+    with JobStore() as store:
+        postings = store.get_many(state.get("job_posting_ids", []))
+    return summarize_postings(postings, page=page, page_size=page_size)
 
-    # Create a directory to save job postings
-    job_postings = ""
 
-    # Extract and save job details
-    for job in job_cards:
-        job_posting = ""
-        try:
-            job_title = job.find("h3", class_="base-search-card__title").get_text(
-                strip=True
-            )
-            company_name = job.find("h4", class_="base-search-card__subtitle").get_text(
-                strip=True
-            )
-            job_location = job.find(
-                "span", class_="job-search-card__location"
-            ).get_text(strip=True)
-            job_link = job.find("a", class_="base-card__full-link")["href"]
-
-            # Fetch the job description
-            job_response = requests.get(job_link)
-            job_soup = BeautifulSoup(job_response.text, "html.parser")
-            job_description_div = job_soup.find(
-                "div", class_="show-more-less-html__markup"
-            )
-            if job_description_div:
-                job_description = job_description_div.get_text(strip=True)
-            else:
-                job_description = "Not Found"
-
-            job_posting += f"Job Title: {job_title}\n"
-            job_posting += f"Company: {company_name}\n"
-            job_posting += f"Location: {job_location}\n"
-            job_posting += f"Job Link: {job_link}\n"
-            job_posting += "Job Description:\n"
-            job_posting += job_description
-            job_posting += "\n\n\n"
-            print(job_posting)
-            job_postings += job_posting
-
-        except Exception as e:
-            print(f"Error processing job: {e}")
-            return f"Error processing job: {e}"
+@traced
+async def search_job_postings(query: str, limit: int = 10) -> str:
+    """Useful for searching all stored job postings by keywords in their title, company or description."""
+    with JobStore() as store:
+        postings = store.search(query, limit=limit)
+    if not postings:
+        return f"No job postings match '{query}'."
+    return "\n".join(p.summary_line() for p in postings)
+
+
+@traced
+async def get_job_posting(job_id: str) -> str:
+    """Useful for reading the full description of a stored job posting by its job ID."""
+    with JobStore() as store:
+        posting = store.get(job_id)
+    if posting is None:
+        return f"No job posting with ID {job_id}."
+    return posting.to_text()
+
+
+@traced
+async def rank_job_postings(ctx: Context, cv_content: str, top_k: int = 10) -> str:
+    """Useful for shortlisting the scraped job postings that best match a cv (in markdown) before assessing them. Ranks locally by keyword relevance without reading every posting."""
+    from .ranking import rank_postings
+
     state = await ctx.get("state")
-    state["job_postings"] = job_postings
-    await ctx.set("state", state)
-    return job_postings
+    with JobStore() as store:
+        job_ids = state.get("job_posting_ids")
+        postings = store.get_many(job_ids) if job_ids else store.page(0, store.count())
+    if not postings:
+        return "No job postings to rank; scrape some first."
+    ranked = rank_postings(cv_content, postings, top_k=top_k)
+    return "\n".join(f"{p.summary_line()} (relevance {s:.1f})" for p, s in ranked)
+
+
+@traced
+async def match_job_postings(cv_content: str, top_k: int = 10) -> str:
+    """Useful for finding the stored job postings most similar to a cv (in markdown), by embedding similarity rather than exact keywords."""
+    from .vectors import get_vector_index
+
+    index = get_vector_index()
+    if not len(index):
+        return "No job postings are indexed yet; scrape some first."
+    matches = index.search_text([cv_content], k=top_k)[0]
+    with JobStore() as store:
+        postings = {p.job_id: p for p in store.get_many([i for i, _ in matches])}
+    return "\n".join(
+        f"{postings[job_id].summary_line()} (similarity {score:.2f})"
+        for job_id, score in matches
+        if job_id in postings
+    )
 
 
+@traced
 async def record_notes(ctx: Context, notes: str, notes_title: str) -> str:
     """Useful for recording notes on a given topic. Your input should be notes with a title to save the notes under."""
     current_state = await ctx.get("state")
@@ -261,6 +367,7 @@ async def record_notes(ctx: Context, notes: str, notes_title: str) -> str:
     return "Notes recorded."
 
 
+@traced
 async def review_resume(ctx: Context, review: str) -> str:
     """Useful for reviewing a resume and providing feedback. Your input should be a review of the resume."""
     current_state = await ctx.get("state")
@@ -269,6 +376,7 @@ async def review_resume(ctx: Context, review: str) -> str:
     return "Resume reviewed."
 
 
+@traced
 async def job_match_review(ctx: Context, job_name: str, review: str) -> str:
     """Useful for scoring the match of a resume and a job posting. Your input should be the match report."""
     current_state = await ctx.get("state")
@@ -277,12 +385,21 @@ async def job_match_review(ctx: Context, job_name: str, review: str) -> str:
     return "Job match review done."
 
 
+@traced
 async def save_resume(ctx: Context, resume_content: str, filename: str) -> str:
     """Useful for saving the final applicant's resume/CV. filename should be <COMPANY_NAME>_<APPLICANT_NAME>."""
 
+    resume_content, issues = await repair_latex(
+        resume_content, defined_names=split_latex(resume_content).defined_names()
+    )
+    os.makedirs("generated_resumes", exist_ok=True)
     with open(os.path.join("generated_resumes", f"{filename}.tex"), "w") as file:
         nbytes = file.write(resume_content)
         if nbytes > 0:
+            if issues:
+                return "Resume was saved, but its LaTeX still has problems:\n" + (
+                    "\n".join(str(issue) for issue in issues)
+                )
             return "Resume was successfully saved."
     return "Couldn't save the resume."
 
@@ -299,8 +416,11 @@ async def main():
 
     a = await assess_cv(cv_md, j)
     print(a)
+    assessment = parse_assessment(a)
     with open("output.md", "w") as f:
-        f.write(a)
+        f.write(f"# Match score: {assessment.match_score}/10\n\n")
+        f.write(f"## Justification\n\n{assessment.justification}\n\n")
+        f.write(f"## Enhancements\n\n{assessment.enhancements}\n")
 
     cv = await rewrite_cv(cv_tex, j, a)
     print(cv)
@@ -313,8 +433,17 @@ __all__ = [
     "read_job",
     "read_cv",
     "rewrite_cv",
+    "tailor_latex_cv",
+    "RewriteProgress",
     "assess_cv",
+    "CVAssessment",
+    "parse_assessment",
     "scrape_linkedin_jobs",
+    "list_job_postings",
+    "search_job_postings",
+    "get_job_posting",
+    "rank_job_postings",
+    "match_job_postings",
     "record_notes",
     "review_resume",
     "job_match_review",
@@ -0,0 +1,366 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+SERVICE_NAME = "cv-tailor"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+# Set while the gateway is calling the LLM, so llama_index's own LLM events
+# for that call aren't recorded a second time
+_in_gateway = contextvars.ContextVar("in_gateway", default=False)
+
+
+@dataclass
+class Span:
+    """
+    One timed operation: a tool call, an LLM call, or an agent planning turn.
+
+    Token, queue wait and cache counts include those of the span's
+    children, so a tool's span shows what its LLM calls cost.
+    """
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    duration: Optional[float] = None
+    queue_wait: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    ok: bool = True
+    attributes: dict = field(default_factory=dict)
+    parent: Optional["Span"] = field(default=None, repr=False)
+
+    @property
+    def end(self) -> float:
+        return self.start + (self.duration or 0.0)
+
+    def add(self, **counts) -> None:
+        """Add to this span's counters and those of its open ancestors."""
+        span = self
+        while span is not None:
+            for name, value in counts.items():
+                setattr(span, name, getattr(span, name) + value)
+            span = span.parent
+
+    def timing(self) -> str:
+        """Short summary for live display, e.g. "2.31s · 1 LLM call · 1,870 tok"."""
+        parts = [f"{self.duration or 0.0:.2f}s"]
+        if self.llm_calls:
+            plural = "s" if self.llm_calls != 1 else ""
+            parts.append(f"{self.llm_calls} LLM call{plural}")
+            parts.append(f"{self.prompt_tokens + self.completion_tokens:,} tok")
+        if self.queue_wait >= 0.01:
+            parts.append(f"{self.queue_wait:.2f}s queued")
+        if self.cache_hits:
+            parts.append(
+                f"{self.cache_hits} cache hit{'s' if self.cache_hits != 1 else ''}"
+            )
+        return " · ".join(parts)
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class Tracer:
+    """
+    Collects finished spans (the latest `max_spans`) for a report or export.
+
+    The open span is tracked in a context variable, so concurrent tool calls
+    and the LLM calls they make nest correctly across asyncio tasks.
+    """
+
+    def __init__(self, max_spans: int = 10_000):
+        self.spans = deque(maxlen=max_spans)
+        self.trace_id = secrets.token_hex(16)
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, kind: str = "internal", **attributes) -> Span:
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent else self.trace_id,
+            parent_id=parent.span_id if parent else None,
+            parent=parent,
+            attributes=attributes,
+        )
+
+    def finish(self, span: Span) -> None:
+        if span.duration is None:
+            span.duration = time.time() - span.start
+        with self._lock:
+            self.spans.append(span)
+            self._last[span.name] = span
+
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Context manager timing a block as a child of the current span."""
+        return _SpanScope(self, name, kind, attributes)
+
+    def record(
+        self,
+        name: str,
+        kind: str,
+        duration: float,
+        queue_wait: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        ok: bool = True,
+        **attributes,
+    ) -> Span:
+        """Record an operation that has just finished, under the current span."""
+        span = self.start(name, kind, **attributes)
+        span.start = time.time() - duration - queue_wait
+        span.duration = duration + queue_wait
+        span.ok = ok
+        span.add(
+            queue_wait=queue_wait,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            llm_calls=1 if kind == "llm" else 0,
+        )
+        self.finish(span)
+        return span
+
+    def cache_lookup(self, hit: bool) -> None:
+        """Count a cache hit or miss against the current span."""
+        span = _current_span.get()
+        if span is not None:
+            span.add(**{"cache_hits" if hit else "cache_misses": 1})
+
+    def clear(self) -> None:
+        """Drop finished spans and start a new trace, e.g. between daemon requests."""
+        with self._lock:
+            self.spans.clear()
+            self._last.clear()
+            self.trace_id = secrets.token_hex(16)
+
+    def last(self, name: str) -> Optional[Span]:
+        """The most recently finished span called `name`."""
+        return self._last.get(name)
+
+    def summary(self) -> dict:
+        """Per-name totals: calls, wall time percentiles, queue wait, tokens, cache."""
+        groups = defaultdict(list)
+        for span in list(self.spans):
+            groups[(span.kind, span.name)].append(span)
+        summary = {}
+        for (kind, name), spans in sorted(groups.items()):
+            durations = [s.duration for s in spans]
+            summary[name] = {
+                "kind": kind,
+                "calls": len(spans),
+                "errors": sum(1 for s in spans if not s.ok),
+                "total_seconds": sum(durations),
+                "p50_seconds": _percentile(durations, 0.5),
+                "p95_seconds": _percentile(durations, 0.95),
+                "queue_wait_seconds": sum(s.queue_wait for s in spans),
+                "prompt_tokens": sum(s.prompt_tokens for s in spans),
+                "completion_tokens": sum(s.completion_tokens for s in spans),
+                "cache_hits": sum(s.cache_hits for s in spans),
+                "cache_misses": sum(s.cache_misses for s in spans),
+            }
+        return summary
+
+    def report(self) -> str:
+        """Markdown table of `summary`, slowest total first."""
+        lines = [
+            "| Span | Kind | Calls | Total s | p50 s | p95 s | Queued s | Tokens in/out | Cache hits |",
+            "| --- | --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+        ]
+        rows = sorted(
+            self.summary().items(), key=lambda item: -item[1]["total_seconds"]
+        )
+        for name, s in rows:
+            lookups = s["cache_hits"] + s["cache_misses"]
+            lines.append(
+                f"| {name} | {s['kind']} | {s['calls']} | {s['total_seconds']:.2f} "
+                f"| {s['p50_seconds']:.2f} | {s['p95_seconds']:.2f} "
+                f"| {s['queue_wait_seconds']:.2f} "
+                f"| {s['prompt_tokens']:,}/{s['completion_tokens']:,} "
+                f"| {s['cache_hits']}/{lookups} |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def to_otlp(self) -> dict:
+        """The spans as an OTLP/JSON `ExportTraceServiceRequest`."""
+        spans = []
+        for span in list(self.spans):
+            attributes = {
+                "span.kind": span.kind,
+                "queue_wait_seconds": span.queue_wait,
+                "llm.prompt_tokens": span.prompt_tokens,
+                "llm.completion_tokens": span.completion_tokens,
+                "llm.calls": span.llm_calls,
+                "cache.hits": span.cache_hits,
+                "cache.misses": span.cache_misses,
+                **span.attributes,
+            }
+            spans.append(
+                {
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    # SPAN_KIND_CLIENT for outgoing LLM calls, INTERNAL otherwise
+                    "kind": 3 if span.kind == "llm" else 1,
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int(span.end * 1e9)),
+                    "attributes": [_attribute(k, v) for k, v in attributes.items()],
+                    "status": {"code": 1 if span.ok else 2},
+                }
+            )
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_attribute("service.name", SERVICE_NAME)]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+    def export(self, path: str) -> None:
+        """Write `to_otlp` to `path` as JSON, atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(self.to_otlp(), file)
+        os.replace(tmp_path, path)
+
+
+class _SpanScope:
+    def __init__(self, tracer: Tracer, name: str, kind: str, attributes: dict):
+        self.tracer = tracer
+        self.span = tracer.start(name, kind, **attributes)
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        self.span.ok = exc_type is None
+        self.tracer.finish(self.span)
+
+
+def traced(fn=None, *, kind: str = "tool"):
+    """Decorator running an async function inside a span named after it."""
+    if fn is None:
+        return functools.partial(traced, kind=kind)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with get_tracer().span(fn.__name__, kind):
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+class gateway_call:
+    """Marks the block as an LLM call already recorded by the gateway."""
+
+    def __enter__(self):
+        self._token = _in_gateway.set(True)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _in_gateway.reset(self._token)
+
+
+_instrumented = set()
+
+
+def instrument_llama_index(tracer: Tracer = None) -> None:
+    """
+    Record LLM chat calls made by llama_index itself (the agent's planning
+    turns), which don't go through the gateway, as "agent_llm" spans. Calling
+    it again for the same tracer does nothing.
+    """
+    from llama_index.core.instrumentation import get_dispatcher
+    from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+    from llama_index.core.instrumentation.events.llm import (
+        LLMChatEndEvent,
+        LLMChatStartEvent,
+    )
+
+    from .llm import response_usage
+
+    tracer = tracer or get_tracer()
+    if id(tracer) in _instrumented:
+        return
+    _instrumented.add(id(tracer))
+    started = {}
+
+    class AgentLLMHandler(BaseEventHandler):
+        @classmethod
+        def class_name(cls) -> str:
+            return "AgentLLMHandler"
+
+        def handle(self, event, **kwargs):
+            if _in_gateway.get():
+                return
+            if isinstance(event, LLMChatStartEvent):
+                started[event.span_id] = (time.monotonic(), event.messages)
+            elif isinstance(event, LLMChatEndEvent):
+                begun = started.pop(event.span_id, None)
+                if begun is None:
+                    return
+                prompt = "\n".join(str(m.content or "") for m in begun[1])
+                prompt_tokens, completion_tokens = response_usage(
+                    event.response, prompt
+                )
+                tracer.record(
+                    "agent_llm",
+                    "llm",
+                    time.monotonic() - begun[0],
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                )
+
+    get_dispatcher().add_event_handler(AgentLLMHandler())
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "gateway_call",
+    "get_tracer",
+    "instrument_llama_index",
+    "traced",
+]
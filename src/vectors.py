@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from .cache import DEFAULT_CACHE_DIR, LRUCache
+from .ranking import terms
+from .store import DEFAULT_STORE_PATH, JobStore
+
+DEFAULT_INDEX_DIR = os.getenv(
+    "VECTOR_INDEX_DIR", os.path.join(DEFAULT_CACHE_DIR, "job_vectors")
+)
+
+
+def embedding_text(posting) -> str:
+    """What gets embedded for a posting."""
+    return f"{posting.title}\n{posting.company}\n{posting.description}"
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: signed feature hashing of terms and term
+    bigrams, L2-normalized. Needs no model or network, so it suits offline
+    runs and tests; similarity is lexical rather than semantic.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._buckets = LRUCache(max_entries=200_000)
+
+    def _bucket(self, feature: str) -> int:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            # Low bits pick the dimension, the top bit the sign; stored off by
+            # one so dimension 0 keeps its sign
+            bucket = (h % self.dim + 1) * (1 if h >> 31 else -1)
+            self._buckets.set(feature, bucket)
+        return bucket
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = terms(text)
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            if not features:
+                continue
+            buckets = np.fromiter(
+                (self._bucket(f) for f in features), dtype=np.int64, count=len(features)
+            )
+            counts = np.bincount(
+                np.abs(buckets) - 1, weights=np.sign(buckets), minlength=self.dim
+            )
+            # Sublinear term frequency, keeping the hashed sign
+            vectors[row] = np.sign(counts) * np.log1p(np.abs(counts))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class LlamaIndexEmbedder:
+    """Embeddings from a llama_index model (by default `Settings.embed_model`)."""
+
+    def __init__(self, embed_model=None):
+        if embed_model is None:
+            from llama_index.core import Settings
+
+            embed_model = Settings.embed_model
+        self.embed_model = embed_model
+        self.name = f"llama_index-{getattr(embed_model, 'model_name', 'default')}"
+        self.dim = len(embed_model.get_text_embedding("dimension probe"))
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.asarray(
+            self.embed_model.get_text_embedding_batch(texts), dtype=np.float32
+        ).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def get_embedder():
+    """The embedder named by `EMBEDDER` ("hashing", the default, or "llama_index")."""
+    if os.getenv("EMBEDDER", "hashing") == "llama_index":
+        return LlamaIndexEmbedder()
+    return HashingEmbedder(int(os.getenv("EMBEDDING_DIM", 512)))
+
+
+class VectorIndex:
+    """
+    Append-only on-disk matrix of unit-length posting embeddings.
+
+    Rows live in `vectors.f32` (raw float32, read through `np.memmap`) and
+    `meta.json` maps each row to a job ID and a hash of the text it was
+    embedded from. New postings are appended, ones whose `embedding_text`
+    changed overwritten in place, and the rest never re-embedded. An index built with a
+    different embedder is discarded and rebuilt.
+    """
+
+    def __init__(self, embedder, directory: str = DEFAULT_INDEX_DIR):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.ids, self.hashes = [], []
+        meta = self._read_meta()
+        if meta and meta["embedder"] == embedder.name and meta["dim"] == self.dim:
+            self.ids, self.hashes = meta["ids"], meta["hashes"]
+        elif meta:
+            print(f"Embedder changed to {embedder.name}; rebuilding {directory}")
+        # Rows written after the last metadata update belong to no ID
+        with open(self.vectors_path, "ab") as file:
+            file.truncate(len(self.ids) * self.dim * 4)
+        self.rows = {job_id: row for row, job_id in enumerate(self.ids)}
+        self._matrix = None
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self) -> None:
+        meta = {
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "ids": self.ids,
+            "hashes": self.hashes,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, self.meta_path)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The `(len(self), dim)` embedding matrix, memory-mapped read-only."""
+        if self._matrix is None or len(self._matrix) != len(self.ids):
+            if not self.ids:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._matrix = np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self.ids), self.dim),
+            )
+        return self._matrix
+
+    def upsert(self, postings: list, batch_size: int = 64) -> dict:
+        """
+        Embed postings that are new or changed, in batches, and store them.
+        Returns counts of added, updated and unchanged postings.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        pending = {}
+        for posting in postings:
+            if posting.error or not posting.job_id:
+                continue
+            text = embedding_text(posting)
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            row = self.rows.get(posting.job_id)
+            if row is not None and self.hashes[row] == digest:
+                counts["unchanged"] += 1
+            else:
+                pending[posting.job_id] = (posting, text, digest)
+        pending = list(pending.values())
+
+        with self._lock:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start : start + batch_size]
+                vectors = self.embedder.embed([text for _, text, _ in batch])
+                vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+                appended = []
+                for (posting, _, digest), vector in zip(batch, vectors):
+                    row = self.rows.get(posting.job_id)
+                    if row is None:
+                        appended.append(vector)
+                        self.rows[posting.job_id] = len(self.ids)
+                        self.ids.append(posting.job_id)
+                        self.hashes.append(digest)
+                        counts["added"] += 1
+                    else:
+                        self._overwrite(row, vector)
+                        self.hashes[row] = digest
+                        counts["updated"] += 1
+                if appended:
+                    with open(self.vectors_path, "ab") as file:
+                        file.write(np.stack(appended).tobytes())
+                self._write_meta()
+            self._matrix = None
+        return counts
+
+    def _overwrite(self, row: int, vector: np.ndarray) -> None:
+        with open(self.vectors_path, "r+b") as file:
+            file.seek(row * self.dim * 4)
+            file.write(vector.tobytes())
+
+    def search(self, queries: np.ndarray, k: int = 10, chunk: int = 65536) -> list:
+        """
+        Top-`k` cosine matches for each row of `queries`, as lists of
+        `(job_id, score)`, best first. The matrix is scanned in chunks so
+        only `chunk` rows are paged in at a time.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        matrix = self.matrix
+        k = min(k, len(matrix))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(matrix), chunk):
+            scores = queries @ matrix[start : start + chunk].T
+            top = min(k, scores.shape[1])
+            rows = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            best_scores = np.concatenate(
+                (best_scores, np.take_along_axis(scores, rows, axis=1)), axis=1
+            )
+            best_rows = np.concatenate((best_rows, rows + start), axis=1)
+            # Keep only the running top k between chunks
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(self.ids[row], float(score)) for row, score in zip(rows, scores)]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+
+    def search_text(self, texts: list, k: int = 10) -> list:
+        """Embed `texts` with the index's embedder and `search` for each."""
+        return self.search(self.embedder.embed(texts), k)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(directory: str = DEFAULT_INDEX_DIR) -> VectorIndex:
+    """Return the process-wide index kept in `directory`, opening it on first use."""
+    directory = os.path.abspath(directory)
+    with _indexes_lock:
+        if directory not in _indexes:
+            _indexes[directory] = VectorIndex(get_embedder(), directory)
+        return _indexes[directory]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the job posting vector index.")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="store path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="embed new or changed postings from the store")
+    search = commands.add_parser("search", help="postings most similar to a text")
+    search.add_argument("text")
+    search.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    index = get_vector_index()
+    with JobStore(args.db) as store:
+        if args.command == "build":
+            print(index.upsert(store.page(0, store.count())))
+        elif args.command == "search":
+            matches = index.search_text([args.text], k=args.limit)[0]
+            postings = {p.job_id: p for p in store.get_many([i for i, _ in matches])}
+            for job_id, score in matches:
+                if job_id in postings:
+                    print(f"{score:.3f} {postings[job_id].summary_line()}")
+
+
+if __name__ == "__main__":
+    main()
+
+__all__ = [
+    "HashingEmbedder",
+    "LlamaIndexEmbedder",
+    "VectorIndex",
+    "embedding_text",
+    "get_embedder",
+    "get_vector_index",
+]
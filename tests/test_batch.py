@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+from llama_index.core import Settings
+
+from benchmarks.fixtures import job
+from benchmarks.mock_llm import BenchmarkLLM
+from benchmarks.scenarios import write_cvs
+from src import cache
+from src import llm as llm_module
+from src.batch import CHECKPOINT_NAME, SUMMARY_NAME, load_postings, run_batch
+from src.llm import LLMGateway
+from src.postings import JobPosting
+from src.store import JobStore
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "DEFAULT_CACHE_DIR", str(tmp_path / "cache"))
+    llm = BenchmarkLLM(latency=0.0, tokens_per_second=1e6)
+    monkeypatch.setattr(Settings, "_llm", llm)
+    monkeypatch.setattr(llm_module, "_gateway", LLMGateway(llm=llm))
+    return llm
+
+
+def store_postings(path: str, count: int) -> None:
+    postings = []
+    for index in range(count):
+        details = job(index)
+        postings.append(
+            JobPosting(
+                job_id=details["job_id"],
+                title=details["title"],
+                company=details["company"],
+                location=details["location"],
+                description="\n\n".join(details["paragraphs"]),
+            )
+        )
+    with JobStore(path) as store:
+        store.upsert_many(postings)
+
+
+def batch(cv_paths: list, output_dir: str) -> list:
+    async def go():
+        postings = await load_postings(None, db="jobs.db")
+        return await run_batch(cv_paths, postings, output_dir=output_dir, workers=2)
+
+    return asyncio.run(go())
+
+
+def test_batch_writes_resumes_summary_and_checkpoint_and_resumes(llm, tmp_path, capsys):
+    store_postings("jobs.db", 3)
+    cv_paths = write_cvs(str(tmp_path / "cvs"), 2)
+    output_dir = tmp_path / "out"
+
+    missing = str(tmp_path / "cvs" / "missing.tex")
+    results = batch([*cv_paths, missing], str(output_dir))
+    assert f"Skipping {missing}: could not read it" in capsys.readouterr().out
+    assert len(results) == 6
+    assert all(r.error is None and r.match_score is not None for r in results)
+    assert all((output_dir / r.output.split("/")[-1]).exists() for r in results)
+    checkpoint = output_dir / CHECKPOINT_NAME
+    records = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert sorted(r["key"] for r in records) == sorted(r.key for r in results)
+    summary = (output_dir / SUMMARY_NAME).read_text().splitlines()
+    assert len(summary) == 2 + 6
+    assert {row.split(" | ")[1] for row in summary[2:]} == {"cv_01", "cv_02"}
+
+    # Lose the last pair, as if the batch was interrupted before recording it
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    checkpoint.write_text("".join(lines[:-1]))
+    capsys.readouterr()
+    calls = sum(llm.calls.values())
+    resumed = batch(cv_paths, str(output_dir))
+    assert "Resuming: 5/6 pairs already done" in capsys.readouterr().out
+    assert sorted(r.key for r in resumed) == sorted(r.key for r in results)
+    assert len(checkpoint.read_text().splitlines()) == 6
+    # The redone pair's assessment and rewrite come from the caches
+    assert sum(llm.calls.values()) == calls
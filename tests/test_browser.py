@@ -0,0 +1,35 @@
+from src.browser import BrowserPool
+
+
+class FakeDriver:
+    current_url = "about:blank"
+
+    def get(self, url):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+def test_warm_drivers_are_handed_out_first():
+    started = []
+
+    def factory():
+        started.append(FakeDriver())
+        return started[-1]
+
+    pool = BrowserPool(size=3, driver_factory=factory)
+    pool.warm(1)
+    assert len(started) == 1
+    with pool.driver() as driver:
+        assert driver is started[0]
+    assert len(started) == 1
+
+    # Warming again tops the pool up to the size, never past it
+    pool.warm()
+    pool.warm()
+    assert len(started) == 3
+    pool.close()
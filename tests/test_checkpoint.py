@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+from collections import Counter
+
+import pytest
+from llama_index.core.workflow import Event, StartEvent, StopEvent, Workflow, step
+
+from src import checkpoint as checkpoint_module
+from src.checkpoint import RunCheckpoint, checkpointed
+
+calls = Counter()
+failures = set()
+
+
+class Fetched(Event):
+    text: str
+
+
+@checkpointed
+async def fetch(n: int) -> str:
+    calls["fetch"] += 1
+    return f"posting {n}"
+
+
+@checkpointed
+async def summarize(text: str) -> str:
+    calls["summarize"] += 1
+    if "summarize" in failures:
+        raise RuntimeError("LLM unavailable")
+    return text.upper()
+
+
+class ToyPipeline(Workflow):
+    @step
+    async def first(self, ev: StartEvent) -> Fetched:
+        return Fetched(text=await fetch(ev.n))
+
+    @step
+    async def second(self, ev: Fetched) -> StopEvent:
+        summary = await summarize(ev.text)
+        if "save" in failures:
+            raise OSError("disk full")
+        return StopEvent(result=summary)
+
+
+async def run(checkpoint: RunCheckpoint, **kwargs):
+    workflow = ToyPipeline(timeout=10)
+    checkpoint.activate()
+    ctx = checkpoint.restore(workflow)
+    handler = workflow.run(ctx=ctx) if ctx is not None else workflow.run(**kwargs)
+    checkpoint.attach(handler.ctx)
+    result = await handler
+    checkpoint.finish(result)
+    return result
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    calls.clear()
+    failures.clear()
+
+
+def records(checkpoint: RunCheckpoint) -> list:
+    with open(checkpoint.path, "r", encoding="utf-8") as file:
+        return [json.loads(line)["type"] for line in file]
+
+
+def test_resume_restarts_the_step_whose_tool_failed(tmp_path):
+    checkpoint = RunCheckpoint(directory=str(tmp_path))
+    checkpoint.start(n=1)
+    failures.add("summarize")
+    with pytest.raises(RuntimeError):
+        asyncio.run(run(checkpoint, n=1))
+    # Results are logged per tool; the context is saved once, beside the log
+    assert records(checkpoint) == ["run", "tool"]
+    assert (tmp_path / f"{checkpoint.run_id}.context.json").exists()
+
+    failures.clear()
+    resumed = RunCheckpoint.load(checkpoint.run_id, str(tmp_path))
+    assert resumed.context is not None
+    assert asyncio.run(run(resumed)) == "POSTING 1"
+    assert calls == Counter(fetch=1, summarize=2)
+    assert RunCheckpoint.load(checkpoint.run_id, str(tmp_path)).finished
+
+
+def test_killed_run_resumes_from_the_last_tools_snapshot(tmp_path):
+    checkpoint = RunCheckpoint(directory=str(tmp_path))
+    checkpoint.start(n=2)
+    # Fails outside any tool, like a process killed between tool calls
+    failures.add("save")
+    with pytest.raises(OSError):
+        asyncio.run(run(checkpoint, n=2))
+    assert (tmp_path / f"{checkpoint.run_id}.context.json").exists()
+
+    failures.clear()
+    resumed = RunCheckpoint.load(checkpoint.run_id, str(tmp_path))
+    assert resumed.context is not None
+    assert asyncio.run(run(resumed)) == "POSTING 2"
+    assert calls == Counter(fetch=1, summarize=1)
+    # Finished runs aren't resumed, so their snapshot is removed
+    assert not (tmp_path / f"{checkpoint.run_id}.context.json").exists()
+
+
+def test_resume_without_a_snapshot_replays_logged_results(tmp_path):
+    checkpoint = RunCheckpoint(directory=str(tmp_path))
+    checkpoint.start(n=3)
+    failures.add("save")
+    with pytest.raises(OSError):
+        asyncio.run(run(checkpoint, n=3))
+    os.remove(checkpoint.context_path)
+
+    failures.clear()
+    resumed = RunCheckpoint.load(checkpoint.run_id, str(tmp_path))
+    assert resumed.context is None
+    assert asyncio.run(run(resumed, **resumed.args)) == "POSTING 3"
+    assert calls == Counter(fetch=1, summarize=1)
+
+
+def test_starting_a_run_prunes_the_oldest(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint_module, "MAX_RUNS", 3)
+    run_ids = []
+    for n in range(5):
+        checkpoint = RunCheckpoint(f"run-{n}", directory=str(tmp_path))
+        checkpoint.start(n=n)
+        os.utime(checkpoint.path, (n, n))  # Oldest first, whatever the clock
+        run_ids.append(checkpoint.run_id)
+    remaining = sorted(path.stem for path in tmp_path.glob("*.jsonl"))
+    assert remaining == run_ids[2:]
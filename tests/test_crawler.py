@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from benchmarks.fixtures import SEARCH_PATH, FixtureServer, job, job_path
+from src.crawler import JobCrawler, TokenBucket
+
+
+@pytest.fixture
+def server():
+    with FixtureServer(jobs=60, delay=0, padding=0) as server:
+        yield server
+
+
+def crawl(server, max_jobs=100, **kwargs):
+    kwargs.setdefault("rate", None)
+    kwargs.setdefault("backoff", 0.01)
+    crawler = JobCrawler(
+        session=requests.Session(), search_url=server.search_url, **kwargs
+    )
+
+    async def run():
+        return [p async for p in crawler.crawl("ml", "Riyadh", max_jobs=max_jobs)]
+
+    try:
+        return asyncio.run(run())
+    finally:
+        crawler.close()
+
+
+def test_crawl_walks_every_page(server):
+    postings = crawl(server)
+    assert sorted(p.job_id for p in postings) == sorted(
+        job(i)["job_id"] for i in range(60)
+    )
+    assert not any(p.error for p in postings)
+    assert all(p.description for p in postings)
+    # Pages at start=0, 25 and 50, then the empty page at 75 ends the crawl
+    assert server.requests == 60 + 4
+
+
+def test_crawl_stops_at_max_jobs(server):
+    postings = crawl(server, max_jobs=30)
+    assert len(postings) == 30
+    assert server.requests == 30 + 2
+
+
+def test_transient_errors_are_retried(server):
+    server.faults[job_path(0)] = [429, 503]
+    postings = {p.job_id: p for p in crawl(server, max_jobs=5)}
+    posting = postings[job(0)["job_id"]]
+    assert posting.error is None and posting.description
+    assert server.faults[job_path(0)] == []
+
+
+def test_other_errors_are_not_retried(server):
+    server.faults[job_path(1)] = [404]
+    server.faults[job_path(2)] = [500] * 3
+    postings = {p.job_id: p for p in crawl(server, max_jobs=5, retries=2)}
+    # A retry would have got the page, since only one 404 was queued
+    assert postings[job(1)["job_id"]].error.endswith("HTTP 404")
+    assert postings[job(2)["job_id"]].error.endswith("HTTP 500")
+    assert not any(postings[job(i)["job_id"]].error for i in (0, 3, 4))
+
+
+def test_failed_search_page_ends_the_crawl(server):
+    server.faults[SEARCH_PATH] = [400]
+    with pytest.raises(RuntimeError, match="HTTP 400"):
+        crawl(server)
+
+
+def test_backoff_grows_exponentially(server):
+    server.faults[job_path(0)] = [502, 502]
+    crawler = JobCrawler(session=requests.Session(), rate=None, backoff=0.05)
+    started = time.monotonic()
+    try:
+        asyncio.run(crawler.get(server.job_url(0)))
+    finally:
+        crawler.close()
+    # Waits of at least backoff and 2 * backoff
+    assert time.monotonic() - started >= 0.15
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    async def run():
+        for _ in range(11):
+            await bucket.acquire()
+
+    started = time.monotonic()
+    asyncio.run(run())
+    # The first token is in the bucket; the other 10 arrive at 50 per second
+    assert time.monotonic() - started >= 0.19
+
+
+def test_token_bucket_allows_bursts():
+    bucket = TokenBucket(rate=1, capacity=5)
+
+    async def run():
+        for _ in range(5):
+            await bucket.acquire()
+
+    started = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - started < 0.5
+
+
+def test_crawl_respects_the_rate(server):
+    started = time.monotonic()
+    postings = crawl(server, max_jobs=10, rate=5)
+    assert len(postings) == 10
+    # One search page and 10 postings: a burst of 5, then 6 more at 5 per second
+    assert time.monotonic() - started >= 1.1
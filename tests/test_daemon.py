@@ -0,0 +1,83 @@
+import asyncio
+import os
+import socket
+import stat
+import sys
+
+import pytest
+
+from src import cache, daemon, main
+from src.cache import get_cache
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="the daemon needs Unix sockets"
+)
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT = (
+    "import sys; from src.daemon import forward; "
+    "sys.exit(forward(['--pipeline', '--job-url', 'https://example.com/jobs/1'], "
+    "sys.argv[1]))"
+)
+
+
+def test_requests_from_two_directories_use_their_own_caches(tmp_path, monkeypatch):
+    async def execute(args, parser):
+        # What read_cv and assess_cv do with the process-wide caches
+        get_cache("daemon_test").set("cwd", os.getcwd())
+        print(f"ran in {os.getcwd()}")
+
+    monkeypatch.setattr(daemon, "warm", lambda: None)
+    monkeypatch.setattr(main, "execute", execute)
+    monkeypatch.setattr(cache, "DEFAULT_CACHE_DIR", ".cache")
+    socket_path = str(tmp_path / "daemon.sock")
+    projects = [tmp_path / "a", tmp_path / "b"]
+    for project in projects:
+        project.mkdir()
+
+    async def scenario():
+        server = asyncio.create_task(daemon.serve(socket_path))
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        outputs = []
+        for project in projects:
+            # A separate client process, as when the CLI is run from `project`
+            client = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-c",
+                CLIENT,
+                socket_path,
+                cwd=project,
+                env={**os.environ, "PYTHONPATH": ROOT},
+                stdout=asyncio.subprocess.PIPE,
+            )
+            stdout, _ = await client.communicate()
+            outputs.append((client.returncode, stdout.decode()))
+        server.cancel()
+        return outputs
+
+    for project, (code, output) in zip(projects, asyncio.run(scenario())):
+        assert code == 0
+        assert f"ran in {project}" in output
+        entries = os.listdir(project / ".cache" / "daemon_test")
+        assert [name for name in entries if name.endswith(".json")]
+
+
+def test_forward_without_a_daemon_runs_locally(tmp_path):
+    assert daemon.forward(["--pipeline"], str(tmp_path / "missing.sock")) is None
+
+
+def test_socket_is_private_to_its_owner(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "warm", lambda: None)
+    socket_path = str(tmp_path / "daemon.sock")
+
+    async def scenario():
+        server = asyncio.create_task(daemon.serve(socket_path))
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        mode = stat.S_IMODE(os.stat(socket_path).st_mode)
+        server.cancel()
+        return mode
+
+    assert asyncio.run(scenario()) == 0o600
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from llama_index.core import Settings
+
+from benchmarks.mock_llm import BenchmarkLLM
+from src import cache
+from src import llm as llm_module
+from src.dedup import get_detector, posting_text
+from src.llm import LLMGateway
+from src.postings import JobPosting
+from src.tools import assess_cv
+
+# Short enough that read_job's dict syntax and extra fields would change a
+# good share of its shingles
+DESCRIPTION = (
+    "Build retrieval-augmented generation pipelines on top of large language "
+    "models and deploy them to production with Kubernetes and MLflow."
+)
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "DEFAULT_CACHE_DIR", str(tmp_path / "cache"))
+    llm = BenchmarkLLM(latency=0.0)
+    monkeypatch.setattr(Settings, "_llm", llm)
+    monkeypatch.setattr(llm_module, "_gateway", LLMGateway(llm=llm))
+    return llm
+
+
+def test_repost_reuses_the_original_postings_assessment(llm):
+    original = JobPosting(
+        job_id="4000000001",
+        title="Machine Learning Engineer",
+        company="Acme",
+        location="Riyadh, Saudi Arabia",
+        description=DESCRIPTION,
+    )
+    # The scraper signs stored postings from their title and description
+    get_detector().assign(original.job_id, posting_text(original))
+    # read_job's output for a repost of the role from another location
+    repost = str(
+        {
+            "title": original.title,
+            "company": original.company,
+            "location": "Remote",
+            "description": DESCRIPTION,
+        }
+    )
+
+    first = asyncio.run(assess_cv("# Jane Doe\nML engineer", str(original.to_dict())))
+    second = asyncio.run(assess_cv("# Jane Doe\nML engineer", repost))
+
+    assert second == first
+    assert llm.calls["astructured_predict"] == 1
@@ -0,0 +1,68 @@
+import os
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+
+from src.fetch import fetch_job_selenium, parse_job_page
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def test_job_page():
+    job = parse_job_page(page("job_page.html"))
+    assert job["title"] == "Machine Learning Engineer"
+    assert job["company"] == "Acme"
+    assert job["location"] == "Riyadh, Riyadh, Saudi Arabia"
+    assert job["description"].splitlines() == [
+        "About the role",
+        "You will design, train and deploy machine learning models to production.",
+        "Requirements",
+        "Strong Python and SQL; experience with PyTorch or TensorFlow.",
+        "Own our MLOps stack: Kubernetes, Docker, Airflow and MLflow.",
+    ]
+
+
+def test_job_page_with_the_alternate_title_class():
+    job = parse_job_page(page("job_page_alt_title.html"))
+    assert job["title"] == "Senior Data Scientist"
+    assert job["company"] == "Acme"
+    assert job["description"].startswith("About the role")
+
+
+def test_login_wall_is_not_a_job():
+    assert parse_job_page(page("login_wall.html")) is None
+
+
+class FakeElement:
+    def __init__(self, text: str):
+        self.text = text
+
+    def get_attribute(self, name: str) -> str:
+        return "show-more-less-html__markup"
+
+
+class PageWithoutSeeMore:
+    """Just enough of a WebDriver for `fetch_job_selenium`; no "See more" button."""
+
+    def get(self, url: str) -> None:
+        pass
+
+    def find_element(self, by, value):
+        if "button" in value:
+            raise NoSuchElementException(value)
+        return FakeElement(value)
+
+    def find_elements(self, by, value):
+        return [] if "button" in value else [FakeElement(value)]
+
+
+def test_missing_see_more_button_is_not_waited_for():
+    started = time.perf_counter()
+    job = fetch_job_selenium(PageWithoutSeeMore(), "https://example.test/jobs/1")
+    assert time.perf_counter() - started < 1
+    assert job["description"] == "div.show-more-less-html__markup"
@@ -0,0 +1,36 @@
+import pytest
+
+from src.latex import BalanceChecker
+
+SAMPLES = [
+    # Balanced: line breaks next to braces, escaped braces, % and comments
+    "\\textbf{a}\\\\{b}\\\\\n\\begin{itemize}\\item 50\\% done % {\n\\{ x \\}\n"
+    "\\end{itemize}\n",
+    "a\\\\\\{b\\\\{c}\n",
+    # Unbalanced
+    "a\\\\}b\n",
+    "\\begin{itemize}\\\\\\end{enumerate}\n",
+    "{x\\\\% }\n",
+]
+
+
+def check(*chunks: str):
+    checker = BalanceChecker()
+    for chunk in chunks:
+        error = checker.feed(chunk)
+        if error:
+            return error
+    return checker.close()
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_chunk_boundaries_do_not_change_the_result(text):
+    expected = check(text)
+    for offset in range(len(text) + 1):
+        assert check(text[:offset], text[offset:]) == expected, offset
+    assert check(*text) == expected
+
+
+def test_line_break_before_a_closing_brace():
+    assert check("\\\\", "}") == "unbalanced '}'"
+    assert check("{\\\\", "}") is None
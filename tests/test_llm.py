@@ -0,0 +1,175 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm import LLMGateway
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class FakeLLM:
+    """Replays scripted outcomes: an exception to raise, or seconds to stall."""
+
+    def __init__(self, script=(), delay=0.0, midway_error=None):
+        self.script = list(script)
+        self.delay = delay
+        self.midway_error = midway_error
+        self.attempts = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def acomplete(self, prompt, **kwargs):
+        self.attempts += 1
+        outcome = self.script.pop(0) if self.script else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(outcome or self.delay)
+        finally:
+            self.active -= 1
+        usage = {"prompt_tokens": 7, "completion_tokens": 3}
+        return SimpleNamespace(text=f"re: {prompt}", raw={"usage": usage})
+
+    async def astream_complete(self, prompt, **kwargs):
+        self.attempts += 1
+        outcome = self.script.pop(0) if self.script else None
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        async def gen():
+            for delta in ("chunk one ", "chunk two"):
+                yield SimpleNamespace(delta=delta)
+                if self.midway_error:
+                    raise self.midway_error
+
+        return gen()
+
+
+def gateway(llm, **kwargs):
+    kwargs.setdefault("base_delay", 0.01)
+    return LLMGateway(llm=llm, **kwargs)
+
+
+def test_complete_accounts_tokens_and_calls():
+    llm = FakeLLM()
+    gw = gateway(llm)
+    response = asyncio.run(gw.complete("hello"))
+    assert response.text == "re: hello"
+    assert gw.stats["calls"] == 1
+    assert gw.stats["prompt_tokens"] == 7
+    assert gw.stats["completion_tokens"] == 3
+    assert gw.calls[-1].ok and gw.calls[-1].retries == 0
+
+
+def test_timeouts_are_retried():
+    llm = FakeLLM(script=[1.0])
+    gw = gateway(llm, timeout=0.05)
+    assert asyncio.run(gw.complete("hello")).text == "re: hello"
+    assert llm.attempts == 2
+    assert gw.stats["errors"] == 1 and gw.stats["retries"] == 1
+    assert gw.calls[-1].retries == 1
+
+
+def test_other_errors_are_not_retried():
+    llm = FakeLLM(script=[ValueError("bad request")])
+    gw = gateway(llm)
+    with pytest.raises(ValueError):
+        asyncio.run(gw.complete("hello"))
+    assert llm.attempts == 1
+    assert gw.stats["errors"] == 1 and "retries" not in gw.stats
+    assert not gw.calls[-1].ok
+    assert gw.limit.active == 0
+
+
+def test_retries_give_up_after_max_retries():
+    llm = FakeLLM(script=[RateLimitError("slow down")] * 3)
+    gw = gateway(llm, max_retries=2, base_delay=0.001)
+    with pytest.raises(RateLimitError):
+        asyncio.run(gw.complete("hello"))
+    assert llm.attempts == 3
+    assert gw.stats["rate_limited"] == 3 and gw.stats["retries"] == 2
+    assert not gw.calls[-1].ok
+
+
+def test_rate_limit_halves_the_limit_and_backs_off():
+    llm = FakeLLM(script=[RateLimitError("429 Too Many Requests")])
+    gw = gateway(llm, max_concurrency=8, base_delay=0.1)
+
+    started = time.monotonic()
+    asyncio.run(gw.complete("hello"))
+    # The retry waits out the shared cooldown: base_delay, jittered down to half
+    assert time.monotonic() - started >= 0.05
+    assert llm.attempts == 2
+    assert gw.stats["rate_limited"] == 1 and gw.stats["retries"] == 1
+    # Halved to 4, then a success adds 1/4
+    assert gw.limit.limit == pytest.approx(4.25)
+
+
+def test_limit_grows_back_additively_and_caps():
+    gw = gateway(FakeLLM(), max_concurrency=8)
+    gw.limit.limit = 4.0
+
+    async def run(n):
+        for _ in range(n):
+            await gw.complete("hello")
+
+    asyncio.run(run(4))
+    assert gw.limit.limit == pytest.approx(5.0)
+    asyncio.run(run(100))
+    assert gw.limit.limit == 8
+
+
+def test_concurrency_is_bounded_by_the_limit():
+    llm = FakeLLM(delay=0.01)
+    gw = gateway(llm, max_concurrency=3)
+
+    async def run():
+        await asyncio.gather(*(gw.complete(str(i)) for i in range(12)))
+
+    asyncio.run(run())
+    assert llm.max_active == 3
+    assert gw.stats["calls"] == 12
+
+
+def collect(gw, prompt="hello"):
+    async def run():
+        return [delta async for delta in gw.stream_complete(prompt)]
+
+    return asyncio.run(run())
+
+
+def test_stream_retries_before_the_first_delta():
+    llm = FakeLLM(script=[RateLimitError("rate limit reached")])
+    gw = gateway(llm, base_delay=0.001)
+    assert collect(gw) == ["chunk one ", "chunk two"]
+    assert llm.attempts == 2
+    assert gw.calls[-1].ok and gw.calls[-1].completion_tokens > 0
+
+
+def test_stream_failing_midway_is_recorded_as_an_error():
+    gw = gateway(FakeLLM(midway_error=ConnectionError("connection reset")))
+    with pytest.raises(ConnectionError):
+        collect(gw)
+    assert gw.stats["errors"] == 1 and gw.stats["calls"] == 1
+    assert not gw.calls[-1].ok
+    assert gw.limit.active == 0
+
+
+def test_stream_closed_early_frees_the_slot():
+    gw = gateway(FakeLLM())
+
+    async def run():
+        stream = gw.stream_complete("hello")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == "chunk one "
+    assert gw.limit.active == 0
+    assert gw.calls[-1].ok and "errors" not in gw.stats
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from src import pipeline
+from src.tools import READ_CV_ERROR, READ_JOB_ERROR
+
+JOB = str({"title": "ML Engineer", "company": "Acme", "description": "Python."})
+
+
+async def no_llm(*args, **kwargs):
+    raise AssertionError("an LLM step ran after a failed read")
+
+
+def run(tmp_path, job_posting: str, cv_path: str, cv=None) -> str:
+    async def fake_read_job(job_url: str) -> str:
+        return job_posting
+
+    async def fake_read_cv(cv_path: str) -> tuple:
+        return cv
+
+    async def go():
+        workflow = pipeline.TailoringPipeline(timeout=10)
+        return await workflow.run(job_url="https://example.test/1", cv_path=cv_path)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(pipeline, "read_job", fake_read_job)
+        if cv is not None:
+            # Reading a CV converts it with the LLM; only the job read fails here
+            patch.setattr(pipeline, "read_cv", fake_read_cv)
+        patch.setattr(pipeline, "assess_cv", no_llm)
+        patch.setattr(pipeline, "rewrite_cv", no_llm)
+        patch.setattr(pipeline, "save_resume", no_llm)
+        patch.chdir(tmp_path)
+        return str(asyncio.run(go()))
+
+
+def test_failed_job_read_stops_the_run(tmp_path):
+    cv = ("\\section{Summary}\nEngineer.\n", "## Summary\nEngineer.")
+    result = run(tmp_path, READ_JOB_ERROR, str(tmp_path / "cv.tex"), cv=cv)
+    assert result.startswith(READ_JOB_ERROR)
+    assert not (tmp_path / "generated_resumes").exists()
+
+
+def test_failed_cv_read_stops_the_run(tmp_path):
+    missing = str(tmp_path / "missing.tex")
+    result = run(tmp_path, JOB, missing)
+    assert result == f"{READ_CV_ERROR} {missing}"
+    assert not (tmp_path / "generated_resumes").exists()
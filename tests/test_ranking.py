@@ -0,0 +1,57 @@
+import numpy as np
+
+from src import ranking
+from src.postings import JobPosting
+
+
+def postings() -> list:
+    return [
+        JobPosting(
+            job_id="1",
+            title="Machine Learning Engineer",
+            description="Python, PyTorch and Kubernetes.",
+        ),
+        JobPosting(
+            job_id="2", title="Data Engineer", description="SQL, Spark and Kafka."
+        ),
+        JobPosting(
+            job_id="3", title="Frontend Engineer", description="React and node.js."
+        ),
+    ]
+
+
+def test_known_posting_ranks_first(tmp_path):
+    query = ranking.cv_query("## Skills\nReact, node.js, TypeScript")
+    terms = ranking.PostingTerms(str(tmp_path))
+    terms.upsert(postings())
+    ranked = terms.index(postings()).top_k(query, 3)
+    assert ranked[0][0] == 2
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_only_new_and_changed_postings_are_counted_again(tmp_path):
+    ranking.PostingTerms(str(tmp_path)).upsert(postings())
+
+    changed = postings()
+    changed[1].description = "SQL, Spark, Kafka and dbt."
+    changed.append(JobPosting(job_id="4", title="Data Scientist", description="R."))
+    # A new process loads the saved counts
+    terms = ranking.PostingTerms(str(tmp_path))
+    assert terms.upsert(changed) == {"added": 1, "updated": 1, "unchanged": 2}
+
+    documents = [f"{p.title}\n{p.title}\n{p.description}" for p in changed]
+    fresh = ranking.BM25Index(documents)
+    query = ranking.cv_query("Python, dbt, Spark, R")
+    assert np.allclose(terms.index(changed).scores(query), fresh.scores(query))
+
+
+def test_changed_postings_old_counts_are_dropped(tmp_path):
+    terms = ranking.PostingTerms(str(tmp_path))
+    posting = JobPosting(job_id="1", title="Engineer", description="Python")
+    for version in range(10):
+        posting.description = f"Python, version {version}"
+        terms.upsert([posting])
+    assert len(terms.keys) <= 2
+    assert len(terms.sizes) == len(terms.keys)
+    query = ranking.cv_query("version")
+    assert terms.index([posting]).top_k(query, 1)[0][1] > 0
@@ -0,0 +1,18 @@
+import inspect
+import re
+
+import pytest
+
+from src.registry import TOOLS
+
+
+def written_signature(fn) -> str:
+    """`fn`'s signature as the registry writes it, with annotations unqualified."""
+    signature = f"{fn.__name__}{inspect.signature(fn)}"
+    return re.sub(r"\b(?:\w+\.)+(\w+)", r"\1", signature)
+
+
+@pytest.mark.parametrize("name", list(TOOLS))
+def test_signature_matches_the_function(name):
+    spec = TOOLS[name]
+    assert spec.signature == written_signature(spec.load())
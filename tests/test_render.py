@@ -0,0 +1,74 @@
+import asyncio
+import io
+import json
+
+from src.render import EventRenderer
+from src.tools import RewriteProgress
+
+
+def rewrite(renderer: EventRenderer, section: str, *deltas: str) -> None:
+    for delta in deltas:
+        renderer.render(RewriteProgress(section=section, delta=delta))
+
+
+def test_rewritten_section_text_is_streamed_in_jsonl():
+    out = io.StringIO()
+    renderer = EventRenderer("jsonl", out=out, flush_interval=60)
+    rewrite(renderer, "Summary", "Machine learning ", "engineer with ")
+    rewrite(renderer, "Skills", "Python, ")
+    rewrite(renderer, "Summary", "8 years.")
+    renderer.render(RewriteProgress(section="Summary", status="done"))
+    renderer.close()
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    streamed = {}
+    for record in records:
+        if record["status"] == "streaming":
+            streamed.setdefault(record["section"], []).append(record["delta"])
+    assert streamed == {
+        "Summary": ["Machine learning engineer with ", "8 years."],
+        "Skills": ["Python, "],
+    }
+    assert records[0]["status"] == "rewriting"
+    assert records[-1] == {
+        "type": "RewriteProgress",
+        "section": "Summary",
+        "status": "done",
+    }
+
+
+def test_rewritten_section_text_is_streamed_in_pretty_mode():
+    out = io.StringIO()
+    renderer = EventRenderer("pretty", out=out, flush_interval=60)
+    rewrite(renderer, "Summary", "Machine learning ", "engineer.")
+    renderer.render(RewriteProgress(section="Summary", status="done"))
+    renderer.close()
+
+    text = out.getvalue()
+    assert "Summary:" in text
+    assert "Machine learning engineer.\n" in text
+    assert text.index("engineer.") < text.index("Summary: done")
+
+
+def test_quiet_mode_does_not_stream_section_text():
+    out = io.StringIO()
+    renderer = EventRenderer("quiet", out=out)
+    rewrite(renderer, "Summary", "Machine learning engineer.")
+    renderer.close()
+    assert "Machine learning" not in out.getvalue()
+
+
+def test_stalled_stream_is_flushed_on_a_timer():
+    out = io.StringIO()
+
+    async def stall():
+        renderer = EventRenderer("pretty", out=out, flush_interval=0.05)
+        rewrite(renderer, "Summary", "Machine learning ")
+        assert "Machine learning" not in out.getvalue()
+        # No further event arrives; the buffered text still shows
+        await asyncio.sleep(0.2)
+        return renderer
+
+    renderer = asyncio.run(stall())
+    assert "Machine learning " in out.getvalue()
+    renderer.close()
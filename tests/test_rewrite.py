@@ -0,0 +1,36 @@
+import pytest
+
+from src.latex import Section
+from src.rewrite import section_mentioned
+
+
+@pytest.mark.parametrize(
+    "title, enhancements, expected",
+    [
+        ("Summary", "rewrite the summary to lead with llm work.", True),
+        ("Professional Summary", "tighten the profile.", True),
+        ("Technical Skills", "list kubernetes in the skills section.", True),
+        ("Skills", "mention the technologies used at acme.", True),
+        ("Work Experience", "quantify achievements at acme.", True),
+        ("Education", "add your gpa.", True),
+        ("Certificates", "add the aws certification.", True),
+        ("Projects", "link the project repositories.", True),
+        # Generic words no longer pull in every section
+        ("Summary", "say more about the role and the tools you used.", False),
+        ("Experience", "say more about the role and the tools you used.", False),
+        ("Skills", "say more about the role and the tools you used.", False),
+        ("Certificates", "of course, keep bullet points short.", False),
+        ("Work Experience", "work on clearer wording throughout.", False),
+        # Aliases match whole words, not fragments of other words
+        ("Skills", "the candidate's mindset fits.", False),
+        ("Summary", "a summarizing line would help.", False),
+    ],
+)
+def test_section_mentioned(title, enhancements, expected):
+    section = Section(title=title, text=f"\\section{{{title}}}\n")
+    assert section_mentioned(section, enhancements) is expected
+
+
+def test_untitled_header_section_matches_contact_details():
+    section = Section(title="", text="\\name{Jane Doe}\n")
+    assert section_mentioned(section, "add a phone number to the header.")
@@ -0,0 +1,100 @@
+import math
+import os
+from dataclasses import replace
+
+import numpy as np
+
+from src.postings import JobPosting
+from src.vectors import HashingEmbedder, VectorIndex, embedding_text
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, dim: int = 64):
+        super().__init__(dim)
+        self.embedded = []
+
+    def embed(self, texts: list) -> np.ndarray:
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+class AngleEmbedder:
+    """2-d embedder: a description "theta" embeds to the unit vector at that angle."""
+
+    dim = 2
+    name = "angle"
+
+    def embed(self, texts: list) -> np.ndarray:
+        angles = [float(text.rsplit("\n", 1)[-1]) for text in texts]
+        return np.array([(math.cos(a), math.sin(a)) for a in angles], np.float32)
+
+
+def posting(n: int, **fields) -> JobPosting:
+    fields.setdefault("description", f"Python and SQL for team {n}")
+    return JobPosting(
+        job_id=str(n),
+        title=f"Engineer {n}",
+        company="Acme",
+        location="Riyadh",
+        **fields,
+    )
+
+
+def test_upsert_counts_and_skips_unchanged_text(tmp_path):
+    embedder = CountingEmbedder()
+    index = VectorIndex(embedder, str(tmp_path))
+    postings = [posting(n) for n in range(3)]
+    assert index.upsert(postings) == {"added": 3, "updated": 0, "unchanged": 0}
+    assert index.upsert(postings) == {"added": 0, "updated": 0, "unchanged": 3}
+
+    embedder.embedded.clear()
+    changed = [
+        replace(postings[0], description="Rust and Go"),
+        # Location isn't embedded, so this needs no new vector
+        replace(postings[1], location="Remote"),
+        postings[2],
+        posting(3),
+    ]
+    assert index.upsert(changed) == {"added": 1, "updated": 1, "unchanged": 2}
+    assert len(embedder.embedded) == 2
+    assert index.ids == ["0", "1", "2", "3"]
+    assert index.search_text(["Engineer 0\nAcme\nRust and Go"], k=1)[0][0][0] == "0"
+
+    # Reopening keeps everything
+    reopened = VectorIndex(CountingEmbedder(), str(tmp_path))
+    assert reopened.upsert(changed)["unchanged"] == 4
+    assert np.array_equal(reopened.matrix, index.matrix)
+
+
+def test_rows_written_after_the_last_metadata_are_dropped(tmp_path):
+    index = VectorIndex(CountingEmbedder(), str(tmp_path))
+    index.upsert([posting(n) for n in range(3)])
+    row_bytes = index.dim * 4
+    # A crash mid-batch: one whole row and half of another, but no metadata
+    with open(index.vectors_path, "ab") as file:
+        file.write(b"\x01" * (row_bytes + row_bytes // 2))
+
+    reopened = VectorIndex(CountingEmbedder(), str(tmp_path))
+    assert len(reopened) == 3
+    assert os.path.getsize(reopened.vectors_path) == 3 * row_bytes
+    assert reopened.upsert([posting(3)])["added"] == 1
+    assert os.path.getsize(reopened.vectors_path) == 4 * row_bytes
+    assert np.allclose(np.linalg.norm(reopened.matrix, axis=1), 1)
+    expected = reopened.embedder.embed([embedding_text(posting(3))])[0]
+    assert np.allclose(reopened.matrix[3], expected)
+
+
+def test_chunked_search_matches_a_full_scan(tmp_path):
+    index = VectorIndex(AngleEmbedder(), str(tmp_path))
+    # Later rows point closer to the query, so the best matches straddle chunks
+    index.upsert([posting(n, description=str((9 - n) * 0.1)) for n in range(10)])
+    query = np.array([[1.0, 0.0]])
+
+    full = index.search(query, k=4)[0]
+    assert [job_id for job_id, _ in full] == ["9", "8", "7", "6"]
+    assert [score for _, score in full] == sorted(
+        (score for _, score in full), reverse=True
+    )
+    for chunk in (1, 3, 4, 7):
+        assert index.search(query, k=4, chunk=chunk)[0] == full
+    assert len(index.search(query, k=50, chunk=3)[0]) == 10